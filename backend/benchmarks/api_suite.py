@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Latency and throughput of the API routes at realistic book sizes.
+
+For each scale the database is seeded with the synthetic generator
+(backend/generate_data.py) and kept as a snapshot (backend/snapshots.py),
+so later runs at that scale restore it in seconds instead of regenerating.
+The server is started as a real process, each scenario is loaded by
+concurrent HTTP clients for a fixed time, and p50/p95/p99 latency and
+requests/second are written as JSON:
+
+    python backend/benchmarks/api_suite.py --scales 1k,100k --out bench.json
+    python backend/benchmarks/api_suite.py --scales 1k --compare bench.json
+    python backend/benchmarks/api_suite.py --results new.json --compare bench.json
+
+With --compare, results are checked against a stored baseline: a scenario
+regresses when its p95 grows or its throughput drops by more than
+--tolerance (and p95 by at least --min-delta-ms), or when it starts
+failing requests. The exit code is 1 when anything regressed.
+
+Scenarios that change data (task completion, webhooks, workflow creation)
+run after the reads; each scale starts again from its snapshot. Task
+completion uses each open task once, so it stops early on small books.
+SQLite serializes writers; point DATABASE_URL at Postgres for numbers
+that mean something for deployments.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from backend.benchmarks.worker_scaling import server_command, wait_ready  # noqa: E402
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Ids sampled from the seeded book for each kind of placeholder.
+POOL_SIZE = 50_000
+
+DRAFT_BODY = "Dear {{ household_name }}, your transition is on track."
+
+# Extraction records the document scenarios send, by document type.
+EXTRACTIONS = os.path.join(
+    ROOT, "demo_data", "transition_os_demo_v1", "document_extractions.json"
+)
+
+
+class Exhausted(Exception):
+    """Raised when a scenario has used every id it may use once."""
+
+
+class Picker:
+    """
+    Hands out ids for path placeholders and request bodies: `{household}`,
+    `{advisor}`, `{workflow}` cycle through a sample of the book,
+    `{open_task}` gives each open task once. `extraction` cycles through
+    extraction records for sampled documents.
+    """
+
+    def __init__(self, pools: dict[str, list]):
+        self.pools = pools
+        self._next = dict.fromkeys(pools, 0)
+
+    def __getitem__(self, kind: str) -> Any:
+        pool = self.pools[kind]
+        index = self._next[kind]
+        if kind == "open_task" and index >= len(pool):
+            raise Exhausted(kind)
+        self._next[kind] = index + 1
+        return pool[index % len(pool)]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    method: str
+    path: str
+    body: Callable[[Picker], dict] | None = None
+
+    def request(self, pick: Picker) -> tuple[str, str, dict | None]:
+        body = self.body(pick) if self.body else None
+        return self.method, self.path.format_map(pick), body
+
+
+SCENARIOS = {
+    # Reads
+    "transitions": Scenario("GET", "/api/transitions"),
+    "transitions_by_advisor": Scenario("GET", "/api/transitions?advisor_id={advisor}"),
+    "transition_detail": Scenario("GET", "/api/transitions/{household}"),
+    "workflow_dashboard": Scenario("GET", "/workflows/{workflow}"),
+    "eta_prediction": Scenario("GET", "/predictions/eta/{workflow}"),
+    "meeting_pack": Scenario("GET", "/households/{household}/meeting-pack"),
+    "document_validate": Scenario(
+        "POST",
+        "/documents/validate",
+        lambda pick: pick["extraction"],
+    ),
+    "consistency_check": Scenario(
+        "POST",
+        "/documents/consistency-check",
+        lambda pick: {"household_ids": [pick["household"]]},
+    ),
+    "entity_match": Scenario(
+        "POST",
+        "/entity/match",
+        lambda pick: {
+            "records": [
+                {
+                    "record_id": f"R-{i}",
+                    "name": f"Client {pick['household'] % 50}",
+                    "address": f"{i % 20} Main Street",
+                    "email": f"client{i % 30}@example.com",
+                }
+                for i in range(50)
+            ]
+        },
+    ),
+    "communication_draft": Scenario(
+        "POST",
+        "/communications/draft",
+        lambda pick: {
+            "household_id": pick["household"],
+            "subject": "Transition update",
+            "body": DRAFT_BODY,
+        },
+    ),
+    "compliance_scan": Scenario(
+        "POST",
+        "/communications/compliance-scan",
+        lambda pick: {"text": DRAFT_BODY * 20},
+    ),
+    "draft_batch": Scenario(
+        "POST",
+        "/communications/draft-batch",
+        lambda pick: {"workflow_id": pick["workflow"], "tone": "friendly"},
+    ),
+    "risk_recompute": Scenario(
+        "POST", "/households/risk/recompute", lambda pick: {"incremental": True}
+    ),
+    # Writes
+    "task_complete": Scenario(
+        "POST", "/api/tasks/{open_task}/complete", lambda pick: {"status": "COMPLETED"}
+    ),
+    "webhook": Scenario(
+        "POST",
+        "/api/webhooks/bench",
+        lambda pick: {
+            "event_type": "DOCUMENT_UPLOADED",
+            "household_id": pick["household"],
+            "filename": "bench_upload.pdf",
+        },
+    ),
+    "document_validate_batch": Scenario(
+        "POST",
+        "/documents/validate-batch",
+        lambda pick: {"documents": [pick["extraction"] for _ in range(50)]},
+    ),
+    "workflow_create": Scenario(
+        "POST",
+        "/workflows",
+        lambda pick: {
+            "workflow_type": "RECRUITED_ADVISOR",
+            "advisor_id": f"ADV-BENCH-{pick['household']}",
+            "metadata": {"name": "Bench Advisor"},
+        },
+    ),
+}
+
+
+def percentile(ordered: list[float], q: float) -> float | None:
+    # Nearest rank on sorted samples.
+    if not ordered:
+        return None
+    return ordered[min(max(math.ceil(q * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+async def load(
+    base_url: str,
+    scenario: Scenario,
+    pick: Picker,
+    clients: int,
+    seconds: float,
+    timeout: float,
+) -> dict:
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=timeout
+    ) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def run_client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                try:
+                    method, path, body = scenario.request(pick)
+                except Exhausted:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    failed = response.status_code >= 400
+                except httpx.TimeoutException:
+                    failed = True
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+def prepare(households: int, seed: int, env: dict) -> dict:
+    """
+    Restores the snapshot for this scale, generating and saving it first
+    if there is none. Returns how long that took and whether it seeded.
+    """
+    from backend.database import engine
+    from backend.snapshots import restore_snapshot, save_snapshot, snapshot_store
+
+    name = f"bench-{households}-s{seed}"
+    started = time.perf_counter()
+    seeded = name not in snapshot_store(engine).names()
+    if seeded:
+        subprocess.run(
+            [
+                sys.executable,
+                "backend/generate_data.py",
+                "--households",
+                str(households),
+                "--seed",
+                str(seed),
+                "--reset",
+                "--db",
+                env["DATABASE_URL"],
+            ],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        save_snapshot(engine, name)
+    restore_snapshot(engine, name)
+    engine.dispose()
+    return {
+        "snapshot": name,
+        "seeded": seeded,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def id_pools(seed: int) -> dict[str, list]:
+    from sqlalchemy import text
+
+    from backend.database import engine
+
+    queries = {
+        "household": "SELECT id FROM households WHERE deleted_at IS NULL",
+        "advisor": "SELECT id FROM advisors",
+        "workflow": "SELECT id FROM workflows",
+        "open_task": "SELECT id FROM tasks WHERE status <> 'COMPLETED'",
+    }
+    rng = random.Random(seed)
+    pools = {}
+    with engine.connect() as conn:
+        for kind, query in queries.items():
+            ids = conn.execute(text(f"{query} LIMIT {POOL_SIZE}")).scalars().all()
+            rng.shuffle(ids)
+            pools[kind] = ids or [0]
+        documents = conn.execute(
+            text(f"SELECT id, type, source_id FROM documents LIMIT {POOL_SIZE}")
+        ).all()
+    engine.dispose()
+    rng.shuffle(documents)
+    pools["extraction"] = extraction_records(documents, rng)
+    return pools
+
+
+def extraction_records(documents: list, rng: random.Random) -> list[dict]:
+    """
+    One extraction record per seeded document, shaped like
+    document_extractions.json: the document's import key and type, with
+    fields and confidence taken from a demo extraction of the same type, so
+    the NIGO rules run and results are written back.
+    """
+    with open(EXTRACTIONS) as handle:
+        demo = json.load(handle)
+    by_type: dict[str, list[dict]] = {}
+    for record in demo:
+        by_type.setdefault(record["doc_type"], []).append(record)
+    records = []
+    for row_id, doc_type, source_id in documents:
+        template = rng.choice(by_type.get(doc_type) or demo)
+        records.append(
+            {
+                "doc_id": source_id or row_id,
+                "doc_type": template["doc_type"],
+                "extracted_fields": template["extracted_fields"],
+                "confidence": template["confidence"],
+            }
+        )
+    return records or [{"doc_id": 0, "doc_type": "Government_ID"}]
+
+
+def run_scale(label: str, args, env: dict) -> dict:
+    households = SCALES[label]
+    setup = prepare(households, args.seed, env)
+    action = "seeded and saved" if setup["seeded"] else "restored"
+    print(f"\n{label}: {households:,} households, {action} in {setup['seconds']:.1f}s")
+    pick = Picker(id_pools(args.seed))
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        server_command(args.workers, args.port),
+        cwd=ROOT,
+        env={**env, "WEB_CONCURRENCY": str(args.workers)},
+    )
+    scenarios = {}
+    try:
+        asyncio.run(wait_ready(base_url, timeout=120.0))
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                asyncio.run(
+                    load(base_url, scenario, pick, 1, args.warmup, args.timeout)
+                )
+            result = asyncio.run(
+                load(base_url, scenario, pick, args.clients, args.seconds, args.timeout)
+            )
+            scenarios[name] = result
+            print(format_result(name, result))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    return {"households": households, "setup": setup, "scenarios": scenarios}
+
+
+def format_result(name: str, result: dict) -> str:
+    def ms(value):
+        return f"{value:8.1f}ms" if value is not None else "       -  "
+
+    return (
+        f"  {name:<24}{result['rps']:8.1f} req/s  p50 {ms(result['p50_ms'])}  "
+        f"p95 {ms(result['p95_ms'])}  p99 {ms(result['p99_ms'])}  "
+        f"errors {result['errors']}/{result['requests']}"
+    )
+
+
+def compare(
+    baseline: dict, current: dict, tolerance: float, min_delta_ms: float
+) -> list[str]:
+    """
+    Regressions of `current` against `baseline`, one line each, for the
+    scale/scenario pairs both have.
+    """
+    regressions = []
+    for scale, run in current["results"].items():
+        before_scale = baseline["results"].get(scale)
+        if before_scale is None:
+            continue
+        for name, now in run["scenarios"].items():
+            before = before_scale["scenarios"].get(name)
+            if before is None or not now["requests"] or not before["requests"]:
+                continue
+            problems = []
+            if now["p95_ms"] > before["p95_ms"] * (1 + tolerance) and (
+                now["p95_ms"] - before["p95_ms"] >= min_delta_ms
+            ):
+                problems.append(f"p95 {before['p95_ms']:.1f} -> {now['p95_ms']:.1f}ms")
+            if now["rps"] < before["rps"] * (1 - tolerance):
+                problems.append(f"throughput {before['rps']:.1f} -> {now['rps']:.1f}/s")
+            error_rate = now["errors"] / now["requests"]
+            if error_rate > before["errors"] / before["requests"] + 0.01:
+                problems.append(f"errors {now['errors']}/{now['requests']}")
+            if problems:
+                regressions.append(f"{scale} {name}: {', '.join(problems)}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API latency benchmark suite")
+    parser.add_argument(
+        "--scales", default="1k", help=f"Comma-separated, from {', '.join(SCALES)}"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma-separated scenarios (default: all, reads before writes)",
+    )
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Per scenario")
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="Unrecorded seconds per scenario"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per request")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument(
+        "--results", default=None, help="Compare this results file instead of running"
+    )
+    parser.add_argument("--compare", default=None, help="Baseline results JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed relative change"
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Ignore p95 increases smaller than this",
+    )
+    args = parser.parse_args()
+    args.scenarios = args.scenarios.split(",")
+    unknown = [s for s in args.scales.split(",") if s not in SCALES]
+    unknown += [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scales or scenarios: {', '.join(unknown)}")
+    if args.results and not args.compare:
+        parser.error("--results needs --compare")
+
+    if args.results:
+        with open(args.results) as handle:
+            current = json.load(handle)
+    else:
+        env = {
+            **os.environ,
+            "DATABASE_URL": os.environ.get(
+                "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/api_suite.sqlite"
+            ),
+            "LOG_LEVEL": "WARNING",
+            "TRACE_SAMPLE_RATE": "0",
+        }
+        os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+        current = {
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "database": env["DATABASE_URL"].split(":", 1)[0],
+                "clients": args.clients,
+                "seconds": args.seconds,
+                "workers": args.workers,
+            },
+            "results": {
+                label: run_scale(label, args, env) for label in args.scales.split(",")
+            },
+        }
+        if args.out:
+            with open(args.out, "w") as handle:
+                json.dump(current, handle, indent=2)
+                handle.write("\n")
+            print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, current, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.compare}")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold start of one API worker: time to import the app, run its startup
+(the schema-version check) and answer a first request.
+
+Each run is a fresh interpreter, as a new worker would be. Prints the
+median and worst of each phase, plus the slowest top-level imports from
+`python -X importtime` for the first run.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKER = """
+import json, time
+started = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    status = client.get("{path}").status_code
+    answered = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - ready) * 1000,
+    "total_ms": (answered - started) * 1000,
+    "status": status,
+}}))
+"""
+
+
+def run_worker(env: dict, path: str, importtime: bool = False) -> tuple[dict, str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", WORKER.format(path=path)]
+    done = subprocess.run(
+        command, cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(done.stdout.strip().splitlines()[-1]), done.stderr
+
+
+def slowest_imports(stderr: str, limit: int) -> list[tuple[int, str]]:
+    # importtime lines: "import time: self | cumulative | name", nested
+    # imports indented two spaces per level. Keep the top two levels.
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/health/ready", help="First request")
+    parser.add_argument("--top-imports", type=int, default=10)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": os.environ.get(
+            "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/cold_start.sqlite"
+        ),
+        "LOG_LEVEL": "WARNING",
+        "PYTHONDONTWRITEBYTECODE": "0",
+    }
+    subprocess.run(
+        [sys.executable, "-m", "backend.migrations"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+
+    first, stderr = run_worker(env, args.path, importtime=True)
+    results = [run_worker(env, args.path)[0] for _ in range(args.runs)]
+
+    for phase in ("import_ms", "startup_ms", "first_request_ms", "total_ms"):
+        values = [r[phase] for r in results]
+        print(
+            f"{phase:>17}: median {statistics.median(values):8.1f}  "
+            f"max {max(values):8.1f}"
+        )
+    print(f"first run (importtime on): {first['total_ms']:.1f}ms")
+    print("slowest imports, top two levels (cumulative ms):")
+    for micros, name in slowest_imports(stderr, args.top_imports):
+        print(f"  {micros / 1000:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
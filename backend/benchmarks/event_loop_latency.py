@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Latency of a cheap route while CPU-heavy requests are in flight.
+
+Fires concurrent large /entity/match requests and, alongside them, pings
+/health/live in a loop. Runs once with the execution layer offloading and
+once inline (the old behaviour) and prints ping latency percentiles.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+async def run_mode(app, orchestrator, offload: bool, args) -> dict:
+    import httpx
+
+    orchestrator.execution.offload = offload
+    records = [
+        {
+            "record_id": f"R-{i}",
+            "name": f"Client Number {i}",
+            "address": f"{i} Main Street",
+            "email": f"client{i}@example.com",
+        }
+        for i in range(args.records)
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # Warm the pools so process start-up is not measured.
+        await c.post("/entity/match", json={"records": records[:300]})
+
+        latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def heavy():
+            await c.post("/entity/match", json={"records": records})
+
+        async def pinger():
+            while not done.is_set():
+                started = time.perf_counter()
+                await c.get("/health/live")
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(args.ping_interval)
+
+        ping_task = asyncio.create_task(pinger())
+        started = time.perf_counter()
+        await asyncio.gather(*(heavy() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ping_task
+
+    latencies.sort()
+    return {
+        "mode": "offload" if offload else "inline",
+        "heavy_seconds": round(elapsed, 2),
+        "pings": len(latencies),
+        "ping_p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "ping_p99_ms": (
+            round(latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)], 1)
+            if latencies
+            else None
+        ),
+        "ping_max_ms": round(latencies[-1], 1) if latencies else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event loop latency under mixed load")
+    parser.add_argument("--records", type=int, default=5000, help="Records per match")
+    parser.add_argument("--concurrency", type=int, default=4, help="Heavy requests")
+    parser.add_argument("--ping-interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    sys.path.insert(
+        0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    # Keep the benchmark away from the real database.
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite"
+    )
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from backend.main import app
+    from backend.orchestrator import orchestrator
+
+    for offload in (False, True):
+        result = asyncio.run(run_mode(app, orchestrator, offload, args))
+        print(
+            f"{result['mode']:>8}: heavy batch {result['heavy_seconds']}s, "
+            f"{result['pings']} pings, p50 {result['ping_p50_ms']}ms, "
+            f"p99 {result['ping_p99_ms']}ms, max {result['ping_max_ms']}ms"
+        )
+    print(orchestrator.execution.snapshot())
+    orchestrator.execution.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Bulk import at custodian-extract scale.
+
+Writes a synthetic dataset in the demo layout (two accounts, four tasks
+and two documents per household; one audit event per account), imports it
+with `import_demo_data.py --reset` in a fresh process and reports rows per
+second and the importer's peak RSS. Run at two sizes to check that memory
+stays flat apart from the id maps:
+
+    python backend/benchmarks/import_bulk.py --accounts 100000
+    python backend/benchmarks/import_bulk.py --accounts 1000000
+
+`--parallel` runs the importer's parallel loader instead; the per-stage
+throughput it prints is passed through.
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TASK_NAMES = (
+    "Intake package received",
+    "Documents classified & extracted",
+    "ACAT submitted",
+    "Transition complete",
+)
+
+
+def write_csv(path: Path, header: list[str], rows) -> None:
+    with path.open("w", newline="", encoding="ascii") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(data_dir: Path, accounts: int) -> dict[str, int]:
+    households = max(accounts // 2, 1)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    write_csv(
+        data_dir / "advisors.csv",
+        ["advisor_id", "advisor_name", "start_date", "channel", "region"],
+        [["ADV-001", "Bench Advisor", "2020-01-15", "Recruiting", "West"]],
+    )
+    write_csv(
+        data_dir / "households.csv",
+        [
+            "household_id",
+            "advisor_id",
+            "household_name",
+            "status",
+            "stall_risk",
+            "attrition_risk",
+        ],
+        (
+            [f"H-{h}", "ADV-001", f"Household {h}", "IN_PROGRESS", h % 100, h % 37]
+            for h in range(households)
+        ),
+    )
+    write_csv(
+        data_dir / "accounts.csv",
+        [
+            "account_id",
+            "household_id",
+            "account_type",
+            "delivering_institution",
+            "estimated_assets_usd",
+            "status",
+        ],
+        (
+            [
+                f"ACCT-{a}",
+                f"H-{a % households}",
+                ("IRA", "Taxable Brokerage")[a % 2],
+                "Custodian Alpha",
+                1000 + a % 500000,
+                "READY",
+            ]
+            for a in range(accounts)
+        ),
+    )
+    write_csv(
+        data_dir / "tasks.csv",
+        [
+            "task_id",
+            "household_id",
+            "workflow_id",
+            "task_name",
+            "owner_queue",
+            "status",
+            "depends_on_task_id",
+            "created_at",
+            "due_at",
+        ],
+        (
+            [
+                f"T-{h}-{i}",
+                f"H-{h}",
+                f"WF-{h}",
+                name,
+                "Ops",
+                "PENDING",
+                f"T-{h}-{i - 1}" if i else "",
+                f"2026-01-{1 + i:02d}T09:00:00Z",
+                f"2026-02-{1 + i:02d}T09:00:00Z",
+            ]
+            for h in range(households)
+            for i, name in enumerate(TASK_NAMES)
+        ),
+    )
+    write_csv(
+        data_dir / "documents.csv",
+        ["doc_id", "household_id", "account_id", "doc_type", "filename", "nigo_status"],
+        (
+            [
+                f"D-{h}-{i}",
+                f"H-{h}",
+                f"ACCT-{h}" if i else "",
+                "Government_ID",
+                f"H-{h}-{i}.txt",
+                ("OK", "MISSING_SIGNATURE")[h % 10 == 0],
+            ]
+            for h in range(households)
+            for i in range(2)
+        ),
+    )
+    with (data_dir / "audit_events.jsonl").open("w", encoding="ascii") as handle:
+        for a in range(accounts):
+            handle.write(
+                json.dumps(
+                    {
+                        "event_id": f"EV-{a}",
+                        "timestamp": "2026-01-20T10:00:00Z",
+                        "actor": "ops.bench",
+                        "actor_role": "ops",
+                        "event_type": "ACCOUNT_READY",
+                        "entity_type": "Account",
+                        "entity_id": f"ACCT-{a}",
+                        "payload": {"note": "synthetic"},
+                    }
+                )
+                + "\n"
+            )
+    return {
+        "households": households,
+        "accounts": accounts,
+        "tasks": households * len(TASK_NAMES),
+        "documents": households * 2,
+        "audit_events": accounts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import throughput and memory")
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument(
+        "--rerun", action="store_true", help="Also time an incremental re-import"
+    )
+    parser.add_argument(
+        "--parallel", action="store_true", help="Use the parallel stage loader"
+    )
+    parser.add_argument(
+        "--db", default=None, help="Database URL (default: a temporary SQLite file)"
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="import-bulk-"))
+    started = time.perf_counter()
+    rows = generate(workdir / "data", args.accounts)
+    print(
+        f"generated {sum(rows.values()):,} rows in {time.perf_counter() - started:.1f}s"
+    )
+
+    command = [
+        sys.executable,
+        "backend/import_demo_data.py",
+        "--data",
+        str(workdir / "data"),
+        "--db",
+        args.db or f"sqlite:///{workdir}/import.sqlite",
+        "--chunk-size",
+        str(args.chunk_size),
+    ] + (["--parallel"] if args.parallel else [])
+    started = time.perf_counter()
+    output = subprocess.run(
+        command + ["--reset"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux: the largest child waited for, the importer.
+    peak_mib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    total = sum(rows.values())
+    print(f"imported {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, count in rows.items():
+        print(f"  {table:<13}{count:>10,}")
+    print(f"importer peak RSS: {peak_mib:.0f} MiB")
+    print(output[output.index("Stages:") :].rstrip())
+
+    if args.rerun:
+        # A refresh with nothing changed: every row is matched and skipped.
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        print(f"unchanged re-import: {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
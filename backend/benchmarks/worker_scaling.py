@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Throughput of the transitions and webhook endpoints as the worker count
+grows.
+
+For each worker count the server is started as a real multi-process
+deployment (gunicorn with backend/gunicorn.conf.py, or `uvicorn --workers`
+when gunicorn is not installed), loaded by concurrent HTTP clients for a
+fixed time, and stopped. Prints requests/second, p50/p99 latency and the
+scaling efficiency relative to one worker (1.0 = perfectly linear).
+
+Scaling is bounded by the cores available to the server and the load
+generator together, and by the database: SQLite serializes writers, so
+point DATABASE_URL at Postgres to measure the webhook endpoint.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED = """
+from backend.database import SessionLocal, engine
+from backend.migrations import drop_schema, migrate
+from backend.models import Advisor, Household
+
+drop_schema(engine)
+migrate(engine)
+with SessionLocal() as db:
+    advisor = Advisor(name="Bench Advisor")
+    db.add(advisor)
+    db.flush()
+    db.add_all(
+        Household(advisor_id=advisor.id, name=f"Household {{i}}", risk_score=i % 100)
+        for i in range({households})
+    )
+    db.commit()
+"""
+
+ENDPOINTS = {
+    "transitions": ("GET", "/api/transitions", None),
+    "webhook": (
+        "POST",
+        "/api/webhooks/bench",
+        {"event_type": "STATUS_PING", "household_id": 1},
+    ),
+}
+
+
+def server_command(workers: int, port: int) -> list[str]:
+    if shutil.which("gunicorn"):
+        return [
+            "gunicorn",
+            "-c",
+            "backend/gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "backend.main:app",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "backend.main:app",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+    ]
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+async def load(base_url: str, endpoint: str, clients: int, seconds: float) -> dict:
+    import httpx
+
+    method, path, body = ENDPOINTS[endpoint]
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def run_client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(int(0.99 * len(latencies)), len(latencies) - 1)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput scaling by worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to try")
+    parser.add_argument("--endpoints", default="transitions,webhook")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Per run")
+    parser.add_argument("--households", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": os.environ.get(
+            "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/worker_scaling.sqlite"
+        ),
+        "LOG_LEVEL": "WARNING",
+        "TRACE_SAMPLE_RATE": "0",
+    }
+    subprocess.run(
+        [sys.executable, "-c", SEED.format(households=args.households)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+    )
+    server_name = "gunicorn" if shutil.which("gunicorn") else "uvicorn --workers"
+    print(f"server: {server_name}, cpus: {os.cpu_count()}")
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    baseline: dict[str, float] = {}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        server = subprocess.Popen(
+            server_command(workers, args.port),
+            cwd=ROOT,
+            env={**env, "WEB_CONCURRENCY": str(workers)},
+        )
+        try:
+            asyncio.run(wait_ready(base_url))
+            for endpoint in args.endpoints.split(","):
+                result = asyncio.run(
+                    load(base_url, endpoint, args.clients, args.seconds)
+                )
+                baseline.setdefault(endpoint, result["rps"])
+                efficiency = result["rps"] / (baseline[endpoint] * workers)
+                print(
+                    f"workers={workers:<2} {endpoint:<12} "
+                    f"{result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f}ms  "
+                    f"p99 {result['p99_ms']:7.1f}ms  errors {result['errors']:<4} "
+                    f"efficiency {efficiency:.2f}"
+                )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Instantiating a workflow template for a whole book.
+
+Creates `--households` households in a fresh database and times
+`instantiate_book`, which inserts the template's task chain one dependency
+level at a time. Prints tasks per second for each run:
+
+    python backend/benchmarks/workflow_book.py --households 12500   # 100k tasks
+    DATABASE_URL=postgresql://... python backend/benchmarks/workflow_book.py
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Workflow book instantiation time")
+    parser.add_argument("--households", type=int, default=12_500)
+    parser.add_argument("--workflow-type", default="RECRUITED_ADVISOR")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/workflow_book.sqlite"
+    )
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, ROOT)
+
+    from backend.database import SessionLocal, engine
+    from backend.migrations import migrate
+    from backend.services.workflows import (
+        compile_template,
+        create_households,
+        instantiate_book,
+    )
+
+    migrate(engine)
+    template = compile_template(args.workflow_type)
+    with SessionLocal() as db:
+        household_ids = create_households(
+            db, None, ({"name": f"Bench {i}"} for i in range(args.households))
+        )
+        db.commit()
+
+    timings = []
+    for run in range(args.runs):
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            result = instantiate_book(
+                db, template, None, household_ids, name=f"Bench book {run}"
+            )
+            db.commit()
+            elapsed = time.perf_counter() - started
+        timings.append(elapsed)
+        print(
+            f"run {run + 1}: {result['tasks_created']:,} tasks in {elapsed:.2f}s "
+            f"({result['tasks_created'] / elapsed:,.0f} tasks/s)"
+        )
+    print(f"median: {statistics.median(timings):.2f}s on {engine.dialect.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,75 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api"
 
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./transition_os.db")
+    # Apply pending migrations at startup instead of only checking the version.
+    # Convenient locally; deployments run `python -m backend.migrations`.
+    AUTO_MIGRATE: bool = False
     ENVIRONMENT: str = "DEV"  # DEV, TEST, STAGE, PROD
     LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped, not waited on
+    # Hot-path log limits, "logger=value,...": records/second and kept fraction
+    LOG_RATE_LIMITS: str = ""
+    LOG_SAMPLE_RATES: str = ""
     ENABLE_SKILL_STUBS: bool = True
+
+    # Entity match duplicate detection (MinHash/LSH)
+    DEDUPE_NUM_PERM: int = 128
+    DEDUPE_BANDS: int = 32
+    DEDUPE_THRESHOLD: float = 0.6
+    DEDUPE_SHINGLE_SIZE: int = 3
+    # Clusters at least this similar are matched without review.
+    DEDUPE_AUTO_MATCH: float = 0.9
+
+    # NIGO document validation
+    NIGO_MIN_CONFIDENCE: float = 0.6
+    NIGO_PARALLEL_MIN_BATCH: int = 5000
+    NIGO_CHUNK_SIZE: int = 2000
+
+    # Background jobs
+    JOB_MAX_WORKERS: int = 4
+    JOB_MAX_QUEUE: int = 1000
+    JOB_LEASE_SECONDS: float = 60.0  # requeue RUNNING jobs silent this long
+    JOB_MAX_ATTEMPTS: int = 3  # fail a job whose worker died this many times
+
+    # Execution layer keeping blocking work off the event loop
+    EXEC_OFFLOAD: bool = True
+    EXEC_IO_WORKERS: int = 16
+    EXEC_CPU_WORKERS: int = 0  # 0 = one per CPU
+    EXEC_MAX_PENDING: int = 256  # per pool, beyond its workers
+    EXEC_CPU_MIN_ITEMS: int = 200  # smaller batches stay in the I/O pool
+
+    # Multi-worker deployment (gunicorn.conf.py). Each worker's DB pool gets an
+    # equal share of the connection budget; caches stay coherent by polling
+    # the cache_invalidations table.
+    WEB_CONCURRENCY: int = 1
+    DB_CONNECTION_BUDGET: int = 40
+    DB_POOL_TIMEOUT: float = 30.0
+    CACHE_INVALIDATION_POLL: float = 1.0  # seconds; 0 disables the listener
+
+    # Request tracing: fraction of requests timed (SQL count, DB/serialize time)
+    TRACE_SAMPLE_RATE: float = 0.1
+    # Dev/test SQL debugging: trace every request, flag repeated statements
+    # (likely N+1) and log slow ones with redacted parameters.
+    SQL_DEBUG: bool = False
+    SQL_REPEAT_THRESHOLD: int = 5
+    SQL_SLOW_QUERY_MS: float = 100.0
+
+    # Rendered meeting packs, content-addressed by household snapshot hash
+    MEETING_PACK_DIR: str = "artifacts/meeting_packs"
+
+    # Named database snapshots (SQLite files; Postgres uses template databases)
+    SNAPSHOT_DIR: str = "artifacts/snapshots"
+
+    # Communication drafting
+    COMM_TEMPLATE_CACHE_SIZE: int = 256
+    COMM_BATCH_FETCH_SIZE: int = 500
+
+    # Compliance phrase list for draft scanning, reloaded when it changes
+    COMPLIANCE_PHRASES_PATH: str = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data", "compliance_phrases.csv"
+    )
+    COMPLIANCE_RELOAD_INTERVAL: float = 2.0
+
     CORS_ALLOW_ORIGINS: str = os.getenv(
         "CORS_ALLOW_ORIGINS",
         "http://localhost:5173,http://127.0.0.1:5173",
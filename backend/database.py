@@ -3,15 +3,34 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 
 from backend.config import settings
 
+
+def pool_limits(budget: int, workers: int) -> dict:
+    """
+    Splits the global connection budget evenly across worker processes;
+    a quarter of each worker's share is overflow for bursts.
+    """
+    share = max(budget // max(workers, 1), 2)
+    overflow = share // 4
+    return {"pool_size": share - overflow, "max_overflow": overflow}
+
+
 # Handling for SQLite vs Postgres connection strings
 connect_args = {}
+engine_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+else:
+    engine_args = {
+        **pool_limits(settings.DB_CONNECTION_BUDGET, settings.WEB_CONCURRENCY),
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     echo=False,  # Set to True to see SQL queries
+    **engine_args,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
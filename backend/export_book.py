@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Export the transition book to Parquet files.
+
+    python backend/export_book.py --out exports/full
+    python backend/export_book.py --out exports/delta --since 2026-03-01T00:00:00Z
+
+Writes households, accounts, tasks, documents and audit events (or the
+--tables given) as zstd-compressed Parquet in fixed-size row groups, plus
+a manifest.json. Pass a previous manifest with --since-manifest to export
+only what changed since that export (its `next_since`).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the book as Parquet")
+    parser.add_argument("--out", required=True, help="Folder to write the files to")
+    parser.add_argument(
+        "--db",
+        default=os.getenv("DATABASE_URL", "sqlite:///./transition_os.db"),
+        help="Database URL (overrides DATABASE_URL)",
+    )
+    since = parser.add_mutually_exclusive_group()
+    since.add_argument(
+        "--since", default=None, help="Only rows changed at or after this ISO time"
+    )
+    since.add_argument(
+        "--since-manifest",
+        default=None,
+        help="Only rows changed since the export that wrote this manifest.json",
+    )
+    parser.add_argument(
+        "--tables",
+        default=None,
+        help="Comma-separated tables to export (default: all)",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=None,
+        help="Rows per Parquet row group (and per cursor fetch)",
+    )
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.db
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from backend.importer.schema import parse_dt
+    from backend.services.export import ROW_GROUP_SIZE, export_book
+
+    if args.since_manifest:
+        manifest = json.loads(Path(args.since_manifest).read_text())
+        args.since = manifest["next_since"]
+    try:
+        since = parse_dt(args.since)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    from backend.database import engine
+
+    started = time.perf_counter()
+    try:
+        manifest = export_book(
+            engine,
+            Path(args.out),
+            since=since,
+            tables=args.tables.split(",") if args.tables else None,
+            row_group_size=args.row_group_size or ROW_GROUP_SIZE,
+        )
+    except KeyError as exc:
+        parser.error(exc.args[0])
+    elapsed = time.perf_counter() - started
+
+    total = sum(manifest["tables"].values())
+    print(f"✅ Exported {total:,} rows in {elapsed:.1f}s to {args.out}")
+    for table, count in manifest["tables"].items():
+        print(f"   {table + ':':<14}{count:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Multi-worker deployment:
+
+    python -m backend.migrations
+    WEB_CONCURRENCY=4 gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+The app is imported once in the master and forked into each worker, so
+workers start without re-importing it and share its memory pages until
+they write to them. Each worker's DB pool is an equal share of
+DB_CONNECTION_BUDGET (see backend/database.py); per-worker caches stay
+coherent through backend/services/invalidation.py.
+"""
+
+import os
+
+from backend.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# A worker restarted after a crash re-forks from the preloaded master.
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    from backend.database import engine
+    from backend.logging_config import restart_after_fork
+
+    # Connections opened by the master must not be shared with the child;
+    # drop the inherited pool without closing the parent's sockets.
+    engine.dispose(close=False)
+    restart_after_fork()
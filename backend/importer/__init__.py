@@ -0,0 +1,608 @@
+"""
+Bulk loader for Transition OS datasets (the demo CSV/JSONL layout, and
+custodian extracts in the same shape).
+
+Rows are streamed from the source files and written in chunks with Core
+`executemany`; no ORM objects are built. Tables that later tables point at
+are inserted with `INSERT ... RETURNING`, and the returned ids fill a
+source-id -> row-id map per table. Those maps, one entry per parent row,
+are the only state that grows with the dataset. Leaf tables (documents,
+audit events) go through `COPY` on Postgres.
+
+Rows are keyed by their source ids, so re-importing into a populated
+database upserts: only new rows and rows whose content hash changed are
+written, which keeps a nightly refresh proportional to the delta.
+
+Each table is a stage that waits only for the tables it references (see
+`DatasetImporter.stages`). With `parallel=True`, source files are parsed
+in child processes and independent stages load in their own connections
+at the same time; SQLite allows one writer, so there the stages take
+turns writing and only the parsing overlaps.
+
+Rows are validated against their file's schema (`rows.SCHEMAS`) as they
+are parsed, and so are references to parent rows. Invalid rows are
+counted as "rejected" and, given a `reject_path`, written there with
+their reasons instead of being loaded.
+"""
+
+import logging
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable, Container, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Table, bindparam, func, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from backend.importer.rows import (
+    DatasetDir,
+    Source,
+    chunked,
+    keyed,
+    parse_account,
+    parse_advisor,
+    parse_audit_event,
+    parse_chunks,
+    parse_document,
+    parse_household,
+    parse_task,
+    parse_task_link,
+    scan_tasks,
+)
+from backend.importer.schema import Reject, RejectFile
+from backend.importer.stages import ParsedFile, Stage, StageTiming, run_stages
+from backend.importer.writers import insert_returning, insert_rows
+from backend.models import (
+    Account,
+    Advisor,
+    AuditEvent,
+    Document,
+    Household,
+    Task,
+    Workflow,
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+
+# The source id column of each tombstoned table's file.
+SOURCE_KEYS = {
+    "households": "household_id",
+    "accounts": "account_id",
+    "documents": "doc_id",
+    "tasks": "task_id",
+}
+
+
+class DatasetImporter:
+    """
+    Loads one dataset (a directory, or any other `Source`), parents before
+    children. Each table is committed once all its chunks are written.
+
+    Every row records its source id and a hash of its imported values. On
+    an empty database (`incremental=False`) rows are simply inserted;
+    otherwise they are matched by source id, and only new rows are
+    inserted and only rows whose hash changed are updated. With
+    `tombstone`, rows whose source id is no longer in the dataset get
+    `deleted_at` set. Rows without a source id cannot be matched and are
+    always inserted.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        source: Path | Source,
+        chunk_size: int = CHUNK_SIZE,
+        incremental: bool = False,
+        tombstone: bool = False,
+        parallel: bool = False,
+        reject_path: Path | None = None,
+        progress: Callable[[str, int], None] | None = None,
+    ):
+        self.engine = engine
+        # A dataset directory, or any other Source (see rows.py).
+        self.source = source if hasattr(source, "rows") else DatasetDir(source)
+        self.chunk_size = chunk_size
+        self.incremental = incremental
+        self.tombstone = tombstone and incremental
+        self.parallel = parallel
+        self.rejects = RejectFile(reject_path) if reject_path else None
+        # Called with (stage, source rows read so far) after every chunk.
+        self.progress = progress
+        self._rows_read: Counter = Counter()
+        # Source ids of rejected rows, which tombstoning leaves alone: the
+        # row is still in the source, only this version of it is invalid.
+        self._rejected_ids: dict[str, set[str]] = defaultdict(set)
+        # Source id -> row id, filled from RETURNING (or the existing rows).
+        self.advisor_ids: dict[str, int] = {}
+        self.workflow_ids: dict[str, int] = {}
+        self.household_ids: dict[str, int] = {}
+        self.account_ids: dict[str, int] = {}
+        self.task_ids: dict[str, int] = {}
+        self.default_advisor_id: int | None = None
+        # Filled by the tasks pre-scan for the workflow and household stages.
+        self.workflow_times: dict[str, dict] = {}
+        self.household_eta: dict[str, datetime] = {}
+        # Table -> inserted/updated/unchanged/tombstoned/rejected row counts.
+        self.stats: dict[str, Counter] = defaultdict(Counter)
+        # Stage -> rows and seconds, filled by `run`.
+        self.timings: dict[str, StageTiming] = {}
+        # Incremental runs relink only tasks written this run.
+        self._written_tasks: set[str] = set()
+        # SQLite has a single writer: parallel stages would only wait on
+        # each other's locks (or fail with "database is locked").
+        self._write_slot = (
+            threading.Lock() if engine.dialect.name == "sqlite" else nullcontext()
+        )
+
+    def stages(self) -> list[Stage]:
+        """
+        The load DAG. Each id map is released once the stages reading it
+        are done, so the peak is the household, workflow and task maps
+        while tasks load. Sequential runs go in the order listed.
+        """
+        return [
+            Stage("scan", self.scan_tasks, release=self._release_scan),
+            Stage("advisors", self.load_advisors),
+            Stage(
+                "workflows",
+                self.load_workflows,
+                after=("advisors", "scan"),
+                release=self.workflow_ids.clear,
+            ),
+            Stage(
+                "households",
+                self.load_households,
+                after=("advisors", "scan"),
+                release=self.household_ids.clear,
+            ),
+            Stage(
+                "accounts",
+                self.load_accounts,
+                after=("households",),
+                release=self.account_ids.clear,
+            ),
+            Stage("documents", self.load_documents, after=("households", "accounts")),
+            Stage("tasks", self.load_tasks, after=("workflows", "households")),
+            Stage("task_links", self.link_task_dependencies, after=("tasks",)),
+            Stage("audit_events", self.load_audit_events),
+        ]
+
+    def run(self) -> dict[str, int]:
+        try:
+            self.timings = run_stages(self.stages(), parallel=self.parallel)
+        finally:
+            if self.rejects:
+                self.rejects.close()
+        rejected = sum(stats["rejected"] for stats in self.stats.values())
+        if rejected:
+            target = self.rejects.path if self.rejects else "no reject file"
+            logger.warning(f"Rejected {rejected} invalid rows ({target})")
+        return self.counts()
+
+    def _parsed(
+        self, stage: str, filename: str, parse: Callable, validate: bool = True
+    ) -> Iterator[list[tuple[int, Any]]]:
+        """
+        Chunks of (line number, parsed row) for the valid rows of a file,
+        with rejects recorded against `stage`. A second pass over a file
+        turns `validate` off.
+        """
+        read = ParsedFile if self.parallel else parse_chunks
+        # Created here rather than in the generator, so a parser process
+        # starts before the stage waits for its transaction.
+        return self._tracked(
+            stage, read(self.source, filename, parse, self.chunk_size, validate)
+        )
+
+    def _tracked(
+        self,
+        stage: str,
+        chunks: Iterable[tuple[list, list[Reject]]],
+    ) -> Iterator[list[tuple[int, Any]]]:
+        if self.progress:
+            self.progress(stage, 0)
+        for parsed, rejects in chunks:
+            self._reject(stage, rejects)
+            self._rows_read[stage] += len(parsed) + len(rejects)
+            if self.progress:
+                self.progress(stage, self._rows_read[stage])
+            yield parsed
+
+    def _reject(self, table: str, rejects: list[Reject]) -> None:
+        if not rejects:
+            return
+        self.stats[table]["rejected"] += len(rejects)
+        if self.tombstone and table in SOURCE_KEYS:
+            self._rejected_ids[table].update(
+                reject.row.get(SOURCE_KEYS[table])
+                for reject in rejects
+                if isinstance(reject.row, dict)
+            )
+        if self.rejects:
+            self.rejects.write(rejects)
+
+    def _reject_orphans(self, table: str, filename: str, orphans: list) -> None:
+        """Rejects (line, source id, household id) rows of an unknown household."""
+        self._reject(
+            table,
+            [
+                Reject(
+                    filename,
+                    line,
+                    [f"household_id: unknown household {household!r}"],
+                    {SOURCE_KEYS[table]: source_id, "household_id": household},
+                )
+                for line, source_id, household in orphans
+            ],
+        )
+
+    @contextmanager
+    def _transaction(self):
+        with self._write_slot, self.engine.begin() as conn:
+            yield conn
+
+    def _write(
+        self,
+        conn: Connection,
+        table: Table,
+        rows: list[dict],
+        need_ids: bool = True,
+        written: set[str] | None = None,
+    ) -> list[int | None]:
+        """
+        Writes keyed rows (see `keyed`) and returns their row ids in order;
+        ids of new rows are None unless `need_ids`. Source ids of rows
+        inserted or updated by an incremental run are added to `written`.
+        """
+        stats = self.stats[table.name]
+        if not self.incremental:
+            stats["inserted"] += len(rows)
+            if need_ids:
+                return insert_returning(conn, table, rows)
+            insert_rows(conn, table, rows)
+            return [None] * len(rows)
+
+        tombstoned = "deleted_at" in table.c
+        columns = [table.c.source_id, table.c.id, table.c.source_hash]
+        if tombstoned:
+            columns.append(table.c.deleted_at)
+        keys = {row["source_id"] for row in rows if row["source_id"] is not None}
+        existing = {
+            match.source_id: match
+            for match in conn.execute(
+                select(*columns).where(table.c.source_id.in_(keys))
+            )
+        }
+        ids: list[int | None] = []
+        new, changed = [], []
+        for row in rows:
+            match = existing.get(row["source_id"])
+            if match is None:
+                ids.append(None)
+                new.append(row)
+                continue
+            ids.append(match.id)
+            if match.source_hash != row["source_hash"] or (
+                tombstoned and match.deleted_at is not None
+            ):
+                if tombstoned:
+                    row = {**row, "deleted_at": None}
+                changed.append(
+                    {"b_id": match.id, **{f"b_{k}": v for k, v in row.items()}}
+                )
+        if changed:
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values({k[2:]: bindparam(k) for k in changed[0] if k != "b_id"}),
+                changed,
+            )
+        if new and need_ids:
+            new_ids = iter(insert_returning(conn, table, new))
+            ids = [next(new_ids) if i is None else i for i in ids]
+        elif new:
+            insert_rows(conn, table, new)
+        if written is not None:
+            written.update(row["source_id"] for row in new if row["source_id"])
+            written.update(row["b_source_id"] for row in changed)
+        stats["inserted"] += len(new)
+        stats["updated"] += len(changed)
+        stats["unchanged"] += len(rows) - len(new) - len(changed)
+        return ids
+
+    def _tombstone(self, table: Table, seen: Container[str]) -> None:
+        """
+        Marks live imported rows whose source id is not in `seen` deleted.
+        """
+        if not self.tombstone:
+            return
+        with self._transaction() as conn:
+            missing = [
+                row.id
+                for row in conn.execute(
+                    select(table.c.id, table.c.source_id).where(
+                        table.c.source_id.is_not(None), table.c.deleted_at.is_(None)
+                    )
+                )
+                if row.source_id not in seen
+                and row.source_id not in self._rejected_ids[table.name]
+            ]
+            deleted_at = datetime.now(timezone.utc)
+            for ids in chunked(missing, self.chunk_size):
+                conn.execute(
+                    update(table)
+                    .where(table.c.id.in_(ids))
+                    .values(deleted_at=deleted_at)
+                )
+        self.stats[table.name]["tombstoned"] += len(missing)
+
+    def scan_tasks(self) -> int:
+        if self.parallel:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                self.workflow_times, self.household_eta = pool.submit(
+                    scan_tasks, self.source
+                ).result()
+        else:
+            self.workflow_times, self.household_eta = scan_tasks(self.source)
+        return len(self.workflow_times) + len(self.household_eta)
+
+    def _release_scan(self) -> None:
+        self.workflow_times = {}
+        self.household_eta = {}
+
+    def load_advisors(self) -> int:
+        table = Advisor.__table__
+        count = 0
+        chunks = self._parsed("advisors", "advisors.csv", parse_advisor)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                count += len(chunk)
+                emails = {values["email"] for _, (_, values) in chunk}
+                existing = dict(
+                    conn.execute(
+                        select(table.c.email, table.c.id).where(
+                            table.c.email.in_(emails)
+                        )
+                    ).all()
+                )
+                # The same advisor can appear twice in one chunk.
+                new = list(
+                    {
+                        values["email"]: values
+                        for _, (_, values) in chunk
+                        if values["email"] not in existing
+                    }.values()
+                )
+                existing.update(
+                    zip((v["email"] for v in new), insert_returning(conn, table, new))
+                )
+                self.stats[table.name]["inserted"] += len(new)
+                self.stats[table.name]["unchanged"] += len(chunk) - len(new)
+                for _, (source_id, values) in chunk:
+                    advisor_id = existing[values["email"]]
+                    self.advisor_ids[source_id] = advisor_id
+                    if self.default_advisor_id is None:
+                        self.default_advisor_id = advisor_id
+        if self.default_advisor_id is None:
+            raise ValueError("Dataset has no valid advisors")
+        return count
+
+    def load_workflows(self) -> int:
+        with self._transaction() as conn:
+            for chunk in chunked(self.workflow_times.items(), self.chunk_size):
+                ids = self._write(
+                    conn,
+                    Workflow.__table__,
+                    [
+                        keyed(
+                            wf_id,
+                            {
+                                "advisor_id": self.default_advisor_id,
+                                "name": f"Transition Workflow {wf_id or 'WF'}",
+                                "type": "RECRUITED_ADVISOR",
+                                "started_at": timing.get("started_at"),
+                                "target_completion_at": timing.get(
+                                    "target_completion_at"
+                                ),
+                            },
+                        )
+                        for wf_id, timing in chunk
+                    ],
+                )
+                self.workflow_ids.update(zip((wf_id for wf_id, _ in chunk), ids))
+        return len(self.workflow_ids)
+
+    def load_households(self) -> int:
+        table = Household.__table__
+        chunks = self._parsed("households", "households.csv", parse_household)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                ids = self._write(
+                    conn,
+                    table,
+                    [
+                        keyed(
+                            household_id,
+                            {
+                                **values,
+                                "advisor_id": self.advisor_ids.get(
+                                    advisor, self.default_advisor_id
+                                ),
+                                "eta_date": self.household_eta.get(household_id),
+                            },
+                        )
+                        for _, (household_id, advisor, values) in chunk
+                    ],
+                )
+                self.household_ids.update(zip((item[0] for _, item in chunk), ids))
+        self._tombstone(table, self.household_ids)
+        return len(self.household_ids)
+
+    def load_accounts(self) -> int:
+        table = Account.__table__
+        chunks = self._parsed("accounts", "accounts.csv", parse_account)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                rows, orphans = [], []
+                for line, (account_id, household, values) in chunk:
+                    if household in self.household_ids:
+                        rows.append((account_id, household, values))
+                    else:
+                        orphans.append((line, account_id, household))
+                self._reject_orphans(table.name, "accounts.csv", orphans)
+                ids = self._write(
+                    conn,
+                    table,
+                    [
+                        keyed(
+                            account_id,
+                            {**values, "household_id": self.household_ids[household]},
+                        )
+                        for account_id, household, values in rows
+                    ],
+                )
+                self.account_ids.update(zip((row[0] for row in rows), ids))
+        self._tombstone(table, self.account_ids)
+        return len(self.account_ids)
+
+    def load_documents(self) -> int:
+        table = Document.__table__
+        parse = partial(parse_document, docs_dir=self.source.docs_dir)
+        seen: set[str] = set()
+        count = 0
+        chunks = self._parsed("documents", "documents.csv", parse)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                rows, orphans = [], []
+                for line, (doc_id, household, account, values) in chunk:
+                    if household in self.household_ids:
+                        rows.append((doc_id, household, account, values))
+                    else:
+                        orphans.append((line, doc_id, household))
+                self._reject_orphans(table.name, "documents.csv", orphans)
+                if self.tombstone:
+                    seen.update(row[0] for row in rows)
+                count += len(rows)
+                self._write(
+                    conn,
+                    table,
+                    [
+                        keyed(
+                            doc_id,
+                            {
+                                **values,
+                                "household_id": self.household_ids[household],
+                                "account_id": self.account_ids.get(account),
+                            },
+                        )
+                        for doc_id, household, account, values in rows
+                    ],
+                    need_ids=False,
+                )
+        self._tombstone(table, seen)
+        return count
+
+    def load_tasks(self) -> int:
+        table = Task.__table__
+        chunks = self._parsed("tasks", "tasks.csv", parse_task)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                rows = [
+                    keyed(
+                        task_id,
+                        {
+                            **values,
+                            "workflow_id": self.workflow_ids[workflow],
+                            "household_id": self.household_ids.get(household),
+                        },
+                        # Relinking is a separate pass; a changed dependency
+                        # must still mark the task changed.
+                        extra={"depends_on": depends_on},
+                    )
+                    for _, (task_id, workflow, household, depends_on, values) in chunk
+                ]
+                ids = self._write(conn, table, rows, written=self._written_tasks)
+                self.task_ids.update(zip((item[0] for _, item in chunk), ids))
+        self._tombstone(table, self.task_ids)
+        return len(self.task_ids)
+
+    def link_task_dependencies(self) -> int:
+        """
+        Second pass over tasks: blockers may come later in the file, so
+        links are set once every task has an id. Incremental runs relink
+        only tasks that, or whose blocker, were inserted or updated.
+        """
+        table = Task.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("task_id"))
+            .values(blocked_by_task_id=bindparam("blocker_id"))
+        )
+        count = 0
+        # Rejected tasks never got an id, so their links are skipped below.
+        chunks = self._parsed(
+            "task_links", "tasks.csv", parse_task_link, validate=False
+        )
+        with self._transaction() as conn:
+            for chunk in chunks:
+                pairs = [item for _, item in chunk]
+                if self.incremental:
+                    pairs = [
+                        (task_id, depends_on)
+                        for task_id, depends_on in pairs
+                        if task_id in self._written_tasks
+                        or depends_on in self._written_tasks
+                    ]
+                links = [
+                    {
+                        "task_id": self.task_ids[task_id],
+                        "blocker_id": self.task_ids.get(depends_on or ""),
+                    }
+                    for task_id, depends_on in pairs
+                    if task_id in self.task_ids
+                ]
+                if not self.incremental:
+                    links = [link for link in links if link["blocker_id"] is not None]
+                if links:
+                    conn.execute(statement, links)
+                count += len(links)
+        return count
+
+    def load_audit_events(self) -> int:
+        imported_at = datetime.utcnow()
+        count = 0
+        chunks = self._parsed("audit_events", "audit_events.jsonl", parse_audit_event)
+        with self._transaction() as conn:
+            for chunk in chunks:
+                rows = [keyed(event_id, values) for _, (event_id, values) in chunk]
+                for row in rows:
+                    # Not part of the hash: it differs on every run.
+                    row["created_at"] = row["created_at"] or imported_at
+                self._write(conn, AuditEvent.__table__, rows, need_ids=False)
+                count += len(rows)
+        return count
+
+    def counts(self) -> dict[str, int]:
+        with self.engine.connect() as conn:
+            return {
+                model.__tablename__: conn.execute(
+                    select(func.count()).select_from(model.__table__)
+                ).scalar()
+                for model in (
+                    Advisor,
+                    Household,
+                    Account,
+                    Workflow,
+                    Task,
+                    Document,
+                    AuditEvent,
+                )
+            }
@@ -0,0 +1,331 @@
+"""
+Source readers, validation schemas and row mapping.
+
+Nothing here touches the database, so parsing can run in worker
+processes. Each source file has a `Schema` in SCHEMAS; rows that fail it
+are set aside as rejects before mapping, so the mappers only ever see
+values they can convert. Each `parse_*` function turns one valid row into
+the source keys the loader resolves to row ids plus the column values
+that need no lookup; the loader adds the foreign keys and the content
+hash (`keyed`).
+"""
+
+import csv
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Protocol
+
+from backend.importer.schema import Field, Reject, Schema, parse_dt
+
+HIGH_SEVERITY_NIGO = {"MISSING_SIGNATURE", "PLAN_TYPE_MISMATCH", "ILLEGIBLE"}
+
+
+def slugify(value: str) -> str:
+    cleaned = "".join(ch.lower() if ch.isalnum() else "." for ch in value.strip())
+    cleaned = ".".join(filter(None, cleaned.split(".")))
+    return cleaned or "demo"
+
+
+def read_csv(path: Path) -> Iterator[tuple[int, dict[str, str]]]:
+    """Yields (line number, row); a quoted value may span several lines."""
+    with path.open(newline="", encoding="ascii") as handle:
+        reader = csv.DictReader(handle)
+        line = 2
+        for row in reader:
+            yield line, row
+            line = reader.line_num + 1
+
+
+def read_jsonl(path: Path) -> Iterator[tuple[int, Any]]:
+    """Yields (line number, object); a line that is not JSON comes as text."""
+    with path.open(encoding="ascii") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, line
+
+
+def read_rows(path: Path) -> Iterator[tuple[int, Any]]:
+    return read_jsonl(path) if path.suffix == ".jsonl" else read_csv(path)
+
+
+class Source(Protocol):
+    """
+    Where the source rows come from, by file name ("tasks.csv", ...).
+    Sources are pickled into the parser processes, so they hold only
+    what they need to (re)open their rows.
+    """
+
+    docs_dir: Path
+
+    def rows(self, name: str) -> Iterator[tuple[int, Any]]: ...
+
+
+class DatasetDir:
+    """A dataset directory in the demo layout."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.docs_dir = self.path / "docs"
+
+    def rows(self, name: str) -> Iterator[tuple[int, Any]]:
+        return read_rows(self.path / name)
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def keyed(source_id: str | None, values: dict, extra: dict | None = None) -> dict:
+    """
+    Adds the source id and a hash of the values (plus any `extra` source
+    fields that are not stored as columns) to a row.
+    """
+    # repr of plain values (str, numbers, datetimes, JSON-like dicts and
+    # lists built the same way each run) is stable and much cheaper than
+    # a sorted JSON dump.
+    content = repr(sorted({**values, **(extra or {})}.items())).encode()
+    return {
+        **values,
+        "source_id": source_id or None,
+        "source_hash": hashlib.blake2b(content, digest_size=16).hexdigest(),
+    }
+
+
+# --- Column values ---
+
+
+def advisor_values(row: dict) -> dict:
+    name = (row.get("advisor_name") or "Demo Advisor").strip()
+    start_date = parse_dt(row.get("start_date"))
+    experience_years = 0
+    if start_date:
+        delta = datetime.utcnow() - start_date.replace(tzinfo=None)
+        experience_years = max(0, int(delta.days / 365))
+    return {
+        "name": name,
+        "email": f"{slugify(name)}@example.com",
+        "channel": (row.get("channel") or "independent").strip(),
+        "experience_years": experience_years,
+    }
+
+
+def household_values(row: dict) -> dict:
+    """Without advisor_id and eta_date."""
+    stall_risk = float(row.get("stall_risk") or 0)
+    attrition_risk = float(row.get("attrition_risk") or 0)
+    return {
+        "name": row.get("household_name") or row.get("household_id", ""),
+        "status": row.get("status") or "IN_PROGRESS",
+        "risk_score": round((stall_risk + attrition_risk) / 2.0, 1),
+    }
+
+
+def account_values(row: dict) -> dict:
+    """Without household_id."""
+    raw_type = (row.get("account_type") or "OTHER").upper()
+    if "TAXABLE" in raw_type or "BROKERAGE" in raw_type:
+        acct_type = "BROKERAGE"
+    elif "IRA" in raw_type:
+        acct_type = "IRA"
+    else:
+        acct_type = raw_type
+    return {
+        "account_number": row.get("account_id") or f"ACC-{row.get('household_id')}",
+        "type": acct_type,
+        "custodian": row.get("delivering_institution") or "Custodian Demo",
+        "status": row.get("status") or "PENDING",
+        "asset_value": float(row.get("estimated_assets_usd") or 0),
+        "delivering_plan_type": row.get("delivering_plan_type") or None,
+        "receiving_account_type": row.get("receiving_account_type") or None,
+    }
+
+
+def document_values(row: dict, docs_dir: Path) -> dict:
+    """Without household_id and account_id."""
+    raw_nigo = (row.get("nigo_status") or "OK").upper()
+    if raw_nigo == "OK":
+        nigo_status, defects = "CLEAN", None
+    else:
+        nigo_status = "DEFECTS_FOUND"
+        severity = "HIGH" if raw_nigo in HIGH_SEVERITY_NIGO else "MEDIUM"
+        defects = [
+            {"rule": raw_nigo, "severity": severity, "evidence": row.get("doc_type")}
+        ]
+    filename = row.get("filename") or "document.txt"
+    return {
+        "type": row.get("doc_type") or "OTHER",
+        "name": filename,
+        "storage_url": str(docs_dir / filename),
+        "nigo_status": nigo_status,
+        "defects_json": defects,
+    }
+
+
+def task_values(row: dict) -> dict:
+    """Without workflow_id and household_id."""
+    owner_queue = (row.get("owner_queue") or "Ops").upper()
+    owner_role = owner_queue if owner_queue in {"OPS", "COMPLIANCE"} else "ADVISOR"
+    status = row.get("status") or "PENDING"
+    priority = {"BREACHED": 3, "NEAR_BREACH": 2}.get(status, 1)
+    return {
+        "name": row.get("task_name") or "Task",
+        "owner_role": owner_role,
+        "status": status,
+        "priority": priority,
+        "sla_due_at": parse_dt(row.get("due_at")),
+    }
+
+
+def audit_values(row: dict) -> dict:
+    actor_role = (row.get("actor_role") or "system").upper()
+    return {
+        "created_at": parse_dt(row.get("timestamp")),
+        "actor_type": (
+            actor_role if actor_role in {"OPS", "COMPLIANCE", "ADVISOR"} else "SYSTEM"
+        ),
+        "actor_id": row.get("actor") or "system",
+        "event_type": row.get("event_type") or "EVENT",
+        "entity_type": row.get("entity_type"),
+        "entity_id": row.get("entity_id"),
+        "payload_json": row.get("payload") or {},
+    }
+
+
+# --- Parsers: source row -> (source keys..., values) ---
+
+
+def parse_advisor(row: dict) -> tuple[str, dict]:
+    values = advisor_values(row)
+    return row.get("advisor_id") or values["name"], values
+
+
+def parse_household(row: dict) -> tuple[str, str, dict]:
+    return row.get("household_id", ""), row.get("advisor_id", ""), household_values(row)
+
+
+def parse_account(row: dict) -> tuple[str, str, dict]:
+    return row.get("account_id", ""), row.get("household_id", ""), account_values(row)
+
+
+def parse_document(row: dict, docs_dir: Path) -> tuple[str, str, str, dict]:
+    return (
+        row.get("doc_id", ""),
+        row.get("household_id", ""),
+        row.get("account_id") or "",
+        document_values(row, docs_dir),
+    )
+
+
+def parse_task(row: dict) -> tuple[str, str, str, str | None, dict]:
+    return (
+        row.get("task_id", ""),
+        row.get("workflow_id", ""),
+        row.get("household_id", ""),
+        row.get("depends_on_task_id") or None,
+        task_values(row),
+    )
+
+
+def parse_task_link(row: dict) -> tuple[str, str | None]:
+    return row.get("task_id", ""), row.get("depends_on_task_id") or None
+
+
+def parse_audit_event(row: dict) -> tuple[str, dict]:
+    return row.get("event_id", ""), audit_values(row)
+
+
+SCHEMAS = {
+    "advisors.csv": Schema(Field("start_date", "timestamp")),
+    "households.csv": Schema(
+        Field("household_id", required=True),
+        Field("stall_risk", "number"),
+        Field("attrition_risk", "number"),
+    ),
+    "accounts.csv": Schema(
+        Field("household_id", required=True),
+        Field("estimated_assets_usd", "number"),
+    ),
+    "documents.csv": Schema(Field("household_id", required=True)),
+    "tasks.csv": Schema(
+        Field("created_at", "timestamp"),
+        Field("due_at", "timestamp"),
+    ),
+    "audit_events.jsonl": Schema(
+        Field("timestamp", "timestamp"),
+        Field("actor_role", "text"),
+        Field("payload", "object"),
+    ),
+}
+
+
+def valid_rows(source: Source, name: str) -> Iterator[tuple[int, Any, list[str]]]:
+    """
+    (line number, row, reasons) for every row of a source file; `reasons`
+    is empty for rows that pass the file's schema.
+    """
+    schema = SCHEMAS.get(name)
+    for line, row in source.rows(name):
+        yield line, row, schema.errors(row) if schema else []
+
+
+def parse_chunks(
+    source: Source, name: str, parse: Callable, chunk_size: int, validate: bool = True
+) -> Iterator[tuple[list[tuple[int, Any]], list[Reject]]]:
+    """
+    Per chunk of source rows: the (line number, parse(row)) pairs of the
+    valid rows, and the rejects. Without `validate` (a second pass over a
+    file whose rejects are already known) every row is parsed.
+    """
+    schema = SCHEMAS.get(name) if validate else None
+    for chunk in chunked(source.rows(name), chunk_size):
+        parsed, rejects = [], []
+        for line, row in chunk:
+            reasons = schema.errors(row) if schema else None
+            if reasons:
+                rejects.append(Reject(name, line, reasons, row))
+            else:
+                parsed.append((line, parse(row)))
+        yield parsed, rejects
+
+
+def scan_tasks(source: Source) -> tuple[dict[str, dict], dict[str, datetime]]:
+    """
+    First pass over tasks: each workflow's time span and each household's
+    ETA (its "Transition complete" task, else its latest due date).
+    Tasks without a workflow id share one fallback workflow, keyed "".
+    Invalid rows are skipped here; the tasks stage reports them.
+    """
+    workflow_times: dict[str, dict] = {}
+    household_eta: dict[str, datetime] = {}
+    for _, row, reasons in valid_rows(source, "tasks.csv"):
+        if reasons:
+            continue
+        created_at = parse_dt(row.get("created_at"))
+        due_at = parse_dt(row.get("due_at"))
+        entry = workflow_times.setdefault(row.get("workflow_id", ""), {})
+        if created_at and created_at < entry.get("started_at", created_at):
+            entry["started_at"] = created_at
+        entry.setdefault("started_at", created_at)
+        if due_at and due_at > entry.get("target_completion_at", due_at):
+            entry["target_completion_at"] = due_at
+        entry.setdefault("target_completion_at", due_at)
+
+        household_id = row.get("household_id", "")
+        if household_id and due_at:
+            if (row.get("task_name") or "").strip() == "Transition complete":
+                household_eta[household_id] = due_at
+            elif due_at > household_eta.get(household_id, due_at):
+                household_eta[household_id] = due_at
+            household_eta.setdefault(household_id, due_at)
+    return workflow_times, household_eta
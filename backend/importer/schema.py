@@ -0,0 +1,154 @@
+"""
+Row validation for source files, and the reject file.
+
+A `Schema` is compiled once per file type into a flat list of per-field
+checks, so validating a row is one pass over that list with no lookups.
+A row that fails any check is not loaded; it goes to the reject file with
+every reason it failed, one JSON object per line:
+
+    {"file": "tasks.csv", "line": 42, "reasons": ["due_at: ..."], "row": {...}}
+
+Schemas hold only plain data and module-level functions, so they pickle
+into the parser processes.
+"""
+
+import json
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+
+def parse_dt(value: str | None) -> datetime | None:
+    """
+    ISO 8601 timestamp (a trailing "Z" means UTC); None for an empty value.
+    Raises ValueError for anything else.
+    """
+    if not value:
+        return None
+    text = value.strip()
+    if not text:
+        return None
+    if text.endswith("Z"):
+        text = text.replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"not an ISO 8601 timestamp: {value!r}") from None
+
+
+def _check_text(value: Any) -> None:
+    if not isinstance(value, str):
+        raise ValueError(f"expected text, got {type(value).__name__}")
+
+
+def _check_number(value: Any) -> None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"not a number: {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"not a finite number: {value!r}")
+
+
+def _check_timestamp(value: Any) -> None:
+    if not isinstance(value, str):
+        raise ValueError(f"expected a timestamp string, got {type(value).__name__}")
+    parse_dt(value)
+
+
+def _check_object(value: Any) -> None:
+    if not isinstance(value, dict):
+        raise ValueError(f"expected an object, got {type(value).__name__}")
+
+
+CHECKS = {
+    "text": _check_text,
+    "number": _check_number,
+    "timestamp": _check_timestamp,
+    "object": _check_object,
+}
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    kind: str = "text"
+    required: bool = False
+
+
+class Schema:
+    def __init__(self, *fields: Field):
+        unknown = {field.kind for field in fields} - CHECKS.keys()
+        if unknown:
+            raise ValueError(f"Unknown field kinds {sorted(unknown)}")
+        self.fields = fields
+        self._checks = [
+            (field.name, field.required, CHECKS[field.kind]) for field in fields
+        ]
+
+    def errors(self, row: Any) -> list[str]:
+        """
+        Every reason `row` is invalid; empty when it is valid. Columns the
+        schema does not name are not checked.
+        """
+        if not isinstance(row, dict):
+            return ["not a JSON object"]
+        errors = []
+        if None in row:
+            # csv.DictReader files surplus values under the key None.
+            errors.append(f"{len(row[None])} more values than header columns")
+        for name, required, check in self._checks:
+            value = row.get(name)
+            if value is None or value == "":
+                if required:
+                    errors.append(f"{name}: missing")
+                continue
+            try:
+                check(value)
+            except ValueError as exc:
+                errors.append(f"{name}: {exc}")
+        return errors
+
+
+class Reject(NamedTuple):
+    file: str
+    line: int
+    reasons: list[str]
+    row: Any
+
+
+class RejectFile:
+    """
+    Writes rejects as JSON lines. The file is only created once there is
+    something to write (a previous run's file is removed up front, so it
+    never outlives a clean run); writes from parallel stages are serialized.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.unlink(missing_ok=True)
+        self.count = 0
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def write(self, rejects: list[Reject]) -> None:
+        if not rejects:
+            return
+        with self._lock:
+            if self._handle is None:
+                self._handle = self.path.open("w", encoding="utf-8")
+            for reject in rejects:
+                self._handle.write(
+                    json.dumps(reject._asdict(), default=str, ensure_ascii=False)
+                )
+                self._handle.write("\n")
+            self.count += len(rejects)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
@@ -0,0 +1,218 @@
+"""
+Dependency-ordered stage runner and out-of-process file parsing.
+
+A stage loads one table (or computes something later stages need) and
+names the stages it must wait for. `run_stages` starts every stage whose
+dependencies are done, in parallel threads when asked to, and times each
+one. `ParsedFile` reads, validates and parses a source file in a child
+process and hands its chunks over through a bounded queue, so parsing
+overlaps with the database writes without buffering the file.
+"""
+
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TextIO
+
+from backend.importer.rows import Source, parse_chunks
+
+# Chunks a parser may run ahead of its stage.
+PREFETCH = 2
+
+
+@dataclass
+class Stage:
+    name: str
+    # Returns the number of rows the stage wrote (or computed).
+    run: Callable[[], int]
+    after: tuple[str, ...] = ()
+    # Frees state the stage built once every stage that depends on it is done.
+    release: Callable[[], None] | None = None
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def ordered(stages: list[Stage]) -> list[Stage]:
+    """
+    Topological order of `stages`: the first declared stage whose
+    dependencies are done comes next. Raises ValueError on unknown
+    dependencies and cycles.
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        unknown = set(stage.after) - names
+        if unknown:
+            raise ValueError(f"Stage {stage.name} depends on unknown {sorted(unknown)}")
+    done: set[str] = set()
+    order: list[Stage] = []
+    waiting = list(stages)
+    while waiting:
+        stage = next((s for s in waiting if done.issuperset(s.after)), None)
+        if stage is None:
+            raise ValueError(
+                f"Stage dependency cycle among {[s.name for s in waiting]}"
+            )
+        order.append(stage)
+        done.add(stage.name)
+        waiting.remove(stage)
+    return order
+
+
+def run_stages(stages: list[Stage], parallel: bool = False) -> dict[str, StageTiming]:
+    """
+    Runs every stage after its dependencies and returns their timings in
+    completion order. With `parallel`, independent stages run in separate
+    threads; the first failure cancels the stages not yet started and is
+    re-raised once the running ones finish.
+    """
+    order = ordered(stages)
+    dependents = {
+        stage.name: {s.name for s in stages if stage.name in s.after}
+        for stage in stages
+    }
+    by_name = {stage.name: stage for stage in stages}
+    timings: dict[str, StageTiming] = {}
+
+    def finished(stage: Stage, timing: StageTiming) -> None:
+        timings[stage.name] = timing
+        for name in (stage.name, *stage.after):
+            producer = by_name[name]
+            if producer.release and dependents[name].issubset(timings):
+                producer.release()
+
+    if not parallel:
+        for stage in order:
+            finished(stage, _timed(stage))
+        return timings
+
+    with ThreadPoolExecutor(len(stages), thread_name_prefix="importer") as pool:
+        waiting = order
+        running = {}
+        while waiting or running:
+            ready = [stage for stage in waiting if set(stage.after).issubset(timings)]
+            waiting = [stage for stage in waiting if stage not in ready]
+            running.update({pool.submit(_timed, stage): stage for stage in ready})
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                if future.exception() is not None:
+                    for other in running:
+                        other.cancel()
+                    raise future.exception()
+                finished(stage, future.result())
+    return timings
+
+
+def _timed(stage: Stage) -> StageTiming:
+    started = time.perf_counter()
+    rows = stage.run()
+    return StageTiming(rows, time.perf_counter() - started)
+
+
+class ProgressLog:
+    """
+    A `DatasetImporter` progress callback that prints each stage's rows read
+    and rows per second, at most every `interval` seconds per stage.
+    """
+
+    def __init__(self, interval: float = 2.0, stream: TextIO | None = None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._started: dict[str, float] = {}
+        self._printed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, rows: int) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            started = self._started.setdefault(stage, now)
+            if now - self._printed.get(stage, started) < self.interval:
+                return
+            self._printed[stage] = now
+            rate = rows / (now - started)
+            print(f"  {stage}: {rows:,} rows ({rate:,.0f} rows/s)", file=self.stream)
+
+
+class ParsedFile:
+    """
+    Iterates `parse_chunks(source, name, ...)` with the reading,
+    validation and parsing done in a spawned child process. `parse` must be
+    picklable (a module-level function or a `functools.partial` of one).
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        name: str,
+        parse: Callable,
+        chunk_size: int,
+        validate: bool = True,
+    ):
+        self.name = name
+        context = multiprocessing.get_context("spawn")
+        self._queue = context.Queue(PREFETCH)
+        self._process = context.Process(
+            target=_produce,
+            args=(source, name, parse, chunk_size, validate, self._queue),
+            name=f"parse-{name}",
+            daemon=True,
+        )
+        # Started right away, so parsing is under way while the stage
+        # waits for a connection or the write slot.
+        self._process.start()
+
+    def __iter__(self) -> Iterator[tuple[list, list]]:
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=1.0)
+                except queue.Empty:
+                    if not self._process.is_alive():
+                        raise RuntimeError(
+                            f"Parser for {self.name} exited with code "
+                            f"{self._process.exitcode}"
+                        )
+                    continue
+                if item is None:
+                    return
+                if isinstance(item, str):
+                    raise RuntimeError(f"Parsing {self.name} failed:\n{item}")
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+
+
+def _produce(
+    source: Source,
+    name: str,
+    parse: Callable,
+    chunk_size: int,
+    validate: bool,
+    out,
+) -> None:
+    # Chunks, then None when the file is done; a traceback string on error.
+    try:
+        for chunk in parse_chunks(source, name, parse, chunk_size, validate):
+            out.put(chunk)
+        out.put(None)
+    except Exception:
+        out.put(traceback.format_exc())
@@ -0,0 +1,473 @@
+"""
+Deterministic synthetic datasets at any scale, for load and benchmark runs.
+
+`SyntheticDataset` is an importer `Source`: it produces the same rows as
+the demo files (advisors.csv, households.csv, ...) without writing them
+anywhere, so `DatasetImporter` streams them straight into the database.
+It can also `write` them out in the demo layout.
+
+Households are generated in fixed-size blocks. Each block's random draws
+come from a generator seeded with (seed, block number) and are made with
+vectorized numpy calls, so any file of any block can be regenerated
+independently (every file, and every parser process, sees the same
+households) and the output depends only on the seed and the size.
+
+Per household: an advisor (about 120 households each), 1-6 accounts,
+the eight-step transition task chain from the demo dataset, one ID
+document plus an agreement and a transfer form per account (and a
+beneficiary designation per IRA), and audit events for intake, every
+completed task and every NIGO defect. That is about 23 rows per
+household, so 10M rows is about 430k households.
+"""
+
+import csv
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+AS_OF = datetime(2026, 3, 1)
+BLOCK_SIZE = 5000
+HOUSEHOLDS_PER_ADVISOR = 120
+
+FIRST_NAMES = (
+    "Avery Blake Casey Dana Emerson Finley Gray Harper Indigo Jordan Kai Logan "
+    "Morgan Noel Oakley Parker Quinn Reese Sage Taylor"
+).split()
+LAST_NAMES = (
+    "Abbott Bishop Carver Dalton Ellison Fairbanks Garrison Holloway Iverson "
+    "Jennings Kendall Langley Merritt Norwood Osborne Prescott Quimby Radcliffe "
+    "Sterling Thornton"
+).split()
+
+CHANNELS = ("independent", "bank program", "acquisition", "Recruiting")
+CHANNEL_P = (0.55, 0.2, 0.15, 0.1)
+REGIONS = ("West", "Midwest", "Northeast", "Southeast", "Southwest")
+
+# (task name, owner queue, SLA hours), in order; each task blocks the next.
+TASK_CHAIN = (
+    ("Intake package received", "Ops", 4),
+    ("Documents classified & extracted", "Ops", 8),
+    ("NIGO validation", "Compliance", 8),
+    ("Resolve NIGO exceptions", "Ops", 24),
+    ("Account setup complete", "Advisor", 24),
+    ("Transfer submitted", "Ops", 24),
+    ("Reconciliation complete", "Ops", 48),
+    ("Transition complete", "Ops", 24),
+)
+# How many chain tasks are already completed, 0-8.
+PROGRESS_P = (0.04, 0.08, 0.12, 0.16, 0.14, 0.14, 0.12, 0.1, 0.1)
+# Time spent so far on the open task, as a fraction of its SLA: a gamma
+# with mean 0.54, so about one open task in twelve is past its SLA and
+# one in eight is close to it.
+ELAPSED_SHAPE, ELAPSED_SCALE = 3.0, 0.18
+
+ACCOUNT_TYPES = ("Taxable Brokerage", "IRA", "Roth IRA", "401k Rollover IRA")
+ACCOUNT_TYPE_P = (0.4, 0.3, 0.18, 0.12)
+# Median assets per account and the spread of their log.
+ASSETS_MEDIAN, ASSETS_SIGMA = 180_000, 1.1
+
+# (doc type, NIGO code, defect rate)
+DOC_RULES = {
+    "Government_ID": ("ILLEGIBLE", 0.04),
+    "Advisory_Agreement": ("MISSING_SIGNATURE", 0.08),
+    "Transfer_Form": ("PLAN_TYPE_MISMATCH", 0.05),
+    "Beneficiary_Designation": ("MISSING_BENEFICIARY", 0.15),
+}
+
+FILES = {
+    "advisors.csv": ["advisor_id", "advisor_name", "start_date", "channel", "region"],
+    "households.csv": [
+        "household_id",
+        "advisor_id",
+        "household_name",
+        "status",
+        "stall_risk",
+        "attrition_risk",
+    ],
+    "accounts.csv": [
+        "account_id",
+        "household_id",
+        "account_type",
+        "delivering_institution",
+        "estimated_assets_usd",
+        "status",
+    ],
+    "tasks.csv": [
+        "task_id",
+        "household_id",
+        "workflow_id",
+        "task_name",
+        "owner_queue",
+        "status",
+        "depends_on_task_id",
+        "sla_hours",
+        "created_at",
+        "due_at",
+    ],
+    "documents.csv": [
+        "doc_id",
+        "household_id",
+        "account_id",
+        "doc_type",
+        "filename",
+        "received_at",
+        "nigo_status",
+        "ocr_confidence",
+    ],
+    "audit_events.jsonl": [],
+}
+
+
+def _timestamps(seconds: np.ndarray, as_of: np.datetime64) -> list[str]:
+    # Vectorized ISO formatting of as_of + seconds, UTC.
+    stamps = as_of + seconds.astype("int64").astype("timedelta64[s]")
+    return [f"{stamp}Z" for stamp in np.datetime_as_string(stamps, unit="s").tolist()]
+
+
+class SyntheticDataset:
+    def __init__(
+        self,
+        households: int,
+        seed: int = 0,
+        block_size: int = BLOCK_SIZE,
+        as_of: datetime = AS_OF,
+    ):
+        if households < 1:
+            raise ValueError("households must be at least 1")
+        self.households = households
+        self.seed = seed
+        self.block_size = block_size
+        self.as_of = as_of
+        self.advisors = -(-households // HOUSEHOLDS_PER_ADVISOR)
+        self.docs_dir = Path("synthetic") / "docs"
+
+    def rows(self, name: str) -> Iterator[tuple[int, dict]]:
+        if name not in FILES:
+            raise FileNotFoundError(f"No synthetic {name}")
+        if name == "advisors.csv":
+            yield from enumerate(self._advisors(), start=1)
+            return
+        produce = getattr(self, "_" + name.split(".")[0])
+        line = 1
+        for start in range(0, self.households, self.block_size):
+            for row in produce(self._block(start)):
+                yield line, row
+                line += 1
+
+    def write(self, directory: Path) -> dict[str, int]:
+        """Writes every file in the demo layout; returns rows per file."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        counts = {}
+        for name, header in FILES.items():
+            count = 0
+            with (directory / name).open("w", newline="", encoding="ascii") as handle:
+                if header:
+                    writer = csv.DictWriter(handle, header)
+                    writer.writeheader()
+                for count, row in self.rows(name):
+                    if header:
+                        writer.writerow(row)
+                    else:
+                        handle.write(json.dumps(row) + "\n")
+            counts[name] = count
+        return counts
+
+    # --- Generation ---
+
+    def _advisors(self) -> Iterator[dict]:
+        rng = np.random.default_rng([self.seed, 0])
+        n = self.advisors
+        channels = rng.choice(len(CHANNELS), n, p=CHANNEL_P)
+        regions = rng.integers(0, len(REGIONS), n)
+        # Hired up to 25 years before as_of, skewed towards recent hires.
+        days = -np.minimum(rng.exponential(6 * 365, n), 25 * 365).astype("int64")
+        starts = np.datetime_as_string(
+            np.datetime64(self.as_of.date()) + days.astype("timedelta64[D]")
+        ).tolist()
+        pairs = len(FIRST_NAMES) * len(LAST_NAMES)
+        for a in range(n):
+            name = f"{FIRST_NAMES[a % len(FIRST_NAMES)]} "
+            name += LAST_NAMES[(a // len(FIRST_NAMES)) % len(LAST_NAMES)]
+            if a >= pairs:
+                name += f" {a // pairs + 1}"
+            yield {
+                "advisor_id": f"ADV-{a}",
+                "advisor_name": name,
+                "start_date": starts[a],
+                "channel": CHANNELS[channels[a]],
+                "region": REGIONS[regions[a]],
+            }
+
+    def _block(self, start: int) -> dict:
+        """Every random draw for households [start, start + block_size)."""
+        rng = np.random.default_rng([self.seed, 1 + start // self.block_size])
+        n = min(self.block_size, self.households - start)
+        steps = len(TASK_CHAIN)
+        block = {"ids": np.arange(start, start + n)}
+        block["advisor"] = rng.integers(0, self.advisors, n)
+        block["last_name"] = rng.integers(0, len(LAST_NAMES), n)
+
+        # Task chain: `done` tasks completed, task `done` open (unless all
+        # are done), the rest pending. Completed tasks took their SLA give
+        # or take 40%; the open one has been open for `elapsed` hours.
+        sla = np.array([hours for _, _, hours in TASK_CHAIN], dtype=float)
+        done = rng.choice(steps + 1, n, p=PROGRESS_P)
+        elapsed = rng.gamma(ELAPSED_SHAPE, ELAPSED_SCALE, n)
+        step = np.arange(steps)
+        durations = np.where(
+            step < done[:, None], sla * rng.uniform(0.6, 1.4, (n, steps)), sla
+        )
+        offsets = np.concatenate([np.zeros((n, 1)), durations.cumsum(axis=1)], axis=1)
+        # Hours from as_of to the start of the open task (or, for finished
+        # chains, to completion: up to 30 days ago).
+        anchor = np.where(
+            done < steps,
+            -elapsed * sla[np.minimum(done, steps - 1)],
+            -rng.uniform(0, 30 * 24, n),
+        )
+        created = (
+            anchor[:, None] + offsets[:, :steps] - offsets[np.arange(n), done][:, None]
+        )
+        open_status = np.select(
+            [elapsed > 1.0, elapsed > 0.75], ["BREACHED", "NEAR_BREACH"], "IN_PROGRESS"
+        )
+        status = np.where(
+            step < done[:, None],
+            "COMPLETED",
+            np.where(step == done[:, None], open_status[:, None], "PENDING"),
+        )
+        block.update(
+            done=done,
+            created=created,
+            completed=created + durations,
+            due=created + sla,
+            task_status=status,
+        )
+
+        # Accounts: 1 + Poisson(1), at most 6.
+        n_accounts = 1 + np.minimum(rng.poisson(1.0, n), 5)
+        owner = np.repeat(np.arange(n), n_accounts)
+        first = np.repeat(n_accounts.cumsum() - n_accounts, n_accounts)
+        acct_type = rng.choice(len(ACCOUNT_TYPES), owner.size, p=ACCOUNT_TYPE_P)
+        block.update(
+            acct_owner=owner,
+            acct_index=np.arange(owner.size) - first,
+            acct_type=acct_type,
+            acct_assets=np.round(
+                rng.lognormal(np.log(ASSETS_MEDIAN), ASSETS_SIGMA, owner.size), -2
+            ),
+            acct_custodian=rng.integers(0, 4, owner.size),
+        )
+
+        # Documents: one ID per household; an agreement and a transfer form
+        # per account; a beneficiary designation per IRA account.
+        ira = np.isin(acct_type, [1, 2, 3])
+        accounts = np.arange(owner.size)
+        doc_owner = np.concatenate([np.arange(n), owner, owner, owner[ira]])
+        doc_account = np.concatenate(
+            [np.full(n, -1), accounts, accounts, accounts[ira]]
+        )
+        doc_type = np.concatenate(
+            [
+                np.full(n, 0),
+                np.full(owner.size, 1),
+                np.full(owner.size, 2),
+                np.full(int(ira.sum()), 3),
+            ]
+        )
+        order = np.argsort(doc_owner, kind="stable")
+        doc_owner, doc_account, doc_type = (
+            doc_owner[order],
+            doc_account[order],
+            doc_type[order],
+        )
+        rates = np.array([rate for _, rate in DOC_RULES.values()])
+        defect = rng.random(doc_owner.size) < rates[doc_type]
+        per_household = np.bincount(doc_owner, minlength=n)
+        first = np.repeat(per_household.cumsum() - per_household, per_household)
+        block.update(
+            doc_owner=doc_owner,
+            doc_index=np.arange(doc_owner.size) - first,
+            doc_account=doc_account,
+            doc_type=doc_type,
+            doc_defect=defect,
+            doc_received=created[doc_owner, 0] - rng.uniform(0, 72, doc_owner.size),
+            doc_confidence=np.round(rng.beta(20, 1.5, doc_owner.size), 2),
+        )
+
+        # Household status follows its chain: complete when the chain is, else
+        # blocked on a breach or on NIGO defects not yet resolved (task 4).
+        open_nigo = np.bincount(doc_owner, weights=defect, minlength=n) > 0
+        open_nigo &= done <= 3
+        breached = open_status == "BREACHED"
+        block["status"] = np.select(
+            [done == steps, breached | open_nigo, done >= 5],
+            ["COMPLETE", "BLOCKED", "READY_TO_SUBMIT"],
+            "IN_PROGRESS",
+        )
+        blocked = block["status"] == "BLOCKED"
+        block["stall_risk"] = np.round(
+            np.minimum(rng.beta(2, 5, n) * 100 + 30 * blocked, 99), 0
+        )
+        block["attrition_risk"] = np.round(rng.beta(2, 6, n) * 100, 0)
+        block["open_nigo"] = open_nigo
+        return block
+
+    def _households(self, block: dict) -> Iterator[dict]:
+        columns = zip(
+            block["ids"].tolist(),
+            block["advisor"].tolist(),
+            block["last_name"].tolist(),
+            block["status"].tolist(),
+            block["stall_risk"].tolist(),
+            block["attrition_risk"].tolist(),
+        )
+        for h, advisor, last_name, status, stall, attrition in columns:
+            yield {
+                "household_id": f"H-{h}",
+                "advisor_id": f"ADV-{advisor}",
+                "household_name": f"{LAST_NAMES[last_name]} Household {h}",
+                "status": status,
+                "stall_risk": stall,
+                "attrition_risk": attrition,
+            }
+
+    def _accounts(self, block: dict) -> Iterator[dict]:
+        household = block["ids"][block["acct_owner"]]
+        settled = block["status"][block["acct_owner"]]
+        nigo = block["open_nigo"][block["acct_owner"]]
+        status = np.where(
+            settled == "COMPLETE",
+            "COMPLETE",
+            np.where(
+                nigo,
+                "NIGO_HOLD",
+                np.where(settled == "READY_TO_SUBMIT", "READY", "IN_PROGRESS"),
+            ),
+        )
+        columns = zip(
+            household.tolist(),
+            block["acct_index"].tolist(),
+            block["acct_type"].tolist(),
+            block["acct_custodian"].tolist(),
+            block["acct_assets"].tolist(),
+            status.tolist(),
+        )
+        for h, index, acct_type, custodian, assets, acct_status in columns:
+            yield {
+                "account_id": f"ACCT-{h}-{index}",
+                "household_id": f"H-{h}",
+                "account_type": ACCOUNT_TYPES[acct_type],
+                "delivering_institution": f"Custodian {'ABCD'[custodian]}",
+                "estimated_assets_usd": assets,
+                "status": acct_status,
+            }
+
+    def _tasks(self, block: dict) -> Iterator[dict]:
+        as_of = np.datetime64(self.as_of, "s")
+        n, steps = block["created"].shape
+        created = _timestamps(np.round(block["created"].ravel() * 3600), as_of)
+        due = _timestamps(np.round(block["due"].ravel() * 3600), as_of)
+        status = block["task_status"].ravel().tolist()
+        for row, h in enumerate(block["ids"].tolist()):
+            for i, (name, queue, sla) in enumerate(TASK_CHAIN):
+                cell = row * steps + i
+                yield {
+                    "task_id": f"T-{h}-{i}",
+                    "household_id": f"H-{h}",
+                    "workflow_id": f"WF-{h}",
+                    "task_name": name,
+                    "owner_queue": queue,
+                    "status": status[cell],
+                    "depends_on_task_id": f"T-{h}-{i - 1}" if i else "",
+                    "sla_hours": sla,
+                    "created_at": created[cell],
+                    "due_at": due[cell],
+                }
+
+    def _documents(self, block: dict) -> Iterator[dict]:
+        as_of = np.datetime64(self.as_of, "s")
+        received = _timestamps(np.round(block["doc_received"] * 3600), as_of)
+        rules = list(DOC_RULES.items())
+        columns = zip(
+            block["ids"][block["doc_owner"]].tolist(),
+            block["doc_index"].tolist(),
+            block["doc_account"].tolist(),
+            block["doc_type"].tolist(),
+            block["doc_defect"].tolist(),
+            block["doc_confidence"].tolist(),
+            received,
+        )
+        account_index = block["acct_index"].tolist()
+        for h, index, account, doc_type, defect, confidence, at in columns:
+            name, (code, _) = rules[doc_type]
+            yield {
+                "doc_id": f"D-{h}-{index}",
+                "household_id": f"H-{h}",
+                "account_id": (
+                    f"ACCT-{h}-{account_index[account]}" if account >= 0 else ""
+                ),
+                "doc_type": name,
+                "filename": f"H-{h}_{name}_{index}.txt",
+                "received_at": at,
+                "nigo_status": code if defect else "OK",
+                "ocr_confidence": confidence,
+            }
+
+    def _audit_events(self, block: dict) -> Iterator[dict]:
+        as_of = np.datetime64(self.as_of, "s")
+        n, steps = block["created"].shape
+        intake = _timestamps(np.round(block["created"][:, 0] * 3600), as_of)
+        completed = _timestamps(np.round(block["completed"].ravel() * 3600), as_of)
+        defects = {}
+        for owner, index, doc_type in zip(
+            block["doc_owner"][block["doc_defect"]].tolist(),
+            block["doc_index"][block["doc_defect"]].tolist(),
+            block["doc_type"][block["doc_defect"]].tolist(),
+        ):
+            defects.setdefault(owner, []).append((index, doc_type))
+        rules = list(DOC_RULES.items())
+        for row, (h, done) in enumerate(
+            zip(block["ids"].tolist(), block["done"].tolist())
+        ):
+            events = [(intake[row], "system", "household", f"H-{h}", "ingest", {})]
+            events += [
+                (
+                    completed[row * steps + i],
+                    "ops",
+                    "task",
+                    f"T-{h}-{i}",
+                    "task_completed",
+                    {"task_name": TASK_CHAIN[i][0]},
+                )
+                for i in range(done)
+            ]
+            for index, doc_type in defects.get(row, ()):
+                name, (code, _) = rules[doc_type]
+                events.append(
+                    (
+                        intake[row],
+                        "compliance" if code == "MISSING_SIGNATURE" else "ops",
+                        "document",
+                        f"D-{h}-{index}",
+                        "exception_created",
+                        {"doc_type": name, "rule": code},
+                    )
+                )
+            for j, (at, role, entity_type, entity_id, event, payload) in enumerate(
+                events
+            ):
+                yield {
+                    "event_id": f"EV-{h}-{j}",
+                    "timestamp": at,
+                    "actor": "system" if role == "system" else f"{role}.synthetic",
+                    "actor_role": role,
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "event_type": event,
+                    "payload": payload,
+                }
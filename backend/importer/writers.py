@@ -0,0 +1,70 @@
+"""
+Chunk writers: executemany with RETURNING for tables whose ids later
+tables need, COPY (Postgres) or executemany for the rest.
+"""
+
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Connection
+
+
+def insert_returning(conn: Connection, table: Table, rows: list[dict]) -> list[int]:
+    """
+    Inserts `rows` in one executemany and returns their new ids, in the
+    order of `rows`.
+    """
+    if not rows:
+        return []
+    result = conn.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    )
+    return list(result.scalars())
+
+
+def insert_rows(conn: Connection, table: Table, rows: list[dict]) -> None:
+    """
+    Inserts rows whose ids nobody needs: COPY on Postgres (psycopg2),
+    executemany elsewhere.
+    """
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        copy_rows(conn, table, rows)
+    else:
+        conn.execute(insert(table), rows)
+
+
+def copy_rows(conn: Connection, table: Table, rows: list[dict]) -> None:
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _copy_value(value) -> str:
+    # In COPY's CSV format an unquoted empty field is NULL and a quoted one
+    # is an empty string, so every non-null text value is quoted.
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
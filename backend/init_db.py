@@ -1,11 +1,12 @@
-from backend.database import Base, engine
+from backend.database import engine
+from backend.migrations import migrate
 
 
 def init_db():
     print("Initializing database...")
-    # Base.metadata.drop_all(bind=engine) # Optional: comment in if you want to wipe clean every time init is run
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully.")
+    # drop_schema(engine) # Optional: comment in if you want to wipe clean every time init is run
+    applied = migrate(engine)
+    print(f"Tables created successfully (migrations applied: {applied or 'none'}).")
 
 
 if __name__ == "__main__":
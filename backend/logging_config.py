@@ -1,8 +1,144 @@
+"""
+Structured JSON logging.
+
+Request threads only stamp the record and put it on a queue; a listener
+thread formats and writes it, so a slow stdout (container log drivers)
+never stalls a request. Hot-path loggers can be rate limited or sampled.
+"""
+
+import atexit
 import json
 import logging
+import logging.handlers
+import queue
+import random
+import re
 import sys
+import threading
+import time
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any
+from functools import lru_cache
+from typing import Any, TextIO
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is the fallback
+    orjson = None
+
+# Id of the request being handled; set by the tracing middleware.
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+SENSITIVE_KEYS = frozenset({"ssn", "password", "token", "account_number", "secret"})
+# A key is sensitive when its words contain one of these in order, whatever
+# the case or separators: "api_token", "clientSecret", "accountNumberLast4".
+_SENSITIVE_WORDS = tuple(tuple(k.split("_")) for k in SENSITIVE_KEYS)
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+REDACTED = "[REDACTED]"
+
+
+def is_sensitive(key: Any) -> bool:
+    return isinstance(key, str) and _has_sensitive_words(key)
+
+
+@lru_cache(maxsize=4096)
+def _has_sensitive_words(key: str) -> bool:
+    words = [word.lower() for word in _WORD.findall(key)]
+    return any(
+        words[i : i + len(term)] == list(term)
+        for term in _SENSITIVE_WORDS
+        for i in range(len(words) - len(term) + 1)
+    )
+
+
+def redact(data: Any, depth: int = 0) -> Any:
+    """
+    Masks sensitive keys at any depth of nested dicts and lists.
+    """
+    if depth > 32:
+        return data
+    if isinstance(data, dict):
+        return {
+            k: REDACTED if is_sensitive(k) else redact(v, depth + 1)
+            for k, v in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [redact(v, depth + 1) for v in data]
+    return data
+
+
+def dumps(data: dict) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; the stdlib copes
+    return json.dumps(data, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps the current request id on records that don't carry one.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            request_id = request_id_var.get()
+            if request_id is not None:
+                record.request_id = request_id
+        return True
+
+
+class HotPathFilter(logging.Filter):
+    """
+    Per-logger token-bucket rate limits (records per second) and sampling
+    (fraction kept) for chatty loggers. A logger's limits also apply to its
+    children. WARNING and above always pass; the next record that passes
+    carries a count of the ones dropped before it.
+    """
+
+    def __init__(self, rates: dict[str, float], samples: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.samples = samples
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._dropped: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _limit(self, limits: dict[str, float], name: str) -> tuple[str, float] | None:
+        while name:
+            if name in limits:
+                return name, limits[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        sample = self._limit(self.samples, record.name)
+        if sample and random.random() >= sample[1]:
+            return self._drop(record.name)
+        rate = self._limit(self.rates, record.name)
+        if rate:
+            name, per_second = rate
+            now = time.monotonic()
+            with self._lock:
+                tokens, last = self._buckets.get(name, (per_second, now))
+                tokens = min(per_second, tokens + (now - last) * per_second)
+                self._buckets[name] = (max(tokens - 1, 0.0), now)
+            if tokens < 1:
+                return self._drop(record.name)
+        if self._dropped.get(record.name):
+            with self._lock:
+                record.suppressed = self._dropped.pop(record.name, 0)
+        return True
+
+    def _drop(self, name: str) -> bool:
+        with self._lock:
+            self._dropped[name] = self._dropped.get(name, 0) + 1
+        return False
 
 
 class JsonFormatter(logging.Formatter):
@@ -11,11 +147,14 @@ class JsonFormatter(logging.Formatter):
     Redacts sensitive keys if found.
     """
 
-    SENSITIVE_KEYS = {"ssn", "password", "token", "account_number", "secret"}
+    SENSITIVE_KEYS = SENSITIVE_KEYS
 
     def format(self, record: logging.LogRecord) -> str:
         log_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # When the record was made, not when the listener got to it.
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -27,36 +166,141 @@ class JsonFormatter(logging.Formatter):
         if hasattr(record, "request_id"):
             log_record["request_id"] = record.request_id  # type: ignore
 
+        if hasattr(record, "timing"):
+            log_record["timing"] = record.timing  # type: ignore
+
         if hasattr(record, "payload"):
             log_record["payload"] = self._redact(record.payload)  # type: ignore
 
+        if hasattr(record, "suppressed"):
+            log_record["suppressed"] = record.suppressed  # type: ignore
+
         if record.exc_info:
             log_record["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exc_info"] = record.exc_text
 
-        return json.dumps(log_record)
+        return dumps(log_record)
 
     def _redact(self, data: Any) -> Any:
-        if isinstance(data, dict):
-            return {
-                k: (v if k.lower() not in self.SENSITIVE_KEYS else "[REDACTED]")
-                for k, v in data.items()
-            }
-        return data
+        return redact(data)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records without formatting them. When the queue is full the
+    record is dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve %-args now: they may be mutated after the call returns.
+        # Formatting (JSON, tracebacks) is left to the listener thread.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _parse_limits(spec: str) -> dict[str, float]:
+    # "backend.access=50,backend.sql=5"
+    limits = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            limits[name.strip()] = float(value)
+    return limits
 
 
-def setup_logging(level: str = "INFO"):
+def setup_logging(
+    level: str = "INFO",
+    stream: TextIO | None = None,
+    queue_size: int = 10000,
+    rate_limits: str = "",
+    sample_rates: str = "",
+):
+    global _listener
     logger = logging.getLogger()
     logger.setLevel(level)
 
-    handler = logging.StreamHandler(sys.stdout)
+    stop_logging()
+    handler = logging.StreamHandler(stream or sys.stdout)
     handler.setFormatter(JsonFormatter())
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    # Filters run on the caller's thread, where the request id is visible.
+    queue_handler.addFilter(RequestIdFilter())
+    if rate_limits or sample_rates:
+        queue_handler.addFilter(
+            HotPathFilter(_parse_limits(rate_limits), _parse_limits(sample_rates))
+        )
+    _listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+    _listener.start()
 
     # Clear existing handlers to avoid duplicates during reloads
     logger.handlers = []
-    logger.addHandler(handler)
+    logger.addHandler(queue_handler)
 
     # Set level for libraries
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
     return logger
+
+
+def restart_after_fork() -> None:
+    """
+    In a forked worker: the parent's writer thread did not survive the fork,
+    so start a fresh queue and thread with the same formatting and filters.
+    """
+    global _listener
+    root = logging.getLogger()
+    old = next(
+        (h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)), None
+    )
+    if old is None or _listener is None:
+        return
+    # Don't stop() the inherited listener: its thread is gone, and the old
+    # queue's lock may have been held by it at the moment of the fork.
+    handlers = _listener.handlers
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=old.queue.maxsize))
+    for log_filter in old.filters:
+        queue_handler.addFilter(log_filter)
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers)
+    _listener.start()
+    root.handlers = [queue_handler if h is old else h for h in root.handlers]
+
+
+def dropped_records() -> int:
+    """
+    Records dropped because the log queue was full.
+    """
+    return sum(
+        handler.dropped
+        for handler in logging.getLogger().handlers
+        if isinstance(handler, NonBlockingQueueHandler)
+    )
+
+
+def stop_logging() -> None:
+    """
+    Flushes queued records and stops the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
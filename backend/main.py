@@ -1,25 +1,122 @@
+import json
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Any, Dict, Optional
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
 from backend.config import settings
-from backend.database import Base, engine
-from backend.logging_config import setup_logging
+from backend.database import engine, get_db
+from backend.logging_config import dropped_records, setup_logging, stop_logging
+from backend.metrics import (
+    MetricsMiddleware,
+    instrument_pool,
+    register_caches,
+    registry,
+)
+from backend.migrations import check_schema, migrate
 from backend.orchestrator import orchestrator
-from backend.routers import tasks, transitions, webhooks
+from backend.routers import exports, tasks, transitions, webhooks
+from backend.services import communications, workflows
+from backend.services.compliance import scanner as compliance_scanner
+from backend.services.execution import PoolSaturated
+from backend.services.invalidation import UnknownCache
+from backend.services.jobs import JobQueueFull
+from backend.services.workflows import InvalidBook, compile_template
+from backend.tracing import TracedJSONResponse, TracingMiddleware, instrument_engine
 
 # Setup Logging
-setup_logging(settings.LOG_LEVEL)
+setup_logging(
+    settings.LOG_LEVEL,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    rate_limits=settings.LOG_RATE_LIMITS,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+)
 logger = logging.getLogger(__name__)
 
-# Create Tables
-Base.metadata.create_all(bind=engine)
+instrument_engine(
+    engine, slow_query_ms=settings.SQL_SLOW_QUERY_MS if settings.SQL_DEBUG else None
+)
+instrument_pool(engine)
+register_caches(
+    {
+        "communication_template": communications.compile_template,
+        "workflow_template": workflows.compile_template,
+    }
+)
+registry.callback(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    lambda: [({}, dropped_records())],
+    kind="counter",
+)
+registry.callback(
+    "job_queue_depth",
+    "Background jobs queued and not yet claimed",
+    lambda: [({}, orchestrator.jobs.queue_depth())],
+)
+registry.callback(
+    "job_queue_oldest_seconds",
+    "Age of the longest-waiting queued background job",
+    lambda: [({}, round(orchestrator.jobs.oldest_queued_seconds(), 3))],
+)
+registry.callback(
+    "execution_pool_tasks",
+    "Execution layer calls in flight or waiting for a worker",
+    lambda: [
+        ({"pool": pool, "state": state}, stats[state])
+        for pool, stats in orchestrator.execution.snapshot().items()
+        for state in ("in_flight", "queued")
+    ],
+)
+registry.callback(
+    "execution_pool_rejected_total",
+    "Execution layer calls refused because the pool was saturated",
+    lambda: [
+        ({"pool": pool}, stats["rejected"])
+        for pool, stats in orchestrator.execution.snapshot().items()
+    ],
+    kind="counter",
+)
+
 
-app = FastAPI(title="Transition OS Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by `python -m backend.migrations`; startup
+    # only confirms the database is at the version this code expects.
+    if settings.AUTO_MIGRATE:
+        migrate(engine)
+    else:
+        check_schema(engine)
+    # Other processes (workers on this or another host) may be running jobs,
+    # so only those whose lease expired are taken back, never every RUNNING
+    # one.
+    recovered = orchestrator.jobs.recover()
+    if recovered:
+        logger.info(f"Re-queued {recovered} unfinished jobs")
+    orchestrator.invalidation.start()
+    yield
+    orchestrator.invalidation.stop()
+    orchestrator.jobs.shutdown()
+    orchestrator.execution.shutdown()
+    stop_logging()
+
+
+app = FastAPI(
+    title="Transition OS Backend",
+    lifespan=lifespan,
+    default_response_class=TracedJSONResponse,
+)
 
 origins = [o.strip() for o in settings.CORS_ALLOW_ORIGINS.split(",") if o.strip()]
 if not origins:
@@ -31,6 +128,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing"],
+)
+app.add_middleware(MetricsMiddleware)
+# Added last so it wraps everything, CORS included.
+app.add_middleware(
+    TracingMiddleware,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    repeat_threshold=settings.SQL_REPEAT_THRESHOLD if settings.SQL_DEBUG else None,
 )
 
 
@@ -41,9 +146,34 @@ class WorkflowRequest(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+# `?async=true` on long-running routes queues a job instead of waiting.
+AsyncMode = Query(False, alias="async")
+
+# Orchestrator calls block on the DB or CPU; routes await them through the
+# execution layer so the event loop stays free for other requests.
+offload = orchestrator.execution.run_io
+
+
+async def submit_job(kind: str, payload: dict) -> JSONResponse:
+    try:
+        content = await offload(orchestrator.submit_job, kind, payload)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    return JSONResponse(status_code=202, content=content)
+
+
 # --- Global Exception Handling ---
 
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    logger.warning(f"Rejected {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"status": "ERROR", "message": "Server busy", "detail": str(exc)},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
@@ -75,50 +205,222 @@ def health_ready():
     return {"status": "READY"}
 
 
+@app.get("/health/pools")
+def health_pools():
+    return {"status": "OK", "data": orchestrator.execution.snapshot()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.post("/caches/{name}/invalidate")
+def invalidate_cache(name: str, key: Optional[str] = None):
+    """
+    Drops a per-worker cache (or one key in it) in every worker.
+    """
+    try:
+        orchestrator.invalidation.publish(name, key)
+    except UnknownCache:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown cache '{name}'; known: "
+            + ", ".join(orchestrator.invalidation.caches),
+        )
+    return {"status": "OK", "data": {"cache": name, "key": key}}
+
+
 # --- Core Clawdbot Routes ---
 
 
 @app.post("/workflows", status_code=201)
-async def create_workflow(request: WorkflowRequest):
-    logger.info(f"Received create_workflow request: {request}")
-    result = orchestrator.onboard_advisor(
-        {
-            "advisor_id": request.advisor_id,
-            "workflow_type": request.workflow_type,
-            **(request.metadata or {}),
-        }
+async def create_workflow(
+    request: WorkflowRequest, db: Session = Depends(get_db), async_: bool = AsyncMode
+):
+    logger.debug(
+        "Received create_workflow request", extra={"payload": request.model_dump()}
     )
-    return result
+    advisor_data = {
+        "advisor_id": request.advisor_id,
+        "workflow_type": request.workflow_type,
+        **(request.metadata or {}),
+    }
+    try:
+        compile_template(request.workflow_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    try:
+        if async_:
+            # Checked up front so a bad book is a 422, not a failed job.
+            await offload(
+                workflows.validate_book,
+                db,
+                advisor_data.get("household_ids") or [],
+                advisor_data.get("households") or [],
+            )
+            return await submit_job("workflow.instantiate", advisor_data)
+        return await offload(orchestrator.onboard_advisor, advisor_data, db=db)
+    except InvalidBook as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
 
 @app.get("/workflows/{workflow_id}")
 async def get_workflow_dashboard(workflow_id: str):
-    return orchestrator.get_dashboard(workflow_id)
+    return await offload(orchestrator.get_dashboard, workflow_id)
 
 
 @app.post("/documents/validate")
 async def validate_document(payload: Dict[str, Any]):
-    return orchestrator.validate_document(payload)
+    return await orchestrator.avalidate_document(payload)
+
+
+@app.post("/documents/validate-batch")
+async def validate_documents_batch(
+    payload: Dict[str, Any], db: Session = Depends(get_db), async_: bool = AsyncMode
+):
+    documents = payload.get("documents")
+    if not isinstance(documents, list):
+        raise HTTPException(status_code=422, detail="'documents' must be a list")
+    if async_:
+        return await submit_job("documents.validate_batch", {"documents": documents})
+    return await offload(orchestrator.validate_documents_batch, documents, db)
+
+
+@app.post("/documents/consistency-check")
+async def check_document_consistency(
+    payload: Optional[Dict[str, Any]] = None,
+    db: Session = Depends(get_db),
+    async_: bool = AsyncMode,
+):
+    household_ids = (payload or {}).get("household_ids")
+    if household_ids is not None:
+        try:
+            if not isinstance(household_ids, list):
+                raise TypeError
+            household_ids = [int(h) for h in household_ids]
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=422, detail="'household_ids' must be a list of integers"
+            ) from None
+    if async_:
+        return await submit_job(
+            "documents.consistency_check", {"household_ids": household_ids}
+        )
+    return await offload(orchestrator.check_consistency, db, household_ids)
 
 
 @app.get("/predictions/eta/{workflow_id}")
-async def get_eta_prediction(workflow_id: str):
-    return orchestrator.get_eta_prediction(workflow_id)
+async def get_eta_prediction(workflow_id: str, async_: bool = AsyncMode):
+    if async_:
+        return await submit_job("eta.predict", {"workflow_id": workflow_id})
+    return await offload(orchestrator.get_eta_prediction, workflow_id)
 
 
 @app.post("/entity/match")
-async def run_entity_match(payload: Dict[str, Any]):
-    return orchestrator.run_entity_match(payload)
+async def run_entity_match(payload: Dict[str, Any], async_: bool = AsyncMode):
+    try:
+        if async_:
+            orchestrator.dedupe_config(payload)
+            return await submit_job("entity_match", payload)
+        return await orchestrator.arun_entity_match(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
 
 @app.post("/communications/draft")
-async def draft_communication(payload: Dict[str, Any]):
-    return orchestrator.draft_communication(payload)
+async def draft_communication(payload: Dict[str, Any], db: Session = Depends(get_db)):
+    try:
+        result = await offload(orchestrator.draft_communication, payload, db)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Household not found")
+    return result
+
+
+@app.post("/communications/compliance-scan")
+def scan_for_compliance(payload: Dict[str, Any]):
+    text = payload.get("text")
+    if not isinstance(text, str):
+        raise HTTPException(status_code=422, detail="'text' must be a string")
+    return {"status": "OK", "data": {"compliance_flags": compliance_scanner.scan(text)}}
+
+
+@app.post("/communications/draft-batch")
+def draft_communications_batch(payload: Dict[str, Any]):
+    # Streams one JSON draft per line as households are rendered.
+    try:
+        drafts = orchestrator.draft_communications_batch(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return StreamingResponse(
+        (json.dumps(draft, default=str) + "\n" for draft in drafts),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/households/risk/recompute")
+async def recompute_household_risk(
+    payload: Optional[Dict[str, Any]] = None,
+    db: Session = Depends(get_db),
+    async_: bool = AsyncMode,
+):
+    payload = payload or {}
+    incremental = bool(payload.get("incremental", False))
+    since = payload.get("since")
+    if since is not None:
+        try:
+            datetime.fromisoformat(since)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=422, detail="'since' must be an ISO-8601 timestamp"
+            )
+    if async_:
+        return await submit_job(
+            "risk.recompute", {"incremental": incremental, "since": since}
+        )
+    return await offload(
+        orchestrator.recompute_risk_scores, db, incremental=incremental, since=since
+    )
 
 
 @app.get("/households/{household_id}/meeting-pack")
-async def get_meeting_pack(household_id: int):
-    return orchestrator.generate_meeting_pack(household_id)
+async def get_meeting_pack(
+    household_id: int, db: Session = Depends(get_db), async_: bool = AsyncMode
+):
+    if async_:
+        return await submit_job("meeting_pack", {"household_id": household_id})
+    try:
+        pack = await offload(orchestrator.get_meeting_pack, db, household_id)
+    except JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if pack is None:
+        raise HTTPException(status_code=404, detail="Household not found")
+    if pack["status"] != "READY":
+        return JSONResponse(status_code=202, content=pack)
+    return pack
+
+
+@app.get("/meeting-packs/{pack_hash}/{filename}")
+def download_meeting_pack_file(pack_hash: str, filename: str):
+    path = orchestrator.packs.path(pack_hash, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Meeting pack file not found")
+    return FileResponse(path, media_type="text/markdown", filename=filename)
+
+
+# --- Background Jobs ---
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = orchestrator.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "OK", "data": job}
 
 
 # --- Existing Routers ---
@@ -126,3 +428,4 @@ async def get_meeting_pack(household_id: int):
 app.include_router(transitions.router, prefix=settings.API_V1_STR, tags=["transitions"])
 app.include_router(tasks.router, prefix=settings.API_V1_STR, tags=["tasks"])
 app.include_router(webhooks.router, prefix=settings.API_V1_STR, tags=["webhooks"])
+app.include_router(exports.router, prefix=settings.API_V1_STR, tags=["exports"])
@@ -0,0 +1,347 @@
+"""
+Process metrics in the Prometheus text format.
+
+Counters and histograms are sharded per thread: each thread (the event
+loop, request threads, pool and job workers) writes only to its own shard,
+so recording a sample takes no lock. `/metrics` sums the shards when it is
+scraped. Gauges that already live elsewhere (DB pool, job queue, caches)
+are read through callbacks at scrape time rather than mirrored here.
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+Sample = tuple[dict[str, str], float]
+
+
+class _Shards:
+    """
+    One dict per thread. A thread registers its shard once, under the lock;
+    after that it only touches its own dict.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            # dict() copies are atomic under the GIL, so a writer can't tear them.
+            return [dict(shard) for shard in self._shards]
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._shards = _Shards()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shards.mine()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return sum(shard.get(labels, 0.0) for shard in self._shards.all())
+
+    def samples(self) -> list[Sample]:
+        totals: dict[Labels, float] = {}
+        for shard in self._shards.all():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return [
+            (dict(zip(self.labelnames, labels)), value)
+            for labels, value in sorted(totals.items())
+        ]
+
+    def collect(self) -> list[str]:
+        lines = _header(self.name, self.help, self.kind)
+        lines += [_line(self.name, labels, value) for labels, value in self.samples()]
+        return lines
+
+
+class Gauge(Counter):
+    """
+    Summed across shards like a counter, but may go down.
+    """
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._shards = _Shards()
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shards.mine()
+        # Per-bucket counts (not cumulative), then sum and count.
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def collect(self) -> list[str]:
+        totals: dict[Labels, list] = {}
+        for shard in self._shards.all():
+            for labels, state in shard.items():
+                merged = totals.setdefault(labels, [0] * len(state))
+                for i, value in enumerate(list(state)):
+                    merged[i] += value
+        lines = _header(self.name, self.help, "histogram")
+        for labels, state in sorted(totals.items()):
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    _line(f"{self.name}_bucket", {**base, "le": le}, cumulative)
+                )
+            lines.append(_line(f"{self.name}_sum", base, state[-2]))
+            lines.append(_line(f"{self.name}_count", base, state[-1]))
+        return lines
+
+
+class Callback:
+    """
+    A gauge or counter whose samples are read from elsewhere at scrape time.
+    """
+
+    def __init__(
+        self, name: str, help: str, kind: str, read: Callable[[], Iterable[Sample]]
+    ):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.read = read
+
+    def collect(self) -> list[str]:
+        lines = _header(self.name, self.help, self.kind)
+        for labels, value in self.read():
+            if value is not None:
+                lines.append(_line(self.name, labels, value))
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Callback] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Labels = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Labels = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Labels = (), **kw
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, **kw))
+
+    def callback(
+        self, name: str, help: str, read: Callable[[], Iterable[Sample]], kind="gauge"
+    ) -> Callback:
+        return self.register(Callback(name, help, kind, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.collect()
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, help: str, kind: str) -> list[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+
+def _line(name: str, labels: dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(
+            f'{key}="{_escape(str(val))}"' for key, val in labels.items()
+        )
+        return f"{name}{{{rendered}}} {_number(value)}"
+    return f"{name} {_number(value)}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ("method", "route", "status"),
+)
+http_errors = registry.counter(
+    "http_request_errors_total",
+    "HTTP requests answered with a 5xx",
+    ("method", "route"),
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to the response status, by route",
+    ("method", "route"),
+)
+db_pool_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+job_lag = registry.histogram(
+    "job_queue_lag_seconds",
+    "Time a background job waited in the queue before a worker claimed it",
+    ("kind",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+webhooks_in_flight = registry.gauge(
+    "webhooks_in_flight", "Webhooks accepted and not yet applied"
+)
+# Published together with the lru_cache statistics by `register_caches`.
+cache_requests = Counter("cache_requests_total", "", ("cache", "result"))
+
+
+class MetricsMiddleware:
+    """
+    Records request counts and latency under the matched route template,
+    so path parameters don't explode label cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status, started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Latency to the status line; streamed bodies aren't counted.
+                http_latency.observe(time.perf_counter() - started, *_route(scope))
+                started = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            method, route = _route(scope)
+            if started is not None:
+                http_latency.observe(time.perf_counter() - started, method, route)
+            http_requests.inc(method, route, str(status))
+            if status >= 500:
+                http_errors.inc(method, route)
+
+
+def _route(scope) -> tuple[str, str]:
+    route = scope.get("route")
+    return scope["method"], getattr(route, "path", None) or "unmatched"
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    Times connection checkouts and publishes the pool's occupancy.
+    SQLAlchemy has no event before a checkout starts waiting, so the
+    pool's `_do_get` is wrapped instead.
+    """
+    pool = engine.pool
+    do_get = pool._do_get
+
+    def timed_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - started)
+
+    pool._do_get = timed_get
+
+    def occupancy() -> list[Sample]:
+        current = engine.pool
+        samples = []
+        for state in ("size", "checkedout", "overflow", "checkedin"):
+            read = getattr(current, state, None)
+            if read is not None:
+                # QueuePool reports unused capacity as negative overflow.
+                samples.append(({"state": state}, max(read(), 0)))
+        return samples
+
+    registry.callback(
+        "db_pool_connections", "Connections in the SQLAlchemy pool by state", occupancy
+    )
+
+
+def register_caches(lru_caches: dict[str, Callable]) -> None:
+    """
+    Publishes hits, misses and hit ratio for the given `functools.lru_cache`
+    functions alongside caches counted through `cache_requests`.
+    """
+
+    def lookups() -> list[Sample]:
+        samples = cache_requests.samples()
+        for name, cached in lru_caches.items():
+            info = cached.cache_info()
+            samples.append(({"cache": name, "result": "hit"}, info.hits))
+            samples.append(({"cache": name, "result": "miss"}, info.misses))
+        return samples
+
+    def ratios() -> list[Sample]:
+        counts: dict[str, dict[str, float]] = {}
+        for labels, value in lookups():
+            counts.setdefault(labels["cache"], {})[labels["result"]] = value
+        return [
+            ({"cache": cache}, round(c.get("hit", 0) / total, 4))
+            for cache, c in sorted(counts.items())
+            if (total := c.get("hit", 0) + c.get("miss", 0))
+        ]
+
+    registry.callback(
+        "cache_requests_total", "Lookups in application caches", lookups, "counter"
+    )
+    registry.callback("cache_hit_ratio", "Hits over lookups per cache", ratios)
@@ -0,0 +1,127 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module here with a `VERSION`, a `DESCRIPTION` and an
+`upgrade(conn)` function, listed in `MIGRATIONS` in order. Applied
+versions are recorded in `schema_version`. Migrations are applied by a
+separate command, before the app starts:
+
+    python -m backend.migrations            # apply pending migrations
+    python -m backend.migrations --status   # show current and latest
+
+The app itself only checks the recorded version at startup.
+"""
+
+import logging
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from backend.migrations import (
+    v0001_initial,
+    v0002_cache_invalidations,
+    v0003_source_keys,
+    v0004_updated_at,
+    v0005_plan_types,
+    v0006_audit_updated_at,
+    v0007_job_heartbeat,
+    v0008_job_attempts,
+)
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    v0001_initial,
+    v0002_cache_invalidations,
+    v0003_source_keys,
+    v0004_updated_at,
+    v0005_plan_types,
+    v0006_audit_updated_at,
+    v0007_job_heartbeat,
+    v0008_job_attempts,
+]
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database is behind the code."""
+
+
+def current_version(conn: Connection) -> int:
+    """
+    The highest applied version, or 0 for a database never migrated.
+    """
+    try:
+        return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        # No schema_version table yet.
+        conn.rollback()
+        return 0
+
+
+def migrate(engine: Engine, target: int | None = None) -> list[int]:
+    """
+    Applies pending migrations up to `target` (default: all), each in its
+    own transaction. Returns the versions applied.
+    """
+    target = LATEST_VERSION if target is None else target
+    applied = []
+    with engine.begin() as conn:
+        _metadata.create_all(conn, checkfirst=True)
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        if not version < migration.VERSION <= target:
+            continue
+        logger.info(f"Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                insert(schema_version).values(
+                    version=migration.VERSION, description=migration.DESCRIPTION
+                )
+            )
+        applied.append(migration.VERSION)
+    return applied
+
+
+def check_schema(engine: Engine) -> int:
+    """
+    One query: the recorded version must match the code's latest.
+    """
+    with engine.connect() as conn:
+        version = current_version(conn)
+    if version != LATEST_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, code expects "
+            f"{LATEST_VERSION}. Run `python -m backend.migrations` first."
+        )
+    return version
+
+
+def drop_schema(engine: Engine) -> None:
+    """
+    Drops every table, including the version table. For seed and test resets.
+    """
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    metadata.drop_all(bind=engine)
@@ -0,0 +1,27 @@
+import argparse
+
+from backend.database import engine
+from backend.migrations import LATEST_VERSION, current_version, migrate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument(
+        "--status", action="store_true", help="Show versions without migrating"
+    )
+    parser.add_argument("--target", type=int, help="Stop at this version")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.connect() as conn:
+            print(f"Schema version {current_version(conn)}, latest {LATEST_VERSION}")
+        return
+    applied = migrate(engine, args.target)
+    if applied:
+        print(f"Applied migrations: {', '.join(map(str, applied))}")
+    else:
+        print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
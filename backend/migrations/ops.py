@@ -0,0 +1,23 @@
+"""
+Schema operations for migrations that change existing tables.
+"""
+
+from sqlalchemy import Column, Index, MetaData, Table
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+
+def add_column(conn: Connection, table: str, column: Column) -> None:
+    """
+    `ALTER TABLE ... ADD COLUMN`, rendered for the connection's dialect.
+    """
+    Table(table, MetaData(), column)
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+
+
+def create_index(
+    conn: Connection, name: str, table: str, *columns: str, unique: bool = False
+) -> None:
+    target = Table(table, MetaData(), *(Column(column) for column in columns))
+    Index(name, *(target.c[column] for column in columns), unique=unique).create(conn)
@@ -0,0 +1,135 @@
+"""
+Initial schema: the tables `Base.metadata.create_all` used to create at
+import. Tables that already exist (databases created that way) are kept
+as they are, so those databases are simply stamped at version 1.
+
+The definitions are frozen here rather than read from `backend.models`:
+later migrations alter these tables, and a fresh database must be built
+the same way an old one was upgraded.
+"""
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import func
+
+VERSION = 1
+DESCRIPTION = "initial schema"
+
+metadata = MetaData()
+
+Table(
+    "advisors",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("email", String, unique=True, index=True, nullable=True),
+    Column("channel", String),
+    Column("experience_years", Integer, nullable=True),
+)
+
+Table(
+    "households",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("advisor_id", Integer, ForeignKey("advisors.id")),
+    Column("name", String, nullable=False),
+    Column("status", String),
+    Column("eta_date", DateTime(timezone=True), nullable=True),
+    Column("risk_score", Float, nullable=True),
+)
+
+Table(
+    "accounts",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("household_id", Integer, ForeignKey("households.id")),
+    Column("account_number", String, unique=True, index=True, nullable=False),
+    Column("type", String),
+    Column("custodian", String),
+    Column("status", String),
+    Column("asset_value", Float),
+)
+
+Table(
+    "workflows",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("advisor_id", Integer, ForeignKey("advisors.id")),
+    Column("name", String, nullable=False),
+    Column("type", String),
+    Column("started_at", DateTime(timezone=True), nullable=True),
+    Column("target_completion_at", DateTime(timezone=True), nullable=True),
+    Column("completed_at", DateTime(timezone=True), nullable=True),
+)
+
+Table(
+    "tasks",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("workflow_id", Integer, ForeignKey("workflows.id")),
+    Column("household_id", Integer, ForeignKey("households.id"), nullable=True),
+    Column("name", String, nullable=False),
+    Column("description", String, nullable=True),
+    Column("owner_role", String),
+    Column("status", String),
+    Column("priority", Integer),
+    Column("sla_due_at", DateTime(timezone=True), nullable=True),
+    Column("blocked_by_task_id", Integer, ForeignKey("tasks.id"), nullable=True),
+)
+
+Table(
+    "documents",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("household_id", Integer, ForeignKey("households.id")),
+    Column("account_id", Integer, ForeignKey("accounts.id"), nullable=True),
+    Column("type", String),
+    Column("name", String, nullable=False),
+    Column("storage_url", String, nullable=True),
+    Column("nigo_status", String),
+    Column("defects_json", JSON, nullable=True),
+)
+
+Table(
+    "audit_events",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("actor_type", String),
+    Column("actor_id", String),
+    Column("event_type", String, index=True),
+    Column("entity_type", String, nullable=True),
+    Column("entity_id", String, nullable=True),
+    Column("payload_json", JSON),
+)
+
+Table(
+    "jobs",
+    metadata,
+    Column("id", String, primary_key=True),
+    Column("kind", String, index=True, nullable=False),
+    Column("status", String, index=True),
+    Column("priority", Integer),
+    Column("progress", Float),
+    Column("message", String, nullable=True),
+    Column("payload_json", JSON, nullable=True),
+    Column("result_json", JSON, nullable=True),
+    Column("error", String, nullable=True),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("started_at", DateTime(timezone=True), nullable=True),
+    Column("finished_at", DateTime(timezone=True), nullable=True),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,27 @@
+"""
+Cache invalidation channel: workers append a row per invalidation and
+poll for rows newer than the last one they applied.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import func
+
+VERSION = 2
+DESCRIPTION = "cache invalidation channel"
+
+metadata = MetaData()
+
+Table(
+    "cache_invalidations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("cache", String, nullable=False),
+    Column("key", String, nullable=True),
+    Column("origin", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn)
@@ -0,0 +1,34 @@
+"""
+Source keys for incremental imports: each imported row records the id it
+has in the source extract and a hash of its imported content, and rows
+that disappear from the source can be tombstoned rather than deleted.
+"""
+
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column, create_index
+
+VERSION = 3
+DESCRIPTION = "source keys, content hashes and tombstones for imports"
+
+KEYED_TABLES = (
+    "households",
+    "accounts",
+    "workflows",
+    "tasks",
+    "documents",
+    "audit_events",
+)
+TOMBSTONED_TABLES = ("households", "accounts", "tasks", "documents")
+
+
+def upgrade(conn: Connection) -> None:
+    for table in KEYED_TABLES:
+        add_column(conn, table, Column("source_id", String, nullable=True))
+        add_column(conn, table, Column("source_hash", String, nullable=True))
+        create_index(conn, f"ix_{table}_source_id", table, "source_id", unique=True)
+    for table in TOMBSTONED_TABLES:
+        add_column(
+            conn, table, Column("deleted_at", DateTime(timezone=True), nullable=True)
+        )
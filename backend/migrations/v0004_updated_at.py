@@ -0,0 +1,34 @@
+"""
+Change timestamps for incremental exports: `updated_at` on the tables the
+book export reads, set on every insert and update. Existing rows are
+stamped with the migration time. On Postgres the column also gets a
+server default, so rows loaded with COPY (which skips Python defaults)
+are stamped too.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, column, table, update
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column, create_index
+
+VERSION = 4
+DESCRIPTION = "updated_at change timestamps for incremental exports"
+
+STAMPED_TABLES = ("households", "accounts", "tasks", "documents")
+
+
+def upgrade(conn: Connection) -> None:
+    now = datetime.now(timezone.utc)
+    for name in STAMPED_TABLES:
+        add_column(
+            conn, name, Column("updated_at", DateTime(timezone=True), nullable=True)
+        )
+        stamped = table(name, column("updated_at", DateTime(timezone=True)))
+        conn.execute(update(stamped).values(updated_at=now))
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(
+                f"ALTER TABLE {name} ALTER COLUMN updated_at SET DEFAULT now()"
+            )
+        create_index(conn, f"ix_{name}_updated_at", name, "updated_at")
@@ -0,0 +1,23 @@
+"""
+Cross-document consistency over the database: accounts keep the plan
+types from the source book (`delivering_plan_type`,
+`receiving_account_type`) and documents keep the fields extracted from
+them (`extracted_fields`), so a Transfer Form can be compared with its
+account without the original dataset.
+"""
+
+from sqlalchemy import JSON, Column, String
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column
+
+VERSION = 5
+DESCRIPTION = "account plan types and document extracted fields"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, "accounts", Column("delivering_plan_type", String, nullable=True))
+    add_column(
+        conn, "accounts", Column("receiving_account_type", String, nullable=True)
+    )
+    add_column(conn, "documents", Column("extracted_fields", JSON, nullable=True))
@@ -0,0 +1,32 @@
+"""
+`updated_at` on audit events, for incremental exports. `created_at` is
+when the event happened, which the importer takes from the source, so an
+event imported today can carry last year's time and be missed by an export
+since yesterday; `updated_at` is when the row was written here. Existing
+rows are stamped with the migration time.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, column, table, update
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column, create_index
+
+VERSION = 6
+DESCRIPTION = "updated_at change timestamps on audit events"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(
+        conn,
+        "audit_events",
+        Column("updated_at", DateTime(timezone=True), nullable=True),
+    )
+    stamped = table("audit_events", column("updated_at", DateTime(timezone=True)))
+    conn.execute(update(stamped).values(updated_at=datetime.now(timezone.utc)))
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(
+            "ALTER TABLE audit_events ALTER COLUMN updated_at SET DEFAULT now()"
+        )
+    create_index(conn, "ix_audit_events_updated_at", "audit_events", "updated_at")
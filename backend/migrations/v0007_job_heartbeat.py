@@ -0,0 +1,19 @@
+"""
+Job leases: a running job's row carries `heartbeat_at`, refreshed by the
+worker process running it. A RUNNING job whose heartbeat is older than the
+lease belonged to a process that died, and is queued again.
+"""
+
+from sqlalchemy import Column, DateTime
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column
+
+VERSION = 7
+DESCRIPTION = "heartbeats on running jobs"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(
+        conn, "jobs", Column("heartbeat_at", DateTime(timezone=True), nullable=True)
+    )
@@ -0,0 +1,17 @@
+"""
+Job attempts: incremented each time a worker claims the job. A job whose
+worker keeps dying is failed after `JOB_MAX_ATTEMPTS` claims instead of
+being requeued forever.
+"""
+
+from sqlalchemy import Column, Integer
+from sqlalchemy.engine import Connection
+
+from backend.migrations.ops import add_column
+
+VERSION = 8
+DESCRIPTION = "attempt counts on jobs"
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, "jobs", Column("attempts", Integer, nullable=True))
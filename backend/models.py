@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -5,6 +7,10 @@ from sqlalchemy.sql import func
 from backend.database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Advisor(Base):
     __tablename__ = "advisors"
 
@@ -33,6 +39,16 @@ class Household(Base):
     eta_date = Column(DateTime(timezone=True), nullable=True)
     risk_score = Column(Float, nullable=True)  # 0-100
 
+    # Set by imports (the backend/importer package): the row's id in the source
+    # extract and a hash of its imported content.
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # gone from source
+    # Change timestamp for incremental exports (backend/services/export.py).
+    updated_at = Column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, index=True
+    )
+
     advisor = relationship("Advisor", back_populates="households")
     accounts = relationship("Account", back_populates="household")
     documents = relationship("Document", back_populates="household")
@@ -53,6 +69,16 @@ class Account(Base):
         String, default="PENDING"
     )  # PENDING, OPEN, CLOSED, TRANSFER_IN_PROGRESS
     asset_value = Column(Float, default=0.0)
+    # As recorded in the source book; compared with Transfer Forms.
+    delivering_plan_type = Column(String, nullable=True)
+    receiving_account_type = Column(String, nullable=True)
+
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # gone from source
+    updated_at = Column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, index=True
+    )
 
     household = relationship("Household", back_populates="accounts")
     documents = relationship("Document", back_populates="account")
@@ -72,6 +98,9 @@ class Workflow(Base):
     target_completion_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+
     advisor = relationship("Advisor", back_populates="workflows")
     tasks = relationship("Task", back_populates="workflow")
 
@@ -94,6 +123,13 @@ class Task(Base):
     sla_due_at = Column(DateTime(timezone=True), nullable=True)
     blocked_by_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
 
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # gone from source
+    updated_at = Column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, index=True
+    )
+
     workflow = relationship("Workflow", back_populates="tasks")
     household = relationship("Household", back_populates="tasks")
     blocked_by = relationship("Task", remote_side=[id])
@@ -110,6 +146,14 @@ class Document(Base):
     storage_url = Column(String, nullable=True)
     nigo_status = Column(String, default="UNKNOWN")  # UNKNOWN, CLEAN, DEFECTS_FOUND
     defects_json = Column(JSON, nullable=True)
+    extracted_fields = Column(JSON, nullable=True)  # from the latest extraction
+
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # gone from source
+    updated_at = Column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, index=True
+    )
 
     household = relationship("Household", back_populates="documents")
     account = relationship("Account", back_populates="documents")
@@ -119,7 +163,11 @@ class AuditEvent(Base):
     __tablename__ = "audit_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Stamped in Python too: SQLite's CURRENT_TIMESTAMP is whole seconds,
+    # too coarse for incremental exports since a time.
+    created_at = Column(
+        DateTime(timezone=True), default=_utcnow, server_default=func.now()
+    )
     actor_type = Column(String, default="SYSTEM")  # USER, BOT, SYSTEM
     actor_id = Column(String, default="system")
     event_type = Column(
@@ -128,3 +176,45 @@ class AuditEvent(Base):
     entity_type = Column(String, nullable=True)  # Task, Household, Document
     entity_id = Column(String, nullable=True)
     payload_json = Column(JSON)  # Store details
+
+    source_id = Column(String, unique=True, index=True, nullable=True)
+    source_hash = Column(String, nullable=True)
+    # When the row was written here; imported events keep their source
+    # created_at, so incremental exports go by this instead.
+    updated_at = Column(
+        DateTime(timezone=True), default=_utcnow, onupdate=_utcnow, index=True
+    )
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    kind = Column(String, index=True, nullable=False)  # entity_match, meeting_pack, ...
+    status = Column(
+        String, default="QUEUED", index=True
+    )  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    priority = Column(Integer, default=1)  # Higher runs first
+    progress = Column(Float, default=0.0)  # 0-100
+    message = Column(String, nullable=True)
+    payload_json = Column(JSON, nullable=True)
+    result_json = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed while RUNNING; a stale one means the worker process died.
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # Claims so far; a job whose worker keeps dying is failed after a few.
+    attempts = Column(Integer, default=0)
+
+
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+
+    id = Column(Integer, primary_key=True)
+    cache = Column(String, nullable=False)  # communication_template, meeting_pack, ...
+    key = Column(String, nullable=True)  # None clears the whole cache
+    origin = Column(String, nullable=False)  # publishing worker
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from backend.database import engine
+from backend.services.export import EXPORT_TABLES, ROW_GROUP_SIZE, stream_table
+
+router = APIRouter()
+
+
+@router.get("/export/{table}")
+def export_table(
+    table: str,
+    since: Optional[datetime] = None,
+    row_group_size: int = Query(ROW_GROUP_SIZE, ge=1000, le=500_000),
+):
+    """
+    Streams one table of the book (households, accounts, tasks, documents,
+    audit_events) as a zstd-compressed Parquet file, a row group at a time.
+    With `since`, only rows changed at or after that time are included.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export table; expected one of {sorted(EXPORT_TABLES)}",
+        )
+    return StreamingResponse(
+        stream_table(engine, table, since, row_group_size),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{table}.parquet"'},
+    )
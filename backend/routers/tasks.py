@@ -22,7 +22,7 @@ def complete_task(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Status must be 'COMPLETED'"
         )
 
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(Task.id == task_id, Task.deleted_at.is_(None)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -59,7 +59,11 @@ def complete_task(
             db.query(Household).filter(Household.id == task.household_id).first()
         )
         if household:
-            all_tasks = db.query(Task).filter(Task.household_id == household.id).all()
+            all_tasks = (
+                db.query(Task)
+                .filter(Task.household_id == household.id, Task.deleted_at.is_(None))
+                .all()
+            )
             if all(t.status == "COMPLETED" for t in all_tasks):
                 # All tasks are complete. Logic for auto-completing household could go here.
                 # For now, we leave the household status as-is to allow for manual review.
@@ -22,7 +22,8 @@ def get_transitions(
     Supports filtering by advisor_id and status.
     Ordered by risk_score DESC, then eta_date ASC.
     """
-    query = db.query(Household)
+    # Households tombstoned by an incremental import are hidden.
+    query = db.query(Household).filter(Household.deleted_at.is_(None))
 
     if advisor_id:
         query = query.filter(Household.advisor_id == int(advisor_id))
@@ -37,16 +38,16 @@ def get_transitions(
     results = []
     for h in households:
         advisor_name = h.advisor.name if h.advisor else "Unknown"
-        accounts_count = len(h.accounts)
+        accounts_count = len(_live(h.accounts))
 
         # Open filtered tasks (not COMPLETED)
         # Note: relying on relationship might load all tasks. For optimization we might query count separately,
         # but for hackathon scale this is fine.
-        open_tasks = [t for t in h.tasks if t.status != "COMPLETED"]
+        open_tasks = [t for t in _live(h.tasks) if t.status != "COMPLETED"]
         open_tasks_count = len(open_tasks)
 
         # NIGO docs
-        nigo_docs = [d for d in h.documents if d.nigo_status == "DEFECTS_FOUND"]
+        nigo_docs = [d for d in _live(h.documents) if d.nigo_status == "DEFECTS_FOUND"]
         nigo_issues_count = len(nigo_docs)
 
         results.append(
@@ -70,22 +71,31 @@ def get_transition_detail(household_id: int, db: Session = Depends(get_db)):
     """
     Returns detailed view of a household, including accounts and tasks.
     """
-    household = db.query(Household).filter(Household.id == household_id).first()
+    household = (
+        db.query(Household)
+        .filter(Household.id == household_id, Household.deleted_at.is_(None))
+        .first()
+    )
     if not household:
         raise HTTPException(status_code=404, detail="Household not found")
 
     advisor_name = household.advisor.name if household.advisor else "Unknown"
 
+    accounts = _live(household.accounts)
+    tasks = _live(household.tasks)
+
     # Computations
-    total_tasks = len(household.tasks)
-    completed_tasks = len([t for t in household.tasks if t.status == "COMPLETED"])
+    total_tasks = len(tasks)
+    completed_tasks = len([t for t in tasks if t.status == "COMPLETED"])
     open_tasks_count = total_tasks - completed_tasks
 
     progress_percent = 0.0
     if total_tasks > 0:
         progress_percent = (completed_tasks / total_tasks) * 100.0
 
-    nigo_docs = [d for d in household.documents if d.nigo_status == "DEFECTS_FOUND"]
+    nigo_docs = [
+        d for d in _live(household.documents) if d.nigo_status == "DEFECTS_FOUND"
+    ]
     nigo_issues_count = len(nigo_docs)
 
     return HouseholdDetail(
@@ -98,6 +108,11 @@ def get_transition_detail(household_id: int, db: Session = Depends(get_db)):
         open_tasks_count=open_tasks_count,
         nigo_issues_count=nigo_issues_count,
         progress_percent=progress_percent,
-        accounts=household.accounts,
-        tasks=household.tasks,
+        accounts=accounts,
+        tasks=tasks,
     )
+
+
+def _live(rows: list) -> list:
+    """Drops rows tombstoned by an incremental import."""
+    return [row for row in rows if row.deleted_at is None]
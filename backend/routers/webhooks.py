@@ -1,10 +1,16 @@
+import logging
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from backend.database import get_db
+from backend.metrics import webhooks_in_flight
 from backend.models import Account, AuditEvent, Document, Task
+from backend.orchestrator import orchestrator
+from backend.services.jobs import JobQueueFull
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -24,6 +30,21 @@ async def receive_webhook(source: str, request: Request, db: Session = Depends(g
     if not event_type:
         raise HTTPException(status_code=422, detail="Missing event_type in payload")
 
+    # The handlers below block on the DB; keep them off the event loop.
+    webhooks_in_flight.inc()
+    try:
+        await orchestrator.execution.run_io(handle_event, db, source, payload)
+    finally:
+        webhooks_in_flight.dec()
+    return {"status": "received", "source": source, "event_type": event_type}
+
+
+def handle_event(db: Session, source: str, payload: dict) -> None:
+    """
+    Records the webhook as an audit event and applies its side effects.
+    """
+    event_type = payload["event_type"]
+
     # 1. Log Audit Event
     # Infer entity ID for audit log
     entity_type = None
@@ -58,16 +79,42 @@ async def receive_webhook(source: str, request: Request, db: Session = Depends(g
             doc_name = payload.get("filename", "Uploaded Document")
             doc_type = payload.get("doc_type", "OTHER")
 
+            account_id = payload.get("account_id")
+
             # Create new doc
             new_doc = Document(
                 household_id=household_id,
+                account_id=int(account_id) if str(account_id).isdigit() else None,
                 name=doc_name,
                 type=doc_type,
                 nigo_status="UNKNOWN",
+                extracted_fields=payload.get("extracted_fields"),
             )
             db.add(new_doc)
             db.commit()  # Commit to generate ID
 
+            # Re-check cross-document rules for the affected household only,
+            # off the request path.
+            extraction = None
+            if "extracted_fields" in payload:
+                extraction = {
+                    "doc_id": new_doc.id,
+                    "extracted_fields": payload["extracted_fields"],
+                    "confidence": payload.get("confidence"),
+                }
+            try:
+                orchestrator.submit_job(
+                    "consistency.household",
+                    {"household_id": household_id, "extraction": extraction},
+                )
+            except JobQueueFull:
+                # The document is already saved; the next full consistency
+                # check covers the household.
+                logger.warning(
+                    f"Job queue full, skipped consistency re-check for "
+                    f"household {household_id}"
+                )
+
     # ESIGN_COMPLETED
     elif event_type == "ESIGN_COMPLETED":
         doc_id = payload.get("document_id")
@@ -125,5 +172,3 @@ async def receive_webhook(source: str, request: Request, db: Session = Depends(g
                 db.add(new_task)
 
     db.commit()
-
-    return {"status": "received", "source": source, "event_type": event_type}
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
-from backend.database import Base, SessionLocal, engine
+from backend.database import SessionLocal, engine
+from backend.migrations import drop_schema, migrate
 from backend.models import (
     Account,
     Advisor,
@@ -15,8 +16,8 @@ from backend.models import (
 def seed_db():
     # Re-create tables since schema changed
     print("Dropping and recreating tables...")
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    drop_schema(engine)
+    migrate(engine)
 
     db = SessionLocal()
     print("Seeding database...")
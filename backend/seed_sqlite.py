@@ -15,10 +15,11 @@ from random import choice, randint, uniform
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.database import SessionLocal, engine
-from backend.models import Base, Advisor, Household, Account, Task, Document, Workflow, AuditEvent
+from backend.migrations import migrate
+from backend.models import Advisor, Household, Account, Task, Document, Workflow, AuditEvent
 
 # Create tables
-Base.metadata.create_all(bind=engine)
+migrate(engine)
 
 def seed_data():
     db = SessionLocal()
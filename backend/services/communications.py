@@ -0,0 +1,262 @@
+"""
+Communication drafting.
+
+Templates use `{{ field }}` placeholders. Each template source is parsed
+and compiled once into a list of literal and field parts, kept in an LRU
+keyed by the source text, and validated against the fields a household
+context provides. Batch drafting prefetches every household in a workflow
+or advisor book with one aggregate query, streamed in pages, and yields
+drafts one at a time so large sends never sit in memory together.
+"""
+
+import re
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import Advisor, Document, Household, Task
+from backend.services.compliance import scanner
+
+TEMPLATES: dict[str, dict[str, str]] = {
+    "STATUS_UPDATE": {
+        "subject": "Update on your account transfer to LPL Financial",
+        "body": (
+            "Dear {{ household_name }},\n\n"
+            "Here is where your transition stands: {{ completed_tasks }} of "
+            "{{ total_tasks }} steps are complete ({{ percent_complete }}%). "
+            "We currently expect to finish by {{ eta_date }}.\n\n"
+            "{{ closing }}\n{{ advisor_name }}"
+        ),
+    },
+    "MISSING_DOCUMENT": {
+        "subject": "Action needed: documents for your account transfer",
+        "body": (
+            "Dear {{ household_name }},\n\n"
+            "We need your help with {{ nigo_documents }} document(s) before your "
+            "transfer can continue. Please reply to this email and we will walk "
+            "you through what is missing.\n\n"
+            "{{ closing }}\n{{ advisor_name }}"
+        ),
+    },
+    "COMPLETION_NOTICE": {
+        "subject": "Your transition to LPL Financial is complete",
+        "body": (
+            "Dear {{ household_name }},\n\n"
+            "All {{ total_tasks }} steps of your transition are complete. "
+            "Thank you for your patience throughout the process.\n\n"
+            "{{ closing }}\n{{ advisor_name }}"
+        ),
+    },
+}
+
+TONE_CLOSINGS = {
+    "professional": "Kind regards,",
+    "friendly": "Talk soon,",
+    "urgent": "Thank you for your prompt attention,",
+}
+
+# Fields every household context provides; templates may use no others.
+CONTEXT_FIELDS = frozenset(
+    {
+        "household_id",
+        "household_name",
+        "advisor_name",
+        "status",
+        "eta_date",
+        "risk_score",
+        "total_tasks",
+        "completed_tasks",
+        "open_tasks",
+        "percent_complete",
+        "nigo_documents",
+        "closing",
+    }
+)
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+class TemplateError(ValueError):
+    """Raised when a template references unknown fields or is malformed."""
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    # Alternating parts: even indexes are literals, odd indexes field names.
+    parts: tuple[str, ...]
+    fields: frozenset[str]
+
+    def render(self, context: dict[str, Any]) -> str:
+        out = list(self.parts)
+        for i in range(1, len(out), 2):
+            value = context.get(out[i])
+            out[i] = "" if value is None else str(value)
+        return "".join(out)
+
+
+@lru_cache(maxsize=settings.COMM_TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Parses a template once; repeat calls with the same source hit the LRU.
+    """
+    parts = _PLACEHOLDER.split(source)
+    fields = frozenset(parts[1::2])
+    unknown = fields - CONTEXT_FIELDS
+    if unknown:
+        raise TemplateError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+    if "{{" in "".join(parts[0::2]):
+        raise TemplateError("Malformed placeholder in template")
+    return CompiledTemplate(tuple(parts), fields)
+
+
+@dataclass(frozen=True)
+class DraftTemplate:
+    template_type: str
+    subject: CompiledTemplate
+    body: CompiledTemplate
+    tone: str
+
+
+def resolve_template(payload: dict) -> DraftTemplate:
+    """
+    Picks the named template, letting the payload override subject/body.
+    """
+    template_type = _option(payload, "template_type", "STATUS_UPDATE").upper()
+    subject = _option(payload, "subject")
+    body = _option(payload, "body")
+    base = TEMPLATES.get(template_type)
+    if base is None and not (subject and body):
+        raise TemplateError(f"Unknown template_type: {template_type}")
+    base = base or {}
+    tone = _option(payload, "tone", "professional").lower()
+    if tone not in TONE_CLOSINGS:
+        raise TemplateError(f"Unknown tone: {tone}")
+    return DraftTemplate(
+        template_type=template_type,
+        subject=compile_template(subject or base["subject"]),
+        body=compile_template(body or base["body"]),
+        tone=tone,
+    )
+
+
+def _option(payload: dict, key: str, default: str = "") -> str:
+    value = payload.get(key) or default
+    if not isinstance(value, str):
+        raise TemplateError(f"'{key}' must be a string")
+    return value
+
+
+def render_draft(template: DraftTemplate, context: dict[str, Any]) -> dict:
+    context = {"closing": TONE_CLOSINGS[template.tone], **context}
+    subject = template.subject.render(context)
+    body = template.body.render(context)
+    return {
+        "draft_id": f"draft_{uuid.uuid4().hex[:12]}",
+        "household_id": context.get("household_id"),
+        "template_type": template.template_type,
+        "subject": subject,
+        "body": body,
+        "approval_required": True,
+        "compliance_flags": scanner.scan_fields({"subject": subject, "body": body}),
+    }
+
+
+def _prefetch_statement(
+    workflow_id: int | None = None,
+    advisor_id: int | None = None,
+    household_ids: list[int] | None = None,
+):
+    """
+    One SELECT returning a ready-to-render context row per household.
+    """
+    done = Task.status.in_(("COMPLETED", "COMPLETE"))
+    task_counts = (
+        select(
+            Task.household_id.label("household_id"),
+            func.count(Task.id).label("total_tasks"),
+            func.sum(case((done, 1), else_=0)).label("completed_tasks"),
+        )
+        .where(Task.deleted_at.is_(None))
+        .group_by(Task.household_id)
+        .subquery()
+    )
+    nigo_counts = (
+        select(
+            Document.household_id.label("household_id"),
+            func.count(Document.id).label("nigo_documents"),
+        )
+        .where(Document.nigo_status == "DEFECTS_FOUND", Document.deleted_at.is_(None))
+        .group_by(Document.household_id)
+        .subquery()
+    )
+    statement = (
+        select(
+            Household.id.label("household_id"),
+            Household.name.label("household_name"),
+            Household.status,
+            Household.eta_date,
+            Household.risk_score,
+            Advisor.name.label("advisor_name"),
+            func.coalesce(task_counts.c.total_tasks, 0).label("total_tasks"),
+            func.coalesce(task_counts.c.completed_tasks, 0).label("completed_tasks"),
+            func.coalesce(nigo_counts.c.nigo_documents, 0).label("nigo_documents"),
+        )
+        .outerjoin(Advisor, Advisor.id == Household.advisor_id)
+        .outerjoin(task_counts, task_counts.c.household_id == Household.id)
+        .outerjoin(nigo_counts, nigo_counts.c.household_id == Household.id)
+        .where(Household.deleted_at.is_(None))
+        .order_by(Household.id)
+    )
+    if workflow_id is not None:
+        statement = statement.where(
+            Household.id.in_(
+                select(Task.household_id).where(
+                    Task.workflow_id == workflow_id, Task.deleted_at.is_(None)
+                )
+            )
+        )
+    if advisor_id is not None:
+        statement = statement.where(Household.advisor_id == advisor_id)
+    if household_ids is not None:
+        statement = statement.where(Household.id.in_(household_ids))
+    return statement
+
+
+def _context(row) -> dict[str, Any]:
+    context = dict(row._mapping)
+    total = context["total_tasks"] or 0
+    completed = context["completed_tasks"] or 0
+    context["open_tasks"] = total - completed
+    context["percent_complete"] = round(100 * completed / total) if total else 0
+    eta = context["eta_date"]
+    context["eta_date"] = eta.strftime("%B %d, %Y") if eta else "a date to be confirmed"
+    context["advisor_name"] = context["advisor_name"] or "Your advisor"
+    return context
+
+
+def household_context(db: Session, household_id: int) -> dict[str, Any] | None:
+    row = db.execute(_prefetch_statement(household_ids=[household_id])).first()
+    return _context(row) if row else None
+
+
+def iter_drafts(
+    db: Session,
+    template: DraftTemplate,
+    workflow_id: int | None = None,
+    advisor_id: int | None = None,
+) -> Iterator[dict]:
+    """
+    Yields one draft per household in the workflow or advisor book.
+    Rows are fetched in pages, so memory stays flat however large the book.
+    """
+    statement = _prefetch_statement(workflow_id, advisor_id).execution_options(
+        yield_per=settings.COMM_BATCH_FETCH_SIZE
+    )
+    for row in db.execute(statement):
+        yield render_draft(template, _context(row))
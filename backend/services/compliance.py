@@ -0,0 +1,234 @@
+"""
+Compliance phrase scanning for outbound drafts.
+
+The phrase list (a CSV of kind, phrase, category, severity) is compiled
+into one Aho-Corasick automaton, so a draft is scanned in a single pass
+however many phrases there are. Phrases match case-insensitively on word
+boundaries. Regex rows (PII patterns such as SSNs) are folded into one
+alternation and also run in a single pass. The list is reloaded when the
+file changes on disk; scans in flight keep the automaton they started with.
+"""
+
+import csv
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rule:
+    phrase: str
+    category: str
+    severity: str
+
+
+class Automaton:
+    """
+    Aho-Corasick automaton over lower-cased phrases.
+    """
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        for index, rule in enumerate(rules):
+            self._add(rule.phrase.lower(), index)
+        self._link()
+
+    def _add(self, phrase: str, index: int) -> None:
+        state = 0
+        for char in phrase:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = nxt
+            state = nxt
+        self._out[state].append(index)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit the suffix state's matches so scanning never walks
+                # the fail chain just to collect output.
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """
+        Yields (start, end, rule_index) for every phrase occurrence in `text`.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            # Per character, so offsets stay aligned with the original text.
+            char = char.lower()
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                end = position + 1
+                yield end - len(self.rules[index].phrase), end, index
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+@dataclass
+class CompiledRules:
+    automaton: Automaton
+    pattern: re.Pattern | None
+    pattern_rules: list[Rule]
+
+    def scan(self, text: str) -> list[dict]:
+        flags = []
+        for start, end, index in self.automaton.iter_matches(text):
+            rule = self.automaton.rules[index]
+            # Whole words only: "guarantee" must not flag "guaranteeing".
+            if start > 0 and _is_word(text[start - 1]) and _is_word(rule.phrase[0]):
+                continue
+            if end < len(text) and _is_word(text[end]) and _is_word(rule.phrase[-1]):
+                continue
+            flags.append(_flag(rule, start, end, text))
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text):
+                rule = self.pattern_rules[int(match.lastgroup[1:])]
+                flags.append(_flag(rule, match.start(), match.end(), text))
+        flags.sort(key=lambda f: (f["start"], -f["end"]))
+        return flags
+
+
+def _flag(rule: Rule, start: int, end: int, text: str) -> dict:
+    return {
+        "phrase": rule.phrase,
+        "category": rule.category,
+        "severity": rule.severity,
+        "start": start,
+        "end": end,
+        "match": text[start:end],
+    }
+
+
+def compile_rules(rows: list[dict]) -> CompiledRules:
+    phrases, patterns = [], []
+    for line, row in enumerate(rows, start=2):
+        if not isinstance(row.get("phrase"), str):
+            # A short or half-typed row; the rest of the list still applies.
+            logger.warning(f"Skipping compliance row {line}: no phrase")
+            continue
+        rule = Rule(
+            row["phrase"].strip(),
+            (row.get("category") or "GENERAL").strip().upper(),
+            (row.get("severity") or "MEDIUM").strip().upper(),
+        )
+        if not rule.phrase:
+            continue
+        if (row.get("kind") or "phrase").strip().lower() == "pattern":
+            re.compile(rule.phrase)  # fail on the offending row, not the union
+            patterns.append(rule)
+        else:
+            phrases.append(rule)
+    pattern = None
+    if patterns:
+        pattern = re.compile(
+            "|".join(f"(?P<p{i}>{rule.phrase})" for i, rule in enumerate(patterns))
+        )
+    return CompiledRules(Automaton(phrases), pattern, patterns)
+
+
+def load_rules(path: Path) -> CompiledRules:
+    with path.open(newline="", encoding="utf-8") as handle:
+        return compile_rules(list(csv.DictReader(handle)))
+
+
+class ComplianceScanner:
+    """
+    Scans text against the phrase list at `path`, recompiling when the
+    file's mtime changes. The file is stat'ed at most every
+    `check_interval` seconds.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 2.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._rules: CompiledRules | None = None
+        self._mtime_ns: int | None = None
+        self._checked_at = 0.0
+
+    def rules(self) -> CompiledRules:
+        now = time.monotonic()
+        if self._rules is not None and now - self._checked_at < self.check_interval:
+            return self._rules
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                logger.error(f"Compliance phrase list missing: {self.path}")
+                mtime_ns = None
+            if self._rules is None or (mtime_ns and mtime_ns != self._mtime_ns):
+                self._reload(mtime_ns)
+        return self._rules
+
+    def invalidate(self) -> None:
+        """
+        Recompiles the phrase list on the next scan, whatever its mtime.
+        """
+        with self._lock:
+            self._mtime_ns = None
+            self._checked_at = 0.0
+
+    def _reload(self, mtime_ns: int | None) -> None:
+        try:
+            rules = load_rules(self.path) if mtime_ns else compile_rules([])
+        except Exception as exc:
+            # Keep scanning with the last good list rather than none at all,
+            # and do not re-parse the bad file until it changes again.
+            logger.error(f"Could not load compliance phrases: {exc}", exc_info=True)
+            if self._rules is None:
+                self._rules = compile_rules([])
+            self._mtime_ns = mtime_ns
+            return
+        self._rules = rules
+        self._mtime_ns = mtime_ns
+        logger.info(
+            f"Loaded {len(rules.automaton.rules)} compliance phrases and "
+            f"{len(rules.pattern_rules)} patterns from {self.path}"
+        )
+
+    def scan(self, text: str) -> list[dict]:
+        return self.rules().scan(text)
+
+    def scan_fields(self, fields: dict[str, str]) -> list[dict]:
+        rules = self.rules()
+        return [
+            {"field": name, **flag}
+            for name, text in fields.items()
+            for flag in rules.scan(text or "")
+        ]
+
+
+scanner = ComplianceScanner(
+    Path(settings.COMPLIANCE_PHRASES_PATH), settings.COMPLIANCE_RELOAD_INTERVAL
+)
@@ -0,0 +1,377 @@
+"""
+Cross-document consistency checks over a household book.
+
+Single-document NIGO rules (see backend.services.nigo) cannot see defects
+that only appear when documents are compared with each other or with the
+account they belong to. This module joins accounts, documents and
+extractions into in-memory indexes keyed by account_id and household_id,
+then evaluates cross-entity rules household by household in one pass.
+"""
+
+import csv
+import json
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from backend.models import Account, Document
+from backend.services.nigo import normalize_doc_type
+
+Finding = dict[str, Any]
+
+
+def _key(value: Any) -> str | None:
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _normalize_plan(value: Any) -> str:
+    return " ".join(str(value or "").upper().replace("_", " ").split())
+
+
+@dataclass
+class BookIndex:
+    """
+    Join indexes over one book of households.
+    All ids are stored as strings so dataset ids and DB ids share one shape.
+    """
+
+    accounts: dict[str, dict] = field(default_factory=dict)
+    documents: dict[str, dict] = field(default_factory=dict)
+    extractions: dict[str, dict] = field(default_factory=dict)
+    accounts_by_household: dict[str, list[str]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    documents_by_household: dict[str, list[str]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    documents_by_account: dict[str, list[str]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+
+    @classmethod
+    def build(
+        cls,
+        accounts: Iterable[dict],
+        documents: Iterable[dict],
+        extractions: Iterable[dict] = (),
+    ) -> "BookIndex":
+        index = cls()
+        for account in accounts:
+            index.add_account(account)
+        for extraction in extractions:
+            doc_id = _key(extraction.get("doc_id"))
+            if doc_id:
+                index.extractions[doc_id] = extraction
+        for document in documents:
+            index.add_document(document)
+        return index
+
+    def add_account(self, account: dict) -> None:
+        account_id = _key(account.get("account_id"))
+        household_id = _key(account.get("household_id"))
+        if not account_id:
+            return
+        self.accounts[account_id] = account
+        if household_id:
+            self.accounts_by_household[household_id].append(account_id)
+
+    def add_document(
+        self, document: dict, extraction: dict | None = None
+    ) -> str | None:
+        """
+        Indexes a document (and optionally its extraction).
+        Returns the household id whose consistency may have changed.
+        """
+        doc_id = _key(document.get("doc_id"))
+        if not doc_id:
+            return None
+        household_id = _key(document.get("household_id"))
+        account_id = _key(document.get("account_id"))
+        if account_id and not household_id and account_id in self.accounts:
+            household_id = _key(self.accounts[account_id].get("household_id"))
+        document = {
+            **document,
+            "doc_id": doc_id,
+            "household_id": household_id,
+            "account_id": account_id,
+            "doc_type": normalize_doc_type(document.get("doc_type")),
+        }
+
+        self.documents[doc_id] = document
+        if household_id:
+            self.documents_by_household[household_id].append(doc_id)
+        if account_id:
+            self.documents_by_account[account_id].append(doc_id)
+        if extraction is not None:
+            self.extractions[doc_id] = extraction
+        return household_id
+
+    def household_ids(self) -> list[str]:
+        return sorted(
+            set(self.accounts_by_household) | set(self.documents_by_household)
+        )
+
+    def account_documents(self, account_id: str, doc_type: str) -> list[dict]:
+        return [
+            self.documents[d]
+            for d in self.documents_by_account.get(account_id, ())
+            if self.documents[d]["doc_type"] == doc_type
+        ]
+
+    def household_documents(self, household_id: str, doc_type: str) -> list[dict]:
+        return [
+            self.documents[d]
+            for d in self.documents_by_household.get(household_id, ())
+            if self.documents[d]["doc_type"] == doc_type
+        ]
+
+    def fields(self, doc_id: str) -> dict:
+        return (self.extractions.get(doc_id) or {}).get("extracted_fields") or {}
+
+
+def _finding(
+    rule: str,
+    severity: str,
+    household_id: str,
+    message: str,
+    account_id: str | None = None,
+    doc_id: str | None = None,
+    evidence: Any = None,
+) -> Finding:
+    return {
+        "rule": rule,
+        "severity": severity,
+        "household_id": household_id,
+        "account_id": account_id,
+        "doc_id": doc_id,
+        "message": message,
+        "evidence": evidence,
+    }
+
+
+def _is_ira(account: dict) -> bool:
+    text = " ".join(
+        str(account.get(k) or "")
+        for k in ("account_type", "delivering_plan_type", "registration")
+    )
+    return "IRA" in text.upper()
+
+
+def check_transfer_plan_type(index: BookIndex, household_id: str) -> list[Finding]:
+    findings = []
+    for account_id in index.accounts_by_household.get(household_id, ()):
+        account = index.accounts[account_id]
+        for doc in index.account_documents(account_id, "TRANSFER_FORM"):
+            fields = index.fields(doc["doc_id"])
+            for form_field, account_field in (
+                ("delivering_plan_type", "delivering_plan_type"),
+                ("receiving_account_type", "receiving_account_type"),
+            ):
+                expected = _normalize_plan(account.get(account_field))
+                actual = _normalize_plan(fields.get(form_field))
+                if expected and actual and expected != actual:
+                    findings.append(
+                        _finding(
+                            "TRANSFER_FORM_ACCOUNT_MISMATCH",
+                            "HIGH",
+                            household_id,
+                            f"Transfer Form {form_field} disagrees with the account",
+                            account_id=account_id,
+                            doc_id=doc["doc_id"],
+                            evidence=f"{fields.get(form_field)} != "
+                            f"{account.get(account_field)}",
+                        )
+                    )
+    return findings
+
+
+def check_ira_beneficiary(index: BookIndex, household_id: str) -> list[Finding]:
+    findings = []
+    for account_id in index.accounts_by_household.get(household_id, ()):
+        account = index.accounts[account_id]
+        if not _is_ira(account):
+            continue
+        designations = index.account_documents(account_id, "BENEFICIARY_DESIGNATION")
+        if not designations:
+            findings.append(
+                _finding(
+                    "MISSING_BENEFICIARY_DESIGNATION",
+                    "MEDIUM",
+                    household_id,
+                    "IRA account has no Beneficiary Designation on file",
+                    account_id=account_id,
+                )
+            )
+            continue
+        named = [
+            d
+            for d in designations
+            if d["doc_id"] not in index.extractions
+            or index.fields(d["doc_id"]).get("beneficiaries")
+        ]
+        if not named:
+            findings.append(
+                _finding(
+                    "MISSING_BENEFICIARY_DESIGNATION",
+                    "MEDIUM",
+                    household_id,
+                    "IRA Beneficiary Designation names no beneficiaries",
+                    account_id=account_id,
+                    doc_id=designations[-1]["doc_id"],
+                )
+            )
+    return findings
+
+
+def check_required_account_documents(
+    index: BookIndex, household_id: str
+) -> list[Finding]:
+    findings = []
+    for account_id in index.accounts_by_household.get(household_id, ()):
+        for doc_type in ("TRANSFER_FORM", "ADVISORY_AGREEMENT"):
+            if not index.account_documents(account_id, doc_type):
+                findings.append(
+                    _finding(
+                        f"MISSING_{doc_type}",
+                        "MEDIUM",
+                        household_id,
+                        f"Account has no {doc_type.replace('_', ' ').title()} on file",
+                        account_id=account_id,
+                    )
+                )
+    return findings
+
+
+def check_client_name(index: BookIndex, household_id: str) -> list[Finding]:
+    id_names = {
+        _text(index.fields(d["doc_id"]).get("name")).lower()
+        for d in index.household_documents(household_id, "GOVERNMENT_ID")
+    } - {"", "[unreadable]"}
+    if not id_names:
+        return []
+    findings = []
+    for doc in index.household_documents(household_id, "ADVISORY_AGREEMENT"):
+        client_name = _text(index.fields(doc["doc_id"]).get("client_name"))
+        if client_name and client_name.lower() not in id_names:
+            findings.append(
+                _finding(
+                    "CLIENT_NAME_MISMATCH",
+                    "MEDIUM",
+                    household_id,
+                    "Advisory Agreement client name does not match any Government ID",
+                    account_id=_key(doc.get("account_id")),
+                    doc_id=doc["doc_id"],
+                    evidence=client_name,
+                )
+            )
+    return findings
+
+
+CROSS_RULES: list[Callable[[BookIndex, str], list[Finding]]] = [
+    check_transfer_plan_type,
+    check_ira_beneficiary,
+    check_required_account_documents,
+    check_client_name,
+]
+
+
+def check_households(
+    index: BookIndex, household_ids: Iterable[str] | None = None
+) -> dict[str, list[Finding]]:
+    """
+    Evaluates every cross-entity rule for the given households
+    (the whole book when omitted) and returns findings per household.
+    """
+    ids = index.household_ids() if household_ids is None else household_ids
+    results = {}
+    for household_id in ids:
+        household_id = str(household_id)
+        findings: list[Finding] = []
+        for rule in CROSS_RULES:
+            findings.extend(rule(index, household_id))
+        results[household_id] = findings
+    return results
+
+
+def load_index_from_dataset(data_dir: Path) -> BookIndex:
+    """
+    Builds an index from a demo-style dataset folder
+    (accounts.csv, documents.csv, document_extractions.json).
+    """
+    with (data_dir / "accounts.csv").open(newline="", encoding="ascii") as handle:
+        accounts = list(csv.DictReader(handle))
+    with (data_dir / "documents.csv").open(newline="", encoding="ascii") as handle:
+        documents = list(csv.DictReader(handle))
+    extractions_path = data_dir / "document_extractions.json"
+    extractions = (
+        json.loads(extractions_path.read_text()) if extractions_path.exists() else []
+    )
+    return BookIndex.build(accounts, documents, extractions)
+
+
+def load_index_from_db(
+    db: Session, household_ids: Iterable[int] | None = None
+) -> BookIndex:
+    """
+    Builds an index from the database, optionally scoped to some households.
+    Documents' stored `extracted_fields` stand in for their extractions.
+    """
+    accounts_query = db.query(
+        Account.id,
+        Account.household_id,
+        Account.type,
+        Account.account_number,
+        Account.delivering_plan_type,
+        Account.receiving_account_type,
+    )
+    documents_query = db.query(
+        Document.id,
+        Document.household_id,
+        Document.account_id,
+        Document.type,
+        Document.extracted_fields,
+    )
+    # Rows tombstoned by an incremental import are left out.
+    accounts_query = accounts_query.filter(Account.deleted_at.is_(None))
+    documents_query = documents_query.filter(Document.deleted_at.is_(None))
+    if household_ids is not None:
+        ids = list(household_ids)
+        accounts_query = accounts_query.filter(Account.household_id.in_(ids))
+        documents_query = documents_query.filter(Document.household_id.in_(ids))
+
+    accounts = (
+        {
+            "account_id": row.id,
+            "household_id": row.household_id,
+            "account_type": row.type,
+            "account_number": row.account_number,
+            "delivering_plan_type": row.delivering_plan_type,
+            "receiving_account_type": row.receiving_account_type,
+        }
+        for row in accounts_query
+    )
+    index = BookIndex.build(accounts, ())
+    for row in documents_query:
+        extraction = None
+        if row.extracted_fields is not None:
+            extraction = {"doc_id": row.id, "extracted_fields": row.extracted_fields}
+        index.add_document(
+            {
+                "doc_id": row.id,
+                "household_id": row.household_id,
+                "account_id": row.account_id,
+                "doc_type": row.type,
+            },
+            extraction,
+        )
+    return index
@@ -0,0 +1,274 @@
+"""
+Within-batch duplicate detection for custodian imports.
+
+Records are reduced to MinHash signatures over normalized name, address and
+contact shingles. Locality-sensitive hashing (banding) then yields candidate
+pairs in near-linear time, candidates are verified against the estimated
+Jaccard similarity and connected into clusters.
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NAME_NOISE = {"the", "and", "family", "household", "llc", "inc", "trust", "jr", "sr"}
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "road": "rd",
+    "drive": "dr",
+    "boulevard": "blvd",
+    "lane": "ln",
+    "court": "ct",
+    "suite": "ste",
+    "apartment": "apt",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+
+NAME_FIELDS = ("name", "household_name", "client_name", "primary_contact")
+ADDRESS_FIELDS = ("address", "street", "city", "state", "zip")
+ID_FIELDS = ("record_id", "id", "household_id", "client_id", "account_id")
+
+
+@dataclass(frozen=True)
+class DedupeConfig:
+    """
+    Tuning knobs for duplicate detection.
+
+    More bands (fewer rows per band) raise recall; a higher threshold raises
+    precision by discarding weak candidate pairs after LSH.
+    """
+
+    num_perm: int = 128
+    bands: int = 32
+    threshold: float = 0.6
+    shingle_size: int = 3
+    seed: int = 1
+
+    @property
+    def rows(self) -> int:
+        return self.num_perm // self.bands
+
+    def validate(self) -> None:
+        if self.num_perm <= 0 or self.bands <= 0:
+            raise ValueError("num_perm and bands must be positive")
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be divisible by bands")
+        if not 0.0 < self.threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+
+
+def _normalize_text(value: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def normalize_name(value: Any) -> str:
+    tokens = [t for t in _normalize_text(value).split() if t not in _NAME_NOISE]
+    return " ".join(tokens)
+
+
+def normalize_address(value: Any) -> str:
+    tokens = _normalize_text(value).split()
+    return " ".join(_ADDRESS_ABBREVIATIONS.get(t, t) for t in tokens)
+
+
+def normalize_email(value: Any) -> str:
+    email = str(value or "").strip().lower()
+    if "@" not in email:
+        return ""
+    local, _, domain = email.partition("@")
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def normalize_phone(value: Any) -> str:
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return digits[-10:]
+
+
+def _char_shingles(prefix: str, text: str, size: int) -> set[str]:
+    if not text:
+        return set()
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {prefix + padded}
+    return {prefix + padded[i : i + size] for i in range(len(padded) - size + 1)}
+
+
+def record_shingles(record: dict, shingle_size: int = 3) -> set[str]:
+    """
+    Builds the shingle set for a single import record.
+    """
+    name = " ".join(normalize_name(record.get(f)) for f in NAME_FIELDS if record.get(f))
+    address = " ".join(
+        normalize_address(record.get(f)) for f in ADDRESS_FIELDS if record.get(f)
+    )
+
+    shingles = _char_shingles("n:", name, shingle_size)
+    shingles |= _char_shingles("a:", address, shingle_size)
+
+    email = normalize_email(record.get("email"))
+    if email:
+        shingles.add(f"e:{email}")
+        shingles |= _char_shingles("e:", email.split("@", 1)[0], shingle_size)
+    phone = normalize_phone(record.get("phone"))
+    if phone:
+        shingles.add(f"p:{phone}")
+        shingles.add(f"p4:{phone[-4:]}")
+    return shingles
+
+
+def _hash_shingles(shingles: Iterable[str]) -> np.ndarray:
+    values = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+        for s in shingles
+    ]
+    return np.fromiter(values, dtype=np.uint64, count=len(values))
+
+
+class MinHasher:
+    """
+    Produces fixed-length MinHash signatures using universal hashing.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: set[str]) -> np.ndarray:
+        return self.signatures([shingles])[0]
+
+    def signatures(
+        self, shingle_sets: list[set[str]], chunk_size: int = 2048
+    ) -> np.ndarray:
+        """
+        Computes signatures for many records at once, one matrix op per chunk.
+        Records without shingles get an all-max signature.
+        """
+        result = np.full((len(shingle_sets), self.num_perm), _MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(shingle_sets), chunk_size):
+            chunk = shingle_sets[start : start + chunk_size]
+            rows = [start + i for i, shingles in enumerate(chunk) if shingles]
+            if not rows:
+                continue
+            hashes = _hash_shingles(s for i in rows for s in shingle_sets[i])
+            sizes = np.fromiter((len(shingle_sets[i]) for i in rows), dtype=np.int64)
+            offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            with np.errstate(over="ignore"):
+                permuted = (
+                    np.outer(self._a, hashes) + self._b[:, None]
+                ) % _MERSENNE_PRIME
+            permuted &= _MAX_HASH
+            result[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return result
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, left: int, right: int) -> None:
+        left_root, right_root = self.find(left), self.find(right)
+        if left_root != right_root:
+            self.parent[max(left_root, right_root)] = min(left_root, right_root)
+
+
+def _record_id(record: dict, index: int) -> str:
+    for field in ID_FIELDS:
+        if record.get(field) not in (None, ""):
+            return str(record[field])
+    return str(index)
+
+
+def find_duplicate_clusters(
+    records: list[dict], config: DedupeConfig | None = None
+) -> list[dict]:
+    """
+    Returns clusters of suspected duplicate records within one batch.
+
+    Each cluster lists the member record ids and the lowest estimated Jaccard
+    similarity among the verified pairs that joined it.
+    """
+    config = config or DedupeConfig()
+    config.validate()
+    if len(records) < 2:
+        return []
+
+    hasher = MinHasher(config.num_perm, config.seed)
+    signatures = hasher.signatures(
+        [record_shingles(r, config.shingle_size) for r in records]
+    )
+    populated = np.flatnonzero(~(signatures == _MAX_HASH).all(axis=1))
+
+    # Banding: records sharing any band bucket become candidate pairs.
+    candidates: set[tuple[int, int]] = set()
+    rows = config.rows
+    for band in range(config.bands):
+        band_slice = np.ascontiguousarray(
+            signatures[populated, band * rows : (band + 1) * rows]
+        )
+        keys = band_slice.view(np.dtype((np.void, band_slice.dtype.itemsize * rows)))
+        _, inverse, counts = np.unique(
+            keys.ravel(), return_inverse=True, return_counts=True
+        )
+        shared = counts[inverse] > 1
+        if not shared.any():
+            continue
+        shared_buckets = inverse[shared]
+        order = np.argsort(shared_buckets, kind="stable")
+        _, sizes = np.unique(shared_buckets, return_counts=True)
+        for bucket in np.split(populated[shared][order], np.cumsum(sizes)[:-1]):
+            members = bucket.tolist()
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    candidates.add((members[i], members[j]))
+
+    union_find = _UnionFind(len(records))
+    edge_similarity: dict[tuple[int, int], float] = {}
+    for left, right in candidates:
+        similarity = float(np.mean(signatures[left] == signatures[right]))
+        if similarity >= config.threshold:
+            union_find.union(left, right)
+            edge_similarity[(left, right)] = similarity
+
+    grouped: dict[int, tuple[set[int], list[float]]] = {}
+    for (left, right), similarity in edge_similarity.items():
+        members, similarities = grouped.setdefault(union_find.find(left), (set(), []))
+        members.update((left, right))
+        similarities.append(similarity)
+
+    clusters = []
+    for root in sorted(grouped):
+        members, similarities = grouped[root]
+        clusters.append(
+            {
+                "cluster_id": f"dup_{len(clusters) + 1:03d}",
+                "record_ids": [_record_id(records[i], i) for i in sorted(members)],
+                "size": len(members),
+                "min_similarity": round(min(similarities), 3),
+            }
+        )
+    return clusters
@@ -0,0 +1,245 @@
+"""
+Execution layer for keeping blocking work off the event loop.
+
+I/O-bound calls (database reads and writes) run in a bounded thread pool;
+CPU-bound calls (matching, scoring, validation) run in a process pool so
+they do not hold the GIL against request handling. Each pool tracks
+submissions, in-flight work, queue wait and run time so saturation is
+visible, and rejects new work once its backlog is full.
+"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+
+class PoolSaturated(Exception):
+    """Raised when a pool's backlog is full."""
+
+
+class PoolStats:
+    """
+    Counters for one pool. Latency windows keep the most recent samples.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int, window: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.waits: deque[float] = deque(maxlen=window)
+        self.runs: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    def admit(self) -> None:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.name} pool is saturated, retry later")
+            self.submitted += 1
+
+    def finished(self, wait: float, run: float, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.waits.append(wait)
+            self.runs.append(run)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits, runs = sorted(self.waits), sorted(self.runs)
+            in_flight = self.pending
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "in_flight": in_flight,
+                "queued": max(in_flight - self.max_workers, 0),
+                "utilization": round(min(in_flight / self.max_workers, 1.0), 3),
+                "wait_ms_p50": _percentile_ms(waits, 0.5),
+                "wait_ms_p99": _percentile_ms(waits, 0.99),
+                "run_ms_p50": _percentile_ms(runs, 0.5),
+                "run_ms_p99": _percentile_ms(runs, 0.99),
+            }
+
+
+def _percentile_ms(samples: list[float], q: float) -> float | None:
+    if not samples:
+        return None
+    return round(samples[min(int(q * len(samples)), len(samples) - 1)] * 1000, 3)
+
+
+def _timed(fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, float, float]:
+    # Runs in the worker (thread or process); wall clock so it spans processes.
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time() - started
+
+
+class ExecutionLayer:
+    """
+    Runs blocking callables in the thread or process pool and awaits them.
+    With `offload=False` calls run inline on the caller, for comparison.
+    """
+
+    def __init__(
+        self,
+        io_workers: int,
+        cpu_workers: int | None = None,
+        max_pending: int = 256,
+        offload: bool = True,
+        window: int = 1024,
+    ):
+        cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.offload = offload
+        self._io: ThreadPoolExecutor | None = None
+        self._io_workers = io_workers
+        self._cpu: ProcessPoolExecutor | None = None
+        self._cpu_workers = cpu_workers
+        self._lock = threading.Lock()
+        self.stats = {
+            "io": PoolStats("io", io_workers, io_workers + max_pending, window),
+            "cpu": PoolStats("cpu", cpu_workers, cpu_workers + max_pending, window),
+        }
+
+    def _io_pool(self) -> ThreadPoolExecutor:
+        if self._io is None:
+            with self._lock:
+                if self._io is None:
+                    self._io = ThreadPoolExecutor(
+                        self._io_workers, thread_name_prefix="exec-io"
+                    )
+        return self._io
+
+    def _cpu_pool(self) -> ProcessPoolExecutor:
+        if self._cpu is None:
+            with self._lock:
+                if self._cpu is None:
+                    # Spawned, not forked: the parent runs threads (job workers,
+                    # the I/O pool) whose held locks a forked child would inherit.
+                    self._cpu = ProcessPoolExecutor(
+                        self._cpu_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._cpu
+
+    async def run_io(self, fn: Callable, *args, **kwargs) -> Any:
+        pool = self._io_pool() if self.offload else None
+        return await self._run("io", pool, fn, args, kwargs)
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        `fn` and its arguments must be picklable (module-level functions).
+        """
+        pool = self._cpu_pool() if self.offload else None
+        return await self._run("cpu", pool, fn, args, kwargs)
+
+    async def _run(
+        self, name: str, pool: Executor | None, fn: Callable, args, kwargs
+    ) -> Any:
+        stats = self.stats[name]
+        stats.admit()
+        submitted = time.time()
+        ok = False
+        started = finished = submitted
+        try:
+            if not self.offload:
+                result, started, run = _timed(fn, args, kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                call = functools.partial(_timed, fn, args, kwargs)
+                if isinstance(pool, ThreadPoolExecutor):
+                    # Carry the request id and trace into the worker thread.
+                    call = functools.partial(contextvars.copy_context().run, call)
+                result, started, run = await loop.run_in_executor(pool, call)
+            finished = started + run
+            ok = True
+            return result
+        finally:
+            if not ok:
+                finished = time.time()
+            stats.finished(max(started - submitted, 0.0), finished - started, ok)
+
+    def map_cpu(self, fn: Callable, items: Iterable) -> Iterator[Any]:
+        """
+        `fn(item)` for each item in the process pool, yielded in input order,
+        for callers on a worker thread rather than the event loop. At most two
+        calls per worker are in flight; each is admitted and timed like
+        `run_cpu`.
+        """
+        stats = self.stats["cpu"]
+        if not self.offload:
+            for item in items:
+                stats.admit()
+                ok = False
+                started = time.time()
+                try:
+                    result = fn(item)
+                    ok = True
+                finally:
+                    stats.finished(0.0, time.time() - started, ok)
+                yield result
+            return
+
+        pool = self._cpu_pool()
+        items = iter(items)
+        in_flight: deque = deque()
+
+        def submit(item) -> None:
+            stats.admit()
+            in_flight.append((time.time(), pool.submit(_timed, fn, (item,), {})))
+
+        try:
+            for item in itertools.islice(items, 2 * self._cpu_workers):
+                submit(item)
+            while in_flight:
+                submitted, future = in_flight.popleft()
+                ok = False
+                started = submitted
+                try:
+                    result, started, run = future.result()
+                    ok = True
+                finally:
+                    finished = started + run if ok else time.time()
+                    stats.finished(
+                        max(started - submitted, 0.0), finished - started, ok
+                    )
+                for item in itertools.islice(items, 1):
+                    submit(item)
+                yield result
+        finally:
+            # Abandoned or failed part way: release what is still admitted.
+            for submitted, future in in_flight:
+                future.cancel()
+                stats.finished(max(time.time() - submitted, 0.0), 0.0, False)
+
+    def snapshot(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for pool in (self._io, self._cpu):
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+            self._io = self._cpu = None
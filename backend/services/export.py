@@ -0,0 +1,293 @@
+"""
+Columnar export of the transition book.
+
+Each exported table is written as one Parquet file, zstd-compressed, in
+row groups of a fixed size. Rows are read through a server-side cursor
+(`stream_results`) one row group at a time, converted to an Arrow record
+batch and written out before the next is fetched, so memory is bounded by
+the row group size however large the book is.
+
+An incremental export (`since`) holds only rows whose `updated_at` is at
+or after that time. Tombstoned rows are exported with their `deleted_at`,
+so a consumer can apply deletes as well as changes.
+
+The manifest `export_book` writes carries `next_since`, the `since` for
+the next export: the newest `updated_at` the export saw, read from the
+database in the same snapshot as the rows, less `WATERMARK_OVERLAP`. It
+is not the clock at export start, because on Postgres `updated_at` is
+stamped with `now()`, the start of the writing transaction, so a row
+committed after the export's snapshot can carry an earlier time. The
+overlap covers writing transactions up to that long; rows near the
+boundary are exported twice, so consumers should upsert by `id`.
+
+pyarrow is imported on first use, so the API does not pay for it at
+startup.
+"""
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from sqlalchemy import JSON, DateTime, Float, Integer, Table, func, select
+from sqlalchemy.engine import Connection, Engine
+
+from backend.models import Account, AuditEvent, Document, Household, Task
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ROW_GROUP_SIZE = 50_000
+COMPRESSION = "zstd"
+# How far before the newest change seen the next incremental export starts.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Internal to imports; not part of the book.
+_SKIPPED_COLUMNS = {"source_hash"}
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    table: Table
+    # Column compared with `since` for incremental exports.
+    changed: str
+
+    @property
+    def columns(self) -> list:
+        return [c for c in self.table.c if c.name not in _SKIPPED_COLUMNS]
+
+    @property
+    def schema(self) -> "pa.Schema":
+        import pyarrow as pa
+
+        return pa.schema(
+            [pa.field(column.name, _arrow_type(column.type)) for column in self.columns]
+        )
+
+
+EXPORT_TABLES = {
+    "households": ExportTable(Household.__table__, "updated_at"),
+    "accounts": ExportTable(Account.__table__, "updated_at"),
+    "tasks": ExportTable(Task.__table__, "updated_at"),
+    "documents": ExportTable(Document.__table__, "updated_at"),
+    "audit_events": ExportTable(AuditEvent.__table__, "updated_at"),
+}
+
+
+def _arrow_type(type_) -> "pa.DataType":
+    import pyarrow as pa
+
+    if isinstance(type_, Integer):
+        return pa.int64()
+    if isinstance(type_, Float):
+        return pa.float64()
+    if isinstance(type_, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    # Text, and JSON columns as their JSON text.
+    return pa.string()
+
+
+def _utc(value: datetime) -> datetime:
+    # Naive timestamps are taken as UTC, as they are stored on SQLite.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def export_table(name: str) -> ExportTable:
+    """
+    The export definition for `name`; raises KeyError for unknown tables.
+    """
+    try:
+        return EXPORT_TABLES[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown export table {name!r}; expected one of {sorted(EXPORT_TABLES)}"
+        ) from None
+
+
+def iter_batches(
+    conn: Connection,
+    name: str,
+    since: datetime | None = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Record batches of at most `row_group_size` rows of table `name`, in id
+    order, read with a server-side cursor.
+    """
+    import pyarrow as pa
+
+    spec = export_table(name)
+    columns = spec.columns
+    statement = select(*columns).order_by(spec.table.c.id)
+    if since is not None:
+        statement = statement.where(_changed_column(name) >= _utc(since))
+    json_columns = [
+        i for i, column in enumerate(columns) if isinstance(column.type, JSON)
+    ]
+    result = conn.execution_options(
+        stream_results=True, yield_per=row_group_size
+    ).execute(statement)
+    for rows in result.partitions(row_group_size):
+        values = list(zip(*rows))
+        for i in json_columns:
+            values[i] = [
+                None if value is None else json.dumps(value, default=str)
+                for value in values[i]
+            ]
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(values, spec.schema)
+            ],
+            schema=spec.schema,
+        )
+
+
+def write_table(
+    conn: Connection,
+    name: str,
+    sink: str | Path | BinaryIO,
+    since: datetime | None = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> int:
+    """
+    Writes table `name` to `sink` as Parquet, one row group per batch, and
+    returns the number of rows. An empty export is a valid file with the
+    table's schema and no row groups.
+    """
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(
+        sink, export_table(name).schema, compression=COMPRESSION
+    ) as writer:
+        for batch in iter_batches(conn, name, since, row_group_size):
+            writer.write_batch(batch, row_group_size=row_group_size)
+            rows += batch.num_rows
+    return rows
+
+
+def _changed_column(name: str):
+    spec = export_table(name)
+    return spec.table.c[spec.changed]
+
+
+def watermark(conn: Connection, names: list[str]) -> datetime | None:
+    """
+    The newest change time across tables `names` as `conn` sees them, or
+    None when they are empty.
+    """
+    newest = [
+        conn.execute(select(func.max(_changed_column(name)))).scalar() for name in names
+    ]
+    newest = [_utc(value) for value in newest if value is not None]
+    return max(newest, default=None)
+
+
+def export_book(
+    engine: Engine,
+    directory: Path,
+    since: datetime | None = None,
+    tables: list[str] | None = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> dict:
+    """
+    Writes `<table>.parquet` for each of `tables` (default: all) and a
+    `manifest.json` into `directory`; returns the manifest. On Postgres the
+    tables and the watermark are read in one REPEATABLE READ transaction,
+    so they agree with each other.
+    """
+    names = list(tables or EXPORT_TABLES)
+    for name in names:
+        export_table(name)
+    directory.mkdir(parents=True, exist_ok=True)
+    started = datetime.now(timezone.utc)
+    counts = {}
+    options = {}
+    if engine.dialect.name == "postgresql":
+        options["isolation_level"] = "REPEATABLE READ"
+    with engine.connect().execution_options(**options) as conn:
+        newest = watermark(conn, names)
+        for name in names:
+            counts[name] = write_table(
+                conn, name, directory / f"{name}.parquet", since, row_group_size
+            )
+    next_since = since
+    if newest is not None:
+        next_since = newest - WATERMARK_OVERLAP
+        if since is not None:
+            next_since = max(next_since, since)
+    manifest = {
+        "exported_at": started.isoformat(),
+        "since": since.isoformat() if since else None,
+        "next_since": next_since.isoformat() if next_since else None,
+        "row_group_size": row_group_size,
+        "compression": COMPRESSION,
+        "tables": counts,
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+class ChunkSink:
+    """
+    A write-only file object that collects what the Parquet writer writes,
+    so a response can stream the file a row group at a time.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_table(
+    engine: Engine,
+    name: str,
+    since: datetime | None = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> Iterator[bytes]:
+    """
+    The Parquet file for table `name`, as the bytes of each row group as it
+    is written (the footer comes last).
+    """
+    import pyarrow.parquet as pq
+
+    spec = export_table(name)
+    sink = ChunkSink()
+    with engine.connect() as conn:
+        writer = pq.ParquetWriter(sink, spec.schema, compression=COMPRESSION)
+        try:
+            for batch in iter_batches(conn, name, since, row_group_size):
+                writer.write_batch(batch, row_group_size=row_group_size)
+                yield sink.drain()
+        finally:
+            writer.close()
+    yield sink.drain()
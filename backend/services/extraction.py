@@ -0,0 +1,301 @@
+"""
+Field extraction from raw document text.
+
+Each document starts with a "Doc Type: ..." line followed by "Label: value"
+lines. Per-doc-type field patterns are compiled once per process and turn a
+document into a `document_extractions.json`-style record with confidence
+and evidence snippets. `run_pipeline` streams a directory through a process
+pool and skips files whose content hash is unchanged since the last run.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+UNREADABLE_MARKER = "[UNREADABLE]"
+
+_DOC_TYPE = re.compile(r"^\s*Doc Type:\s*(?P<value>.+?)\s*$", re.MULTILINE)
+_ACCOUNT_ID = re.compile(r"^\s*Account ID:\s*(?P<value>\S+)\s*$", re.MULTILINE)
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _amount(value: str) -> int | float | str:
+    cleaned = value.replace(",", "").replace("$", "").strip()
+    try:
+        number = float(cleaned)
+    except ValueError:
+        return value.strip()
+    return int(number) if number.is_integer() else number
+
+
+def _signature(value: str) -> bool:
+    return value.strip().upper().startswith("SIGNED")
+
+
+# doc type -> field -> (label regex, value parser)
+FIELD_SPECS: dict[str, dict[str, tuple[str, Callable[[str], Any]]]] = {
+    "Government_ID": {
+        "name": (r"Name", _text),
+        "dob": (r"DOB", _text),
+        "id_number": (r"ID Number", _text),
+    },
+    "Advisory_Agreement": {
+        "client_name": (r"Client Name", _text),
+        "signature_present": (r"Signature", _signature),
+        "agreement_date": (r"Agreement Date", _text),
+    },
+    "Transfer_Form": {
+        "delivering_plan_type": (r"Delivering Plan Type", _text),
+        "receiving_account_type": (r"Receiving Account Type", _text),
+        "estimated_assets_usd": (r"Estimated Assets USD", _amount),
+    },
+}
+
+# Repeated fields collect every matching line into a list.
+_BENEFICIARY = re.compile(
+    r"^\s*Beneficiary \d+:[ \t]*(?P<name>[^(\n]*?)\s*(?:\((?P<pct>[\d.]+)%\))?\s*$",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class _CompiledField:
+    name: str
+    pattern: re.Pattern
+    parse: Callable[[str], Any]
+
+
+def _compile_specs() -> dict[str, list[_CompiledField]]:
+    compiled = {}
+    for doc_type, fields in FIELD_SPECS.items():
+        compiled[doc_type] = [
+            _CompiledField(
+                name,
+                re.compile(rf"^\s*{label}:[ \t]*(?P<value>.*?)\s*$", re.MULTILINE),
+                parse,
+            )
+            for name, (label, parse) in fields.items()
+        ]
+    return compiled
+
+
+_COMPILED_SPECS = _compile_specs()
+
+
+def canonical_doc_type(value: str) -> str:
+    return "_".join(
+        part.capitalize() if part != "ID" else part for part in value.split()
+    )
+
+
+def _extract_beneficiaries(text: str) -> tuple[dict, list[str], int, int]:
+    beneficiaries = []
+    evidence = []
+    lines = 0
+    for match in _BENEFICIARY.finditer(text):
+        lines += 1
+        evidence.append(match.group(0).strip().split(":", 1)[0])
+        name = match.group("name").strip()
+        if not name:
+            continue
+        entry: dict[str, Any] = {"name": name}
+        if match.group("pct"):
+            entry["pct"] = _amount(match.group("pct"))
+        beneficiaries.append(entry)
+    found = 1 if lines else 0
+    return {"beneficiaries": beneficiaries}, evidence, found, 1
+
+
+def extract_text(text: str, doc_id: str | None = None) -> dict:
+    """
+    Extracts structured fields from one document's text.
+    Confidence is the share of expected fields found readable.
+    """
+    doc_type_match = _DOC_TYPE.search(text)
+    doc_type = (
+        canonical_doc_type(doc_type_match["value"]) if doc_type_match else "OTHER"
+    )
+    account_match = _ACCOUNT_ID.search(text)
+
+    fields: dict[str, Any] = {}
+    evidence: list[str] = []
+    if doc_type == "Beneficiary_Designation":
+        fields, evidence, readable, expected = _extract_beneficiaries(text)
+    else:
+        specs = _COMPILED_SPECS.get(doc_type, [])
+        expected = len(specs)
+        readable = 0
+        for spec in specs:
+            match = spec.pattern.search(text)
+            if not match:
+                continue
+            raw = match["value"]
+            if raw == UNREADABLE_MARKER:
+                fields[spec.name] = UNREADABLE_MARKER
+            else:
+                fields[spec.name] = spec.parse(raw)
+                readable += 1
+            evidence.append(match.group(0).strip())
+
+    confidence = round(0.99 * readable / expected, 2) if expected else 0.0
+    return {
+        "doc_id": doc_id,
+        "doc_type": doc_type,
+        "account_id": account_match["value"] if account_match else None,
+        "extracted_fields": fields,
+        "confidence": confidence,
+        "evidence_snippets": evidence,
+    }
+
+
+def _extract_file(path: str, doc_id: str | None, known_hash: str | None) -> dict:
+    data = Path(path).read_bytes()
+    content_hash = hashlib.sha256(data).hexdigest()
+    if content_hash == known_hash:
+        return {"path": path, "content_hash": content_hash, "skipped": True}
+    record = extract_text(data.decode("utf-8", errors="replace"), doc_id)
+    record.update({"path": path, "content_hash": content_hash, "skipped": False})
+    return record
+
+
+def _extract_batch(batch: list[tuple[str, str | None, str | None]]) -> list[dict]:
+    results = []
+    for path, doc_id, known_hash in batch:
+        try:
+            results.append(_extract_file(path, doc_id, known_hash))
+        except OSError as exc:
+            results.append({"path": path, "error": str(exc), "skipped": False})
+    return results
+
+
+def iter_documents(root: Path, suffix: str = ".txt") -> Iterator[os.DirEntry]:
+    """
+    Walks a directory tree lazily, yielding matching file entries.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry
+
+
+@dataclass
+class ExtractionStats:
+    scanned: int = 0
+    unchanged: int = 0
+    extracted: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+class Manifest:
+    """
+    Content-hash manifest so unchanged files are skipped on re-runs.
+    Size and mtime are kept as a cheap pre-check before hashing.
+    """
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path and path.exists():
+            self.entries = json.loads(path.read_text())
+
+    def is_fresh(self, entry: os.DirEntry) -> bool:
+        known = self.entries.get(entry.path)
+        if not known:
+            return False
+        stat = entry.stat()
+        return known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns
+
+    def known_hash(self, path: str) -> str | None:
+        return (self.entries.get(path) or {}).get("sha256")
+
+    def record(self, path: str, content_hash: str) -> None:
+        stat = os.stat(path)
+        self.entries[path] = {
+            "sha256": content_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.entries, separators=(",", ":")))
+        tmp.replace(self.path)
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_pipeline(
+    source: Path,
+    manifest: Manifest,
+    doc_ids: dict[str, str] | None = None,
+    workers: int | None = None,
+    batch_size: int = 64,
+    stats: ExtractionStats | None = None,
+) -> Iterator[dict]:
+    """
+    Streams extraction records for new or changed files under `source`.
+
+    At most a few batches per worker are in flight at once, so memory stays
+    bounded regardless of corpus size. The manifest is updated as records
+    are yielded; call `manifest.save()` once the iterator is exhausted.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    doc_ids = doc_ids or {}
+    workers = workers or os.cpu_count() or 1
+
+    def candidates() -> Iterator[tuple[str, str | None, str | None]]:
+        for entry in iter_documents(source):
+            stats.scanned += 1
+            if manifest.is_fresh(entry):
+                stats.unchanged += 1
+                continue
+            yield entry.path, doc_ids.get(entry.name), manifest.known_hash(entry.path)
+
+    def drain(future: Future) -> Iterator[dict]:
+        for result in future.result():
+            if "error" in result:
+                stats.failed += 1
+                stats.errors.append(result)
+                continue
+            manifest.record(result["path"], result["content_hash"])
+            if result.pop("skipped"):
+                stats.unchanged += 1
+                continue
+            stats.extracted += 1
+            result["doc_id"] = result["doc_id"] or Path(result["path"]).stem
+            yield result
+
+    max_in_flight = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: list[Future] = []
+        for batch in _batched(candidates(), batch_size):
+            in_flight.append(pool.submit(_extract_batch, batch))
+            if len(in_flight) >= max_in_flight:
+                yield from drain(in_flight.pop(0))
+        for future in in_flight:
+            yield from drain(future)
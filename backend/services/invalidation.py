@@ -0,0 +1,167 @@
+"""
+Cache invalidation across worker processes.
+
+Each worker keeps its own in-memory caches (nothing is shared after the
+fork). When one worker invalidates a cache it applies the change locally
+and appends a row to `cache_invalidations`; every other worker polls the
+table for rows it has not applied yet and runs the handlers subscribed
+to that cache. The database is the only thing all workers, on one host or
+several, already share, so no extra broker is needed.
+
+Row ids are handed out when a transaction inserts, not when it commits, so
+on Postgres a row can become visible after one with a higher id. Each poll
+therefore reads the last `rescan` ids again and skips those it has seen.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+
+from backend.models import CacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+# Called with the invalidated key, or None to drop the whole cache.
+Handler = Callable[[str | None], None]
+
+table = CacheInvalidation.__table__
+
+
+class UnknownCache(KeyError):
+    """Raised when publishing to a cache nobody subscribed to."""
+
+
+class InvalidationBus:
+    """
+    Publishes and applies cache invalidations through the database. Rows
+    beyond the newest `retain` are pruned as new ones are written; polls
+    re-read the newest `rescan` ids below the highest applied.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        poll_interval: float = 1.0,
+        retain: int = 1000,
+        rescan: int = 100,
+    ):
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.retain = retain
+        self.rescan = rescan
+        self.origin = _origin()
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._watermark: int | None = None
+        # Ids above `_watermark - rescan` already applied (or skipped).
+        self._seen: set[int] = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def caches(self) -> list[str]:
+        return sorted(self._handlers)
+
+    def subscribe(self, cache: str, handler: Handler) -> None:
+        self._handlers[cache].append(handler)
+
+    def publish(self, cache: str, key: str | None = None) -> None:
+        """
+        Invalidates `cache` (or one `key` in it) here and in every other worker.
+        """
+        if cache not in self._handlers:
+            raise UnknownCache(cache)
+        self._apply(cache, key)
+        with self.engine.begin() as conn:
+            row_id = conn.execute(
+                insert(table)
+                .values(cache=cache, key=key, origin=self.origin)
+                .returning(table.c.id)
+            ).scalar_one()
+            if row_id % self.retain == 0:
+                conn.execute(delete(table).where(table.c.id <= row_id - self.retain))
+
+    def poll_once(self) -> int:
+        """
+        Applies invalidations published by other workers since the last poll.
+        Returns how many were applied.
+        """
+        with self._lock:
+            with self.engine.connect() as conn:
+                if self._watermark is None:
+                    # Only invalidations published after this worker started
+                    # matter; its caches began empty.
+                    recent = (
+                        conn.execute(
+                            select(table.c.id)
+                            .order_by(table.c.id.desc())
+                            .limit(self.rescan)
+                        )
+                        .scalars()
+                        .all()
+                    )
+                    self._watermark = recent[0] if recent else 0
+                    self._seen = set(recent)
+                    return 0
+                rows = conn.execute(
+                    select(table.c.id, table.c.cache, table.c.key, table.c.origin)
+                    .where(table.c.id > self._watermark - self.rescan)
+                    .order_by(table.c.id)
+                ).all()
+            applied = 0
+            for row in rows:
+                if row.id in self._seen:
+                    continue
+                self._seen.add(row.id)
+                self._watermark = max(self._watermark, row.id)
+                if row.origin != self.origin:
+                    self._apply(row.cache, row.key)
+                    applied += 1
+            floor = self._watermark - self.rescan
+            self._seen = {row_id for row_id in self._seen if row_id > floor}
+            return applied
+
+    def start(self) -> None:
+        """
+        Starts the polling thread. Call in each worker, after the fork.
+        """
+        if self._thread is not None or self.poll_interval <= 0:
+            return
+        self.origin = _origin()
+        self.poll_once()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._stopping.clear()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.error("Cache invalidation poll failed", exc_info=True)
+
+    def _apply(self, cache: str, key: str | None) -> None:
+        for handler in self._handlers.get(cache, ()):
+            try:
+                handler(key)
+            except Exception:
+                logger.error(f"Invalidating cache {cache} failed", exc_info=True)
+
+
+def _origin() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
@@ -0,0 +1,395 @@
+"""
+Background job subsystem for long-running orchestrator operations.
+
+Jobs are persisted in the `jobs` table, queued in memory by priority and
+run by a bounded pool of worker threads. Callers get a job id back
+immediately and poll `GET /jobs/{id}` for progress and the result.
+
+A running job holds a lease: its process refreshes `heartbeat_at` every
+third of `lease_seconds`. Every process sharing the database requeues
+RUNNING jobs whose lease has expired, so a job survives the worker process
+that was running it crashing. Each claim counts as an attempt; a job whose
+worker has died `max_attempts` times is failed instead of requeued.
+"""
+
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.metrics import job_lag
+from backend.models import Job
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING")
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class UnknownJobKind(ValueError):
+    """Raised when submitting a job kind with no registered handler."""
+
+
+class JobContext:
+    """
+    Handed to job handlers: a DB session plus a throttled progress reporter.
+    """
+
+    def __init__(self, job_id: str, db: Session, session_factory: sessionmaker):
+        self.job_id = job_id
+        self.db = db
+        self._session_factory = session_factory
+        self._last_report = 0.0
+
+    def progress(self, percent: float, message: str | None = None) -> None:
+        now = time.monotonic()
+        if percent < 100 and now - self._last_report < 0.5:
+            return
+        self._last_report = now
+        with self._session_factory() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(
+                    progress=round(min(max(percent, 0.0), 100.0), 1), message=message
+                )
+            )
+            session.commit()
+
+
+JobHandler = Callable[[dict, JobContext], Any]
+
+
+class JobManager:
+    """
+    Bounded worker pool draining a priority queue of persisted jobs.
+    Workers start lazily on first submit.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        max_workers: int,
+        max_queue: int,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+    ):
+        self._session_factory = session_factory
+        self._max_workers = max_workers
+        self._lease = lease_seconds
+        self._max_attempts = max_attempts
+        # Jobs this process is running, whose heartbeats it refreshes.
+        self._running: set[str] = set()
+        self._lease_thread: threading.Thread | None = None
+        self._queue: queue.PriorityQueue = queue.PriorityQueue(maxsize=max_queue)
+        self._handlers: dict[str, tuple[JobHandler, int]] = {}
+        self._sequence = itertools.count()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # job_id -> (kind, monotonic enqueue time), for queue lag.
+        self._enqueued: dict[str, tuple[str, float]] = {}
+        # Set while QUEUED rows may be waiting in the table for queue space.
+        self._backlog = threading.Event()
+        self._refill_lock = threading.Lock()
+
+    def register(self, kind: str, handler: JobHandler, priority: int = 1) -> None:
+        self._handlers[kind] = (handler, priority)
+
+    def submit(self, kind: str, payload: dict, priority: int | None = None) -> str:
+        """
+        Persists a job and queues it. Returns the job id.
+        """
+        if kind not in self._handlers:
+            raise UnknownJobKind(f"No handler registered for job kind '{kind}'")
+        if self._queue.full():
+            raise JobQueueFull("Job queue is full, retry later")
+
+        priority = self._handlers[kind][1] if priority is None else priority
+        job_id = uuid.uuid4().hex
+        # The row must exist before a worker can claim it, so it is written
+        # first; if the queue filled up in the meantime it is failed rather
+        # than left QUEUED with nothing to run it.
+        with self._session_factory() as session:
+            session.add(
+                Job(id=job_id, kind=kind, priority=priority, payload_json=payload)
+            )
+            session.commit()
+
+        self._ensure_started()
+        try:
+            self._enqueue(job_id, kind, priority)
+        except queue.Full:
+            self._finish(job_id, status="FAILED", error="Job queue was full")
+            raise JobQueueFull("Job queue is full, retry later") from None
+        logger.info(f"Queued job {job_id} ({kind}, priority {priority})")
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._session_factory() as session:
+            job = session.get(Job, job_id)
+            return _serialize(job) if job else None
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def oldest_queued_seconds(self) -> float:
+        """
+        Age of the longest-waiting job not yet claimed by a worker.
+        """
+        enqueued = [at for _, at in list(self._enqueued.values())]
+        return time.monotonic() - min(enqueued) if enqueued else 0.0
+
+    def requeue_expired(self) -> int:
+        """
+        Marks RUNNING jobs whose lease has expired as QUEUED again and
+        returns how many; those already claimed `max_attempts` times are
+        marked FAILED instead. Safe while other processes are running jobs.
+        """
+        if self._lease <= 0:
+            return 0
+        cutoff = _now() - timedelta(seconds=self._lease)
+        expired = (
+            Job.status == "RUNNING",
+            func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff,
+        )
+        with self._session_factory() as session:
+            failed = session.execute(
+                update(Job)
+                .where(*expired, func.coalesce(Job.attempts, 0) >= self._max_attempts)
+                .values(
+                    status="FAILED",
+                    finished_at=_now(),
+                    error=f"Worker died on all {self._max_attempts} attempts",
+                )
+            )
+            result = session.execute(
+                update(Job).where(*expired).values(status="QUEUED")
+            )
+            session.commit()
+        if failed.rowcount:
+            logger.error(f"Failed {failed.rowcount} jobs out of attempts")
+        if result.rowcount:
+            logger.warning(f"Requeued {result.rowcount} jobs with expired leases")
+        return result.rowcount
+
+    def recover(self) -> int:
+        """
+        Re-queues jobs left QUEUED by a previous process, and those left
+        RUNNING whose lease has expired, and returns how many are queued.
+        Jobs another live process is running keep their lease and are left
+        alone. Only as many as the queue has room for are queued now;
+        workers queue the rest as they drain it. Workers sharing the
+        database may all queue the same job; only the one whose claim
+        succeeds runs it. Starts the workers, so this process also requeues
+        jobs whose leases expire from now on.
+        """
+        self.requeue_expired()
+        with self._session_factory() as session:
+            waiting = session.query(Job).filter(Job.status == "QUEUED").count()
+        self._ensure_started()
+        if waiting:
+            self._backlog.set()
+            self._refill()
+        return waiting
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put((float("inf"), next(self._sequence), None))
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._lease_thread is not None:
+            self._lease_thread.join(timeout)
+        self._threads = []
+        self._lease_thread = None
+        self._stopping.clear()
+
+    def _enqueue(self, job_id: str, kind: str, priority: int) -> None:
+        self._enqueued[job_id] = (kind, time.monotonic())
+        # PriorityQueue pops the smallest entry, so negate to run high first.
+        try:
+            self._queue.put_nowait((-priority, next(self._sequence), job_id))
+        except queue.Full:
+            self._enqueued.pop(job_id, None)
+            raise
+
+    def _refill(self) -> int:
+        """
+        Queues QUEUED rows from the table, oldest first, into the free
+        queue slots; clears the backlog once the table has no more.
+        """
+        with self._refill_lock:
+            free = self._queue.maxsize - self._queue.qsize()
+            if free <= 0:
+                return 0
+            limit = free + len(self._enqueued)
+            with self._session_factory() as session:
+                rows = (
+                    session.query(Job.id, Job.kind, Job.priority)
+                    .filter(Job.status == "QUEUED")
+                    .order_by(Job.created_at)
+                    .limit(limit)
+                    .all()
+                )
+            queued = 0
+            for row in rows:
+                if row.id in self._enqueued:
+                    continue
+                try:
+                    self._enqueue(row.id, row.kind, row.priority or 1)
+                except queue.Full:
+                    return queued
+                queued += 1
+            if len(rows) < limit:
+                self._backlog.clear()
+            return queued
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self._max_workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"job-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            if self._lease > 0:
+                self._lease_thread = threading.Thread(
+                    target=self._keep_leases, name="job-worker-lease", daemon=True
+                )
+                self._lease_thread.start()
+
+    def _keep_leases(self) -> None:
+        while not self._stopping.wait(self._lease / 3):
+            try:
+                self._heartbeat()
+                if self.requeue_expired():
+                    self._backlog.set()
+                    self._refill()
+            except Exception:
+                logger.error("Job lease upkeep failed", exc_info=True)
+
+    def _heartbeat(self) -> None:
+        running = list(self._running)
+        if not running:
+            return
+        with self._session_factory() as session:
+            session.execute(
+                update(Job)
+                .where(Job.id.in_(running), Job.status == "RUNNING")
+                .values(heartbeat_at=_now())
+            )
+            session.commit()
+
+    def _claim(self, job_id: str) -> bool:
+        with self._session_factory() as session:
+            result = session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "QUEUED")
+                .values(
+                    status="RUNNING",
+                    started_at=_now(),
+                    heartbeat_at=_now(),
+                    attempts=func.coalesce(Job.attempts, 0) + 1,
+                )
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def _worker(self) -> None:
+        while not self._stopping.is_set():
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                break
+            kind, enqueued_at = self._enqueued.pop(job_id, (None, None))
+            if enqueued_at is not None:
+                job_lag.observe(time.monotonic() - enqueued_at, kind)
+            try:
+                if self._claim(job_id):
+                    self._running.add(job_id)
+                    self._run(job_id)
+            except Exception:
+                logger.error(f"Job worker failed on {job_id}", exc_info=True)
+            finally:
+                self._running.discard(job_id)
+                self._queue.task_done()
+            if (
+                self._backlog.is_set()
+                and self._queue.qsize() < self._queue.maxsize // 2
+            ):
+                try:
+                    self._refill()
+                except Exception:
+                    logger.error("Job backlog refill failed", exc_info=True)
+
+    def _run(self, job_id: str) -> None:
+        with self._session_factory() as db:
+            job = db.get(Job, job_id)
+            context = JobContext(job_id, db, self._session_factory)
+            try:
+                # Queued by a process that registered a kind this one lacks.
+                if job.kind not in self._handlers:
+                    raise UnknownJobKind(
+                        f"No handler registered for job kind '{job.kind}'"
+                    )
+                handler, _ = self._handlers[job.kind]
+                # Round-trip through JSON so the result column always accepts it.
+                result = json.loads(
+                    json.dumps(handler(job.payload_json or {}, context), default=str)
+                )
+            except Exception as exc:
+                db.rollback()
+                logger.error(f"Job {job_id} ({job.kind}) failed: {exc}", exc_info=True)
+                values = {"status": "FAILED", "error": str(exc)}
+            else:
+                values = {
+                    "status": "SUCCEEDED",
+                    "progress": 100.0,
+                    "result_json": result,
+                }
+
+        self._finish(job_id, **values)
+
+    def _finish(self, job_id: str, **values) -> None:
+        with self._session_factory() as session:
+            session.execute(
+                update(Job).where(Job.id == job_id).values(finished_at=_now(), **values)
+            )
+            session.commit()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _serialize(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "progress": job.progress or 0.0,
+        "message": job.message,
+        "result": job.result_json,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "attempts": job.attempts or 0,
+    }
@@ -0,0 +1,245 @@
+"""
+Household meeting packs (agenda plus household report).
+
+A pack is rendered from a snapshot of the household's accounts, tasks and
+documents. The snapshot's hash addresses the rendered artifact on disk, so
+repeat requests for an unchanged household are served from the cache and
+a pack is only re-rendered after something it shows has changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import Account, Advisor, Document, Household, Task
+
+# Bump when the rendered layout changes so cached packs are re-rendered.
+RENDERER_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+
+_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+def load_snapshot(db: Session, household_id: int) -> dict | None:
+    """
+    Loads everything a pack shows for one household, in a stable order.
+    Returns None when the household does not exist.
+    """
+    household = db.execute(
+        select(
+            Household.id,
+            Household.name,
+            Household.status,
+            Household.eta_date,
+            Household.risk_score,
+            Advisor.name.label("advisor_name"),
+        )
+        .outerjoin(Advisor, Advisor.id == Household.advisor_id)
+        .where(Household.id == household_id, Household.deleted_at.is_(None))
+    ).first()
+    if household is None:
+        return None
+
+    accounts = db.execute(
+        select(
+            Account.id,
+            Account.account_number,
+            Account.type,
+            Account.custodian,
+            Account.status,
+            Account.asset_value,
+        )
+        .where(Account.household_id == household_id, Account.deleted_at.is_(None))
+        .order_by(Account.id)
+    ).all()
+    tasks = db.execute(
+        select(
+            Task.id,
+            Task.name,
+            Task.owner_role,
+            Task.status,
+            Task.sla_due_at,
+            Task.blocked_by_task_id,
+        )
+        .where(Task.household_id == household_id, Task.deleted_at.is_(None))
+        .order_by(Task.id)
+    ).all()
+    documents = db.execute(
+        select(
+            Document.id,
+            Document.name,
+            Document.type,
+            Document.nigo_status,
+            Document.defects_json,
+        )
+        .where(Document.household_id == household_id, Document.deleted_at.is_(None))
+        .order_by(Document.id)
+    ).all()
+
+    return {
+        "household": dict(household._mapping),
+        "accounts": [dict(row._mapping) for row in accounts],
+        "tasks": [dict(row._mapping) for row in tasks],
+        "documents": [dict(row._mapping) for row in documents],
+    }
+
+
+def snapshot_hash(snapshot: dict) -> str:
+    canonical = json.dumps(
+        {"renderer": RENDERER_VERSION, **snapshot},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _fmt_date(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%d") if value else "TBD"
+
+
+def _money(value: float | None) -> str:
+    return f"${value or 0:,.0f}"
+
+
+def render_pack(snapshot: dict) -> dict[str, str]:
+    """
+    Renders the agenda and report as Markdown. Returns filename -> content.
+    """
+    household = snapshot["household"]
+    accounts = snapshot["accounts"]
+    tasks = snapshot["tasks"]
+    documents = snapshot["documents"]
+    open_tasks = [t for t in tasks if t["status"] not in ("COMPLETED", "COMPLETE")]
+    nigo = [d for d in documents if d["nigo_status"] == "DEFECTS_FOUND"]
+    total_assets = sum(a["asset_value"] or 0 for a in accounts)
+    risk = household["risk_score"]
+
+    agenda = [
+        f"# Meeting Agenda: {household['name']}",
+        "",
+        f"Advisor: {household['advisor_name'] or 'Unassigned'}  ",
+        f"Transition status: {household['status']}  ",
+        f"Target completion: {_fmt_date(household['eta_date'])}",
+        "",
+        "## Agenda",
+        "",
+        f"1. Transition progress ({len(tasks) - len(open_tasks)}/{len(tasks)} "
+        "tasks complete)",
+        f"2. Account review ({len(accounts)} accounts, {_money(total_assets)})",
+    ]
+    if nigo:
+        agenda.append(f"3. Paperwork needing attention ({len(nigo)} documents)")
+    agenda.append(f"{4 if nigo else 3}. Questions and next steps")
+    if open_tasks:
+        agenda += ["", "## Open items", ""]
+        agenda += [
+            f"- {t['name']} ({t['owner_role']}, due {_fmt_date(t['sla_due_at'])})"
+            for t in open_tasks
+        ]
+
+    report = [
+        f"# Household Report: {household['name']}",
+        "",
+        f"Risk score: {'n/a' if risk is None else risk}",
+        "",
+        "## Accounts",
+        "",
+        "| Account | Type | Custodian | Status | Assets |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    report += [
+        f"| {a['account_number']} | {a['type'] or ''} | {a['custodian'] or ''} "
+        f"| {a['status'] or ''} | {_money(a['asset_value'])} |"
+        for a in accounts
+    ]
+    report += [
+        f"| **Total** | | | | **{_money(total_assets)}** |",
+        "",
+        "## Tasks",
+        "",
+        "| Task | Owner | Status | Due |",
+        "| --- | --- | --- | --- |",
+    ]
+    report += [
+        f"| {t['name']} | {t['owner_role']} | {t['status']} "
+        f"| {_fmt_date(t['sla_due_at'])} |"
+        for t in tasks
+    ]
+    report += ["", "## Documents", ""]
+    for d in documents:
+        report.append(f"- {d['name']} ({d['type']}): {d['nigo_status']}")
+        for defect in d["defects_json"] or []:
+            report.append(f"  - {defect.get('rule')}: {defect.get('message')}")
+
+    return {
+        "agenda.md": "\n".join(agenda) + "\n",
+        "report.md": "\n".join(report) + "\n",
+    }
+
+
+class PackCache:
+    """
+    Content-addressed store of rendered packs: <root>/<hash[:2]>/<hash>/.
+    Entries are written to a temp dir and renamed in, so readers never see
+    a half-written pack.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _dir(self, pack_hash: str) -> Path:
+        return self.root / pack_hash[:2] / pack_hash
+
+    def get(self, pack_hash: str) -> dict | None:
+        if not _HASH.fullmatch(pack_hash):
+            return None
+        try:
+            return json.loads((self._dir(pack_hash) / MANIFEST_NAME).read_text())
+        except FileNotFoundError:
+            return None
+
+    def put(self, pack_hash: str, household_id: int, files: dict[str, str]) -> dict:
+        target = self._dir(pack_hash)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=".tmp-"))
+        try:
+            for name, content in files.items():
+                (staging / name).write_text(content, encoding="utf-8")
+            manifest = {
+                "pack_hash": pack_hash,
+                "household_id": household_id,
+                "files": [
+                    {"name": name, "bytes": len(content.encode("utf-8"))}
+                    for name, content in files.items()
+                ],
+                "rendered_at": datetime.now(timezone.utc).isoformat(),
+            }
+            (staging / MANIFEST_NAME).write_text(json.dumps(manifest))
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Another worker rendered the same content first.
+                if not target.exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return self.get(pack_hash) or manifest
+
+    def path(self, pack_hash: str, filename: str) -> Path | None:
+        """
+        Resolves one rendered file, refusing names outside the pack.
+        """
+        manifest = self.get(pack_hash)
+        if not manifest or filename not in {f["name"] for f in manifest["files"]}:
+            return None
+        return self._dir(pack_hash) / filename
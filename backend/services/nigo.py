@@ -0,0 +1,290 @@
+"""
+NIGO (not in good order) rule engine for document extraction records.
+
+Rules are declared as plain data and compiled once per process into
+predicate closures indexed by document type, so validating a record only
+runs the checks that apply to it. Records follow the shape of
+`document_extractions.json`: doc_id, doc_type, extracted_fields, confidence
+and evidence_snippets.
+"""
+
+import logging
+import math
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from backend.config import settings
+from backend.services.execution import ExecutionLayer
+
+logger = logging.getLogger(__name__)
+
+UNREADABLE_MARKER = "[UNREADABLE]"
+
+REQUIRED_FIELDS = {
+    "GOVERNMENT_ID": ["name", "dob", "id_number"],
+    "ADVISORY_AGREEMENT": ["client_name", "agreement_date"],
+    "TRANSFER_FORM": [
+        "delivering_plan_type",
+        "receiving_account_type",
+        "estimated_assets_usd",
+    ],
+    "BENEFICIARY_DESIGNATION": ["beneficiaries"],
+}
+
+# Receiving account types each delivering plan type may land in.
+COMPATIBLE_PLAN_TYPES = {
+    "TAXABLE": {"TAXABLE", "BROKERAGE", "INDIVIDUAL", "JOINT"},
+    "TRADITIONAL IRA": {"TRADITIONAL IRA", "ROLLOVER IRA"},
+    "ROLLOVER IRA": {"ROLLOVER IRA", "TRADITIONAL IRA"},
+    "ROTH IRA": {"ROTH IRA"},
+    "SEP IRA": {"SEP IRA"},
+}
+
+DEFAULT_RULES: list[dict[str, Any]] = [
+    {
+        "rule": "ILLEGIBLE",
+        "kind": "min_confidence",
+        "threshold": settings.NIGO_MIN_CONFIDENCE,
+        "severity": "HIGH",
+        "message": "OCR confidence below threshold",
+        "recommended_action": "Request a clearer scan and re-upload.",
+    },
+    {
+        "rule": "ILLEGIBLE",
+        "kind": "no_unreadable_fields",
+        "severity": "HIGH",
+        "message": "One or more fields could not be read",
+        "recommended_action": "Request a clearer scan and re-upload.",
+    },
+    {
+        "rule": "MISSING_REQUIRED_FIELD",
+        "kind": "required_fields",
+        "fields_by_doc_type": REQUIRED_FIELDS,
+        "severity": "MEDIUM",
+        "message": "Required field missing",
+        "recommended_action": "Complete the missing fields and re-submit.",
+    },
+    {
+        "rule": "MISSING_SIGNATURE",
+        "kind": "field_true",
+        "doc_types": ["ADVISORY_AGREEMENT"],
+        "field": "signature_present",
+        "severity": "HIGH",
+        "message": "Client signature missing",
+        "recommended_action": "Obtain signed agreement and re-upload.",
+    },
+    {
+        "rule": "PLAN_TYPE_MISMATCH",
+        "kind": "plan_type_match",
+        "doc_types": ["TRANSFER_FORM"],
+        "plan_field": "delivering_plan_type",
+        "account_field": "receiving_account_type",
+        "severity": "HIGH",
+        "message": "Delivering plan type does not match receiving account type",
+        "recommended_action": "Correct the receiving account type on the transfer form.",
+    },
+    {
+        "rule": "MISSING_BENEFICIARY",
+        "kind": "non_empty",
+        "doc_types": ["BENEFICIARY_DESIGNATION"],
+        "field": "beneficiaries",
+        "severity": "MEDIUM",
+        "message": "No beneficiaries designated",
+        "recommended_action": "Collect beneficiary designation from the client.",
+    },
+]
+
+Defect = dict[str, Any]
+Predicate = Callable[[dict, dict], Defect | None]
+
+
+def normalize_doc_type(value: Any) -> str:
+    text = str(value or "OTHER").strip().upper()
+    return "_".join(text.replace("-", " ").replace("_", " ").split())
+
+
+def _normalize_plan(value: Any) -> str:
+    return " ".join(str(value or "").upper().replace("_", " ").split())
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == UNREADABLE_MARKER
+
+
+def _defect(spec: dict, message: str, evidence: Any = None) -> Defect:
+    return {
+        "rule": spec["rule"],
+        "severity": spec["severity"],
+        "message": message,
+        "evidence": evidence,
+        "recommended_action": spec.get("recommended_action"),
+    }
+
+
+def _compile(spec: dict) -> Predicate:
+    kind = spec["kind"]
+
+    if kind == "min_confidence":
+        threshold = float(spec["threshold"])
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            confidence = record.get("confidence")
+            if confidence is None:
+                return None
+            try:
+                value = float(confidence)
+            except (TypeError, ValueError):
+                value = math.nan
+            if math.isnan(value):
+                # An OCR result without a usable score is no more trustworthy
+                # than a low one.
+                return _defect(
+                    spec,
+                    f"{spec['message']} ({confidence!r} is not a number)",
+                    confidence,
+                )
+            if value < threshold:
+                return _defect(
+                    spec, f"{spec['message']} ({confidence} < {threshold})", confidence
+                )
+            return None
+
+    elif kind == "no_unreadable_fields":
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            unreadable = [k for k, v in fields.items() if v == UNREADABLE_MARKER]
+            if unreadable:
+                return _defect(spec, f"{spec['message']}: {', '.join(unreadable)}")
+            return None
+
+    elif kind == "required_fields":
+        required = {
+            normalize_doc_type(k): tuple(v)
+            for k, v in spec["fields_by_doc_type"].items()
+        }
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            expected = required.get(record["_doc_type"], ())
+            missing = [f for f in expected if f not in fields]
+            if missing:
+                return _defect(spec, f"{spec['message']}: {', '.join(missing)}")
+            return None
+
+    elif kind == "field_true":
+        field = spec["field"]
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            if field in fields and fields[field] is not True:
+                return _defect(spec, spec["message"], f"{field}={fields[field]}")
+            return None
+
+    elif kind == "non_empty":
+        field = spec["field"]
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            if field in fields and _is_blank(fields[field]):
+                return _defect(spec, spec["message"], f"{field} is empty")
+            return None
+
+    elif kind == "plan_type_match":
+        plan_field, account_field = spec["plan_field"], spec["account_field"]
+
+        def check(record: dict, fields: dict) -> Defect | None:
+            plan = _normalize_plan(fields.get(plan_field))
+            account = _normalize_plan(fields.get(account_field))
+            if not plan or not account:
+                return None
+            if account not in COMPATIBLE_PLAN_TYPES.get(plan, {plan}):
+                return _defect(
+                    spec,
+                    spec["message"],
+                    f"{fields.get(plan_field)} -> {fields.get(account_field)}",
+                )
+            return None
+
+    else:
+        raise ValueError(f"Unknown NIGO rule kind: {kind}")
+
+    return check
+
+
+def compile_rules(rules: Iterable[dict]) -> dict[str | None, list[Predicate]]:
+    """
+    Compiles declarative rules into predicates keyed by normalized doc type.
+    Rules without `doc_types` are stored under None and apply to every record.
+    """
+    compiled: dict[str | None, list[Predicate]] = {}
+    for spec in rules:
+        predicate = _compile(spec)
+        doc_types = spec.get("doc_types") or [None]
+        for doc_type in doc_types:
+            key = normalize_doc_type(doc_type) if doc_type else None
+            compiled.setdefault(key, []).append(predicate)
+    return compiled
+
+
+_COMPILED_RULES = compile_rules(DEFAULT_RULES)
+
+
+def validate_record(
+    record: dict, rules: dict[str | None, list[Predicate]] | None = None
+) -> dict:
+    """
+    Validates one extraction record.
+    Records without extracted fields or confidence come back as UNKNOWN.
+    """
+    rules = rules if rules is not None else _COMPILED_RULES
+    doc_id = record.get("document_id", record.get("doc_id"))
+    doc_type = normalize_doc_type(record.get("doc_type") or record.get("document_type"))
+    fields = record.get("extracted_fields")
+
+    if fields is None and record.get("confidence") is None:
+        return {
+            "document_id": doc_id,
+            "document_type": doc_type,
+            "validation_status": "UNKNOWN",
+            "defects": [],
+        }
+
+    fields = fields or {}
+    context = {**record, "_doc_type": doc_type}
+    defects = []
+    for predicate in (*rules.get(None, ()), *rules.get(doc_type, ())):
+        defect = predicate(context, fields)
+        if defect and all(d["rule"] != defect["rule"] for d in defects):
+            defect["defect_id"] = f"def_{len(defects) + 1:03d}"
+            defects.append(defect)
+
+    return {
+        "document_id": doc_id,
+        "document_type": doc_type,
+        "validation_status": "DEFECTS_FOUND" if defects else "CLEAN",
+        "defects": defects,
+    }
+
+
+def _validate_chunk(records: list[dict]) -> list[dict]:
+    return [validate_record(record) for record in records]
+
+
+def validate_records(
+    records: list[dict],
+    on_progress: Callable[[float], None] | None = None,
+    execution: ExecutionLayer | None = None,
+) -> list[dict]:
+    """
+    Validates a batch of records, fanning large batches out in chunks over
+    `execution`'s process pool. Results are returned in input order;
+    `on_progress` receives percent done.
+    """
+    if execution is None or len(records) < settings.NIGO_PARALLEL_MIN_BATCH:
+        return _validate_chunk(records)
+
+    size = settings.NIGO_CHUNK_SIZE
+    chunks = [records[i : i + size] for i in range(0, len(records), size)]
+    results: list[dict] = []
+    for chunk_result in execution.map_cpu(_validate_chunk, chunks):
+        results.extend(chunk_result)
+        if on_progress:
+            on_progress(100.0 * len(results) / len(records))
+    return results
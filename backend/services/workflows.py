@@ -0,0 +1,292 @@
+"""
+Workflow templates and bulk instantiation.
+
+A template declares the standard task chain for a workflow type (the same
+steps seen in tasks.csv). Templates are compiled once into a task DAG laid
+out in dependency levels with cumulative SLA offsets. Instantiating a book
+inserts one level at a time for every household with a bulk INSERT ...
+RETURNING, so each level's new ids are on hand to fill the next level's
+`blocked_by_task_id` without a second pass.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from backend.models import Household, Task, Workflow
+
+_TRANSITION_STEPS = [
+    {"key": "intake", "name": "Intake package received", "sla_hours": 4},
+    {
+        "key": "classify",
+        "name": "Documents classified & extracted",
+        "sla_hours": 8,
+        "depends_on": "intake",
+    },
+    {
+        "key": "nigo",
+        "name": "NIGO validation",
+        "sla_hours": 8,
+        "depends_on": "classify",
+    },
+    {
+        "key": "resolve_nigo",
+        "name": "Resolve NIGO exceptions",
+        "sla_hours": 24,
+        "depends_on": "nigo",
+    },
+    {
+        "key": "account_setup",
+        "name": "Account setup complete",
+        "sla_hours": 24,
+        "depends_on": "resolve_nigo",
+    },
+    {
+        "key": "transfer",
+        "name": "Transfer submitted",
+        "sla_hours": 24,
+        "depends_on": "account_setup",
+    },
+    {
+        "key": "reconcile",
+        "name": "Reconciliation complete",
+        "sla_hours": 48,
+        "depends_on": "transfer",
+    },
+    {
+        "key": "complete",
+        "name": "Transition complete",
+        "sla_hours": 24,
+        "depends_on": "reconcile",
+    },
+]
+
+# workflow type -> label and steps; a step may depend on at most one other
+# step because tasks carry a single blocked_by_task_id.
+WORKFLOW_TEMPLATES: dict[str, dict] = {
+    "RECRUITED_ADVISOR": {
+        "label": "Recruited advisor onboarding",
+        "steps": _TRANSITION_STEPS,
+    },
+    "ACQUISITION_CONVERSION": {
+        "label": "Acquisition conversion",
+        "steps": [
+            *_TRANSITION_STEPS[:1],
+            {
+                "key": "book_mapping",
+                "name": "Book data mapped to custodian",
+                "owner_role": "OPS",
+                "sla_hours": 24,
+                "depends_on": "intake",
+            },
+            *_TRANSITION_STEPS[1:],
+        ],
+    },
+}
+
+
+class InvalidBook(ValueError):
+    """Raised when a book names unknown households or unnamed new ones."""
+
+
+@dataclass(frozen=True)
+class TemplateStep:
+    key: str
+    name: str
+    owner_role: str
+    sla_hours: float
+    parent: int | None  # index into CompiledTemplate.steps
+    due_offset_hours: float  # from workflow start, along the dependency path
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    workflow_type: str
+    label: str
+    steps: tuple[TemplateStep, ...]
+    levels: tuple[tuple[int, ...], ...]  # step indexes, parents first
+
+
+@lru_cache(maxsize=None)
+def compile_template(workflow_type: str) -> CompiledTemplate:
+    """
+    Compiles a workflow template into a levelled DAG.
+    Raises ValueError for unknown types, unknown dependencies and cycles.
+    """
+    template = WORKFLOW_TEMPLATES.get(workflow_type)
+    if template is None:
+        raise ValueError(f"Unknown workflow type: {workflow_type}")
+
+    specs = {spec["key"]: spec for spec in template["steps"]}
+    for spec in specs.values():
+        parent = spec.get("depends_on")
+        if parent is not None and parent not in specs:
+            raise ValueError(f"Step '{spec['key']}' depends on unknown '{parent}'")
+
+    # Kahn's algorithm, one level at a time, keeping declaration order.
+    depth: dict[str, int] = {}
+    remaining = list(specs)
+    while remaining:
+        ready = [
+            key
+            for key in remaining
+            if specs[key].get("depends_on") is None or specs[key]["depends_on"] in depth
+        ]
+        if not ready:
+            raise ValueError(f"Workflow template {workflow_type} has a cycle")
+        for key in ready:
+            parent = specs[key].get("depends_on")
+            depth[key] = 0 if parent is None else depth[parent] + 1
+        remaining = [key for key in remaining if key not in depth]
+
+    ordered = sorted(specs, key=lambda key: depth[key])
+    position = {key: i for i, key in enumerate(ordered)}
+    steps: list[TemplateStep] = []
+    for key in ordered:
+        spec = specs[key]
+        parent = spec.get("depends_on")
+        parent_index = position[parent] if parent is not None else None
+        start = steps[parent_index].due_offset_hours if parent is not None else 0.0
+        steps.append(
+            TemplateStep(
+                key=key,
+                name=spec["name"],
+                owner_role=spec.get("owner_role", "OPS"),
+                sla_hours=float(spec["sla_hours"]),
+                parent=parent_index,
+                due_offset_hours=start + float(spec["sla_hours"]),
+            )
+        )
+
+    levels = tuple(
+        tuple(i for i, key in enumerate(ordered) if depth[key] == level)
+        for level in range(max(depth.values()) + 1)
+    )
+    return CompiledTemplate(workflow_type, template["label"], tuple(steps), levels)
+
+
+def validate_book(
+    db: Session, household_ids: Iterable, households: Iterable
+) -> list[int]:
+    """
+    Checks a book before anything is written: every existing household id
+    must be a live household and every new household needs a name. Returns
+    the ids as ints; raises InvalidBook.
+    """
+    try:
+        ids = [int(h) for h in household_ids]
+    except (TypeError, ValueError):
+        raise InvalidBook("household_ids must be integers") from None
+    for n, household in enumerate(households):
+        name = household.get("name") if isinstance(household, dict) else None
+        if not isinstance(name, str) or not name.strip():
+            raise InvalidBook(f"households[{n}] has no name")
+
+    wanted = set(ids)
+    found: set[int] = set()
+    chunk = sorted(wanted)
+    for start in range(0, len(chunk), 500):
+        found.update(
+            db.scalars(
+                select(Household.id).where(
+                    Household.id.in_(chunk[start : start + 500]),
+                    Household.deleted_at.is_(None),
+                )
+            )
+        )
+    missing = sorted(wanted - found)
+    if missing:
+        shown = ", ".join(map(str, missing[:10]))
+        more = f" and {len(missing) - 10} more" if len(missing) > 10 else ""
+        raise InvalidBook(f"Unknown household ids: {shown}{more}")
+    return ids
+
+
+def create_households(
+    db: Session, advisor_id: int | None, households: Iterable[dict]
+) -> list[int]:
+    """
+    Bulk-inserts households for a book and returns their ids in input order.
+    """
+    rows = [
+        {
+            "advisor_id": advisor_id,
+            "name": household["name"],
+            "status": household.get("status", "IN_PROGRESS"),
+        }
+        for household in households
+    ]
+    if not rows:
+        return []
+    return list(
+        db.scalars(
+            insert(Household).returning(Household.id, sort_by_parameter_order=True),
+            rows,
+        )
+    )
+
+
+def instantiate_book(
+    db: Session,
+    template: CompiledTemplate,
+    advisor_id: int | None,
+    household_ids: list[int],
+    name: str,
+    started_at: datetime | None = None,
+) -> dict:
+    """
+    Creates one workflow and the template's task chain for every household.
+    Does not commit.
+    """
+    started_at = started_at or datetime.now(timezone.utc)
+    workflow = Workflow(
+        advisor_id=advisor_id,
+        name=name,
+        type=template.workflow_type,
+        started_at=started_at,
+        target_completion_at=started_at
+        + timedelta(hours=max((s.due_offset_hours for s in template.steps), default=0)),
+    )
+    db.add(workflow)
+    db.flush()
+
+    # task_ids[step][n] is the id of that step's task for household_ids[n].
+    task_ids: dict[int, list[int]] = {}
+    for level in template.levels if household_ids else ():
+        rows = []
+        for index in level:
+            step = template.steps[index]
+            parents = task_ids[step.parent] if step.parent is not None else None
+            due_at = started_at + timedelta(hours=step.due_offset_hours)
+            rows.extend(
+                {
+                    "workflow_id": workflow.id,
+                    "household_id": household_id,
+                    "name": step.name,
+                    "owner_role": step.owner_role,
+                    "status": "PENDING",
+                    "priority": 1,
+                    "sla_due_at": due_at,
+                    "blocked_by_task_id": parents[n] if parents else None,
+                }
+                for n, household_id in enumerate(household_ids)
+            )
+        ids = list(
+            db.scalars(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+            )
+        )
+        for offset, index in enumerate(level):
+            count = len(household_ids)
+            task_ids[index] = ids[offset * count : (offset + 1) * count]
+
+    return {
+        "workflow_id": workflow.id,
+        "households": len(household_ids),
+        "tasks_created": len(household_ids) * len(template.steps),
+        "target_completion_at": workflow.target_completion_at,
+    }
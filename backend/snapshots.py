@@ -0,0 +1,237 @@
+"""
+Named database snapshots, for fast demo and test resets.
+
+Seeding a large book takes minutes; restoring a snapshot of it takes
+seconds. On SQLite a snapshot is a copy of the database file taken with
+the online backup API, kept in `SNAPSHOT_DIR`. On Postgres it is a
+template database, `<db>__snap_<name>`, and a restore recreates the
+database from it with `CREATE DATABASE ... TEMPLATE`, a file-level copy.
+
+    python -m backend.snapshots save demo      # capture the current database
+    python -m backend.snapshots restore demo   # bring it back
+    python -m backend.snapshots list
+    python -m backend.snapshots delete demo
+
+A restore applies any migrations newer than the snapshot, so snapshots
+outlive schema changes.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from backend.migrations import migrate
+
+_NAME = re.compile(r"^[A-Za-z0-9_-]{1,40}$")
+
+
+class SnapshotNotFound(LookupError):
+    """Raised when restoring or deleting a snapshot that does not exist."""
+
+
+def _check_name(name: str) -> str:
+    if not _NAME.match(name):
+        raise ValueError(
+            f"Snapshot names are 1-40 letters, digits, '-' or '_', got {name!r}"
+        )
+    return name
+
+
+class SqliteSnapshots:
+    """
+    Snapshots as SQLite files in `directory`, copied page by page with
+    `sqlite3.Connection.backup` through the engine's own connection, so a
+    restore is visible to every pooled connection without reopening them.
+    """
+
+    def __init__(self, engine: Engine, directory: Path):
+        self.engine = engine
+        self.directory = Path(directory)
+
+    def path(self, name: str) -> Path:
+        return self.directory / f"{_check_name(name)}.sqlite"
+
+    def names(self) -> list[str]:
+        return sorted(path.stem for path in self.directory.glob("*.sqlite"))
+
+    def save(self, name: str) -> None:
+        path = self.path(name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so a failed save keeps the old snapshot.
+        partial = path.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        live = self.engine.raw_connection()
+        target = sqlite3.connect(partial)
+        try:
+            live.driver_connection.backup(target)
+        finally:
+            target.close()
+            live.close()
+        os.replace(partial, path)
+
+    def restore(self, name: str) -> None:
+        path = self.path(name)
+        if not path.exists():
+            raise SnapshotNotFound(f"No snapshot {name!r} in {self.directory}")
+        source = sqlite3.connect(path)
+        live = self.engine.raw_connection()
+        try:
+            source.backup(live.driver_connection)
+        finally:
+            live.close()
+            source.close()
+
+    def delete(self, name: str) -> None:
+        path = self.path(name)
+        if not path.exists():
+            raise SnapshotNotFound(f"No snapshot {name!r} in {self.directory}")
+        path.unlink()
+
+
+class PostgresSnapshots:
+    """
+    Snapshots as template databases on the same server. Copying a database
+    needs it to have no other sessions, so both directions end the other
+    connections to it first; the engine's pool is disposed for the same
+    reason and reconnects on next use.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.database = engine.url.database
+        # Statements about a database have to run outside it.
+        self._admin = create_engine(
+            engine.url.set(database="postgres"),
+            isolation_level="AUTOCOMMIT",
+            poolclass=NullPool,
+        )
+
+    def snapshot_database(self, name: str) -> str:
+        return f"{self.database}__snap_{_check_name(name)}"
+
+    def names(self) -> list[str]:
+        prefix = f"{self.database}__snap_"
+        with self._admin.connect() as conn:
+            found = conn.execute(
+                text("SELECT datname FROM pg_database WHERE datname LIKE :pattern"),
+                {"pattern": prefix.replace("_", r"\_") + "%"},
+            ).scalars()
+            return sorted(name[len(prefix) :] for name in found)
+
+    def save(self, name: str) -> None:
+        snapshot = self.snapshot_database(name)
+        self.engine.dispose()
+        with self._admin.connect() as conn:
+            self._disconnect(conn, self.database)
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{snapshot}"'))
+            conn.execute(
+                text(f'CREATE DATABASE "{snapshot}" TEMPLATE "{self.database}"')
+            )
+
+    def restore(self, name: str) -> None:
+        snapshot = self.snapshot_database(name)
+        if name not in self.names():
+            raise SnapshotNotFound(f"No snapshot database {snapshot!r}")
+        self.engine.dispose()
+        with self._admin.connect() as conn:
+            self._disconnect(conn, self.database)
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{self.database}"'))
+            conn.execute(
+                text(f'CREATE DATABASE "{self.database}" TEMPLATE "{snapshot}"')
+            )
+
+    def delete(self, name: str) -> None:
+        snapshot = self.snapshot_database(name)
+        if name not in self.names():
+            raise SnapshotNotFound(f"No snapshot database {snapshot!r}")
+        with self._admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE "{snapshot}"'))
+
+    @staticmethod
+    def _disconnect(conn, database: str) -> None:
+        conn.execute(
+            text(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = :database AND pid <> pg_backend_pid()"
+            ),
+            {"database": database},
+        )
+
+
+def snapshot_store(
+    engine: Engine, directory: str | Path | None = None
+) -> SqliteSnapshots | PostgresSnapshots:
+    """
+    The snapshot store for `engine`'s backend; `directory` (default
+    `SNAPSHOT_DIR`) only matters for SQLite.
+    """
+    if engine.dialect.name == "sqlite":
+        if directory is None:
+            from backend.config import settings
+
+            directory = settings.SNAPSHOT_DIR
+        return SqliteSnapshots(engine, Path(directory))
+    if engine.dialect.name == "postgresql":
+        return PostgresSnapshots(engine)
+    raise ValueError(f"Snapshots are not supported on {engine.dialect.name}")
+
+
+def save_snapshot(engine: Engine, name: str, directory: str | Path | None = None):
+    """
+    Captures the current database as snapshot `name`, replacing any
+    snapshot of that name.
+    """
+    snapshot_store(engine, directory).save(name)
+
+
+def restore_snapshot(
+    engine: Engine, name: str, directory: str | Path | None = None
+) -> list[int]:
+    """
+    Replaces the database with snapshot `name`, then applies any newer
+    migrations. Returns the versions applied. Raises SnapshotNotFound.
+    """
+    snapshot_store(engine, directory).restore(name)
+    return migrate(engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Save and restore database snapshots")
+    parser.add_argument("command", choices=("save", "restore", "list", "delete"))
+    parser.add_argument("name", nargs="?", help="Snapshot name")
+    parser.add_argument("--dir", default=None, help="Snapshot folder (SQLite only)")
+    args = parser.parse_args()
+    if args.command != "list" and not args.name:
+        parser.error(f"{args.command} needs a snapshot name")
+
+    from backend.database import engine
+
+    store = snapshot_store(engine, args.dir)
+    if args.command == "list":
+        for name in store.names():
+            print(name)
+        return
+    try:
+        if args.command == "save":
+            store.save(args.name)
+            print(f"✅ Saved snapshot {args.name}")
+        elif args.command == "restore":
+            applied = restore_snapshot(engine, args.name, args.dir)
+            print(f"✅ Restored snapshot {args.name}")
+            if applied:
+                print(f"   Applied migrations: {', '.join(map(str, applied))}")
+        else:
+            store.delete(args.name)
+            print(f"Deleted snapshot {args.name}")
+    except (SnapshotNotFound, ValueError) as exc:
+        parser.exit(1, f"{exc}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,67 @@
 import os
+import tempfile
+import time
 
 import pytest
 from fastapi.testclient import TestClient
 
 # Set env vars BEFORE importing app/config to ensure they are picked up
-os.environ["DATABASE_URL"] = "sqlite:///./test_db.sqlite"
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_db.sqlite"
 os.environ["ENABLE_SKILL_STUBS"] = "True"
+os.environ["MEETING_PACK_DIR"] = tempfile.mkdtemp(prefix="meeting-packs-")
+os.environ["SQL_DEBUG"] = "True"
 
+from backend.database import SessionLocal, engine
 from backend.main import app as fastapi_app
+from backend.migrations import drop_schema, migrate
+from backend.snapshots import restore_snapshot
+from backend.tracing import QueryCounter
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--snapshot",
+        default=os.getenv("TEST_SNAPSHOT"),
+        help="Start the session from this database snapshot instead of an empty "
+        "schema (see backend/snapshots.py; SNAPSHOT_DIR locates SQLite ones)",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def clean_database(request):
+    snapshot = request.config.getoption("--snapshot")
+    if snapshot:
+        # A seeded book in seconds; newer migrations are applied on top.
+        restore_snapshot(engine, snapshot)
+    else:
+        # Build the schema the way deployments do, through the migrations.
+        drop_schema(engine)
+        migrate(engine)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    """
+    Fails a test marked `@pytest.mark.query_budget(n)` that runs more than
+    n statements. Background job workers and the cache invalidation poller
+    are not counted; their timing varies run to run.
+    """
+    counter = QueryCounter(engine, ignore_threads=("job-worker", "cache-invalidation"))
+    try:
+        yield counter
+    finally:
+        counter.close()
+    marker = request.node.get_closest_marker("query_budget")
+    if marker and counter.count > marker.args[0]:
+        top = "\n".join(
+            f"  {count}x {statement[:160]}"
+            for statement, count in counter.fingerprints.most_common(5)
+        )
+        pytest.fail(
+            f"Ran {counter.count} SQL statements, budget is {marker.args[0]}:\n{top}",
+            pytrace=False,
+        )
 
 
 @pytest.fixture(scope="session")
@@ -15,6 +69,31 @@ def app():
     return fastapi_app
 
 
+@pytest.fixture(scope="function")
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 @pytest.fixture(scope="function")
 def client(app):
     return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture(scope="function")
+def wait_for_job(client, query_budget):
+    def wait(job_id: str, timeout: float = 10.0) -> dict:
+        deadline = time.monotonic() + timeout
+        # The number of polls depends on timing, so keep it out of budgets.
+        with query_budget.paused():
+            while time.monotonic() < deadline:
+                job = client.get(f"/jobs/{job_id}").json()["data"]
+                if job["status"] in ("SUCCEEDED", "FAILED"):
+                    return job
+                time.sleep(0.05)
+        raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
+
+    return wait
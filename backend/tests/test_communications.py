@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from backend.services.communications import compile_template
+
+
+def test_templates_compile_once():
+    source = "Hello {{ household_name }}, {{ percent_complete }}% done"
+    template = compile_template(source)
+    assert compile_template(source) is template
+    assert template.render({"household_name": "Orion", "percent_complete": 40}) == (
+        "Hello Orion, 40% done"
+    )
+
+
+@pytest.mark.query_budget(35)
+def test_batch_drafts_stream_per_household(client):
+    workflow = client.post(
+        "/workflows",
+        json={
+            "workflow_type": "RECRUITED_ADVISOR",
+            "advisor_id": "ADV_COMMS",
+            "metadata": {
+                "households": [{"name": f"Comms Family {i}"} for i in range(3)]
+            },
+        },
+    ).json()["data"]
+
+    response = client.post(
+        "/communications/draft-batch",
+        json={"workflow_id": workflow["workflow_id"], "tone": "friendly"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    drafts = [json.loads(line) for line in response.text.splitlines()]
+    assert [d["body"].split(",")[0] for d in drafts] == [
+        f"Dear Comms Family {i}" for i in range(3)
+    ]
+    assert all("0 of 8 steps" in d["body"] for d in drafts)
+    assert all(d["body"].rstrip().endswith("Talk soon,\nYour advisor") for d in drafts)
+
+
+@pytest.mark.query_budget(0)
+def test_draft_rejects_unknown_template_field(client):
+    response = client.post(
+        "/communications/draft", json={"subject": "Hi", "body": "{{ ssn }}"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.query_budget(0)
+@pytest.mark.parametrize(
+    "payload",
+    [{"template_type": 5}, {"tone": ["friendly"]}, {"subject": 1, "body": {"x": 1}}],
+)
+def test_draft_rejects_non_string_template_options(client, payload):
+    assert client.post("/communications/draft", json=payload).status_code == 422
+    response = client.post(
+        "/communications/draft-batch", json={"workflow_id": "WF-NONE", **payload}
+    )
+    assert response.status_code == 422
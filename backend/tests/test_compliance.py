@@ -0,0 +1,86 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from backend.services.compliance import ComplianceScanner, compile_rules, load_rules
+
+
+def test_automaton_reports_offsets_and_categories():
+    rules = compile_rules(
+        [
+            {"phrase": "guaranteed", "category": "GUARANTEE", "severity": "HIGH"},
+            {"phrase": "guaranteed returns", "category": "GUARANTEE"},
+            {"phrase": "beat the market", "category": "PERFORMANCE_PROMISE"},
+            {"kind": "pattern", "phrase": r"\b\d{3}-\d{2}-\d{4}\b", "category": "PII"},
+        ]
+    )
+    text = "We offer Guaranteed Returns and will beat the market. SSN 123-45-6789."
+    flags = rules.scan(text)
+    assert [(f["match"], f["category"]) for f in flags] == [
+        ("Guaranteed Returns", "GUARANTEE"),
+        ("Guaranteed", "GUARANTEE"),
+        ("beat the market", "PERFORMANCE_PROMISE"),
+        ("123-45-6789", "PII"),
+    ]
+    assert text[flags[2]["start"] : flags[2]["end"]] == "beat the market"
+    assert rules.scan("No guaranteeing anything here.") == []
+
+
+def test_scanner_hot_reloads_phrase_list(tmp_path):
+    path = tmp_path / "phrases.csv"
+    path.write_text("kind,phrase,category,severity\nphrase,act now,PRESSURE,MEDIUM\n")
+    scanner = ComplianceScanner(path, check_interval=0)
+    assert len(scanner.scan("Act now to move your account")) == 1
+    assert scanner.scan("A risk-free transfer") == []
+
+    path.write_text("kind,phrase,category,severity\nphrase,risk-free,GUARANTEE,HIGH\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    time.sleep(0.01)
+    assert scanner.scan("A risk-free transfer")[0]["category"] == "GUARANTEE"
+
+
+def _rewrite(path, content: bytes):
+    path.write_bytes(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_scanner_keeps_last_good_list_when_a_reload_fails(tmp_path):
+    path = tmp_path / "phrases.csv"
+    path.write_text("kind,phrase,category,severity\nphrase,act now,PRESSURE,MEDIUM\n")
+    scanner = ComplianceScanner(path, check_interval=0)
+    assert len(scanner.scan("Act now")) == 1
+
+    # A half-typed row is skipped; the rest of the new list applies.
+    _rewrite(path, b"kind,phrase,category,severity\nphrase\nphrase,risk-free\n")
+    assert scanner.scan("Act now") == []
+    assert len(scanner.scan("A risk-free transfer")) == 1
+
+    # An unreadable file keeps the old list and is parsed once, not per scan.
+    _rewrite(path, b"kind,phrase\nphrase,\xff\xfe risk\n")
+    with patch(
+        "backend.services.compliance.load_rules", side_effect=load_rules
+    ) as loads:
+        assert len(scanner.scan("A risk-free transfer")) == 1
+        assert len(scanner.scan("A risk-free transfer")) == 1
+    assert loads.call_count == 1
+
+
+@pytest.mark.query_budget(0)
+def test_drafts_carry_compliance_flags(client):
+    response = client.post(
+        "/communications/draft",
+        json={
+            "subject": "Your transfer",
+            "body": "Dear {{ household_name }}, this move is guaranteed to beat the market.",
+            "household_name": "Orion",
+        },
+    )
+    flags = response.json()["data"]["compliance_flags"]
+    assert {(f["field"], f["category"]) for f in flags} == {
+        ("body", "GUARANTEE"),
+        ("body", "PERFORMANCE_PROMISE"),
+    }
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from backend.services.execution import ExecutionLayer, PoolSaturated
+from backend.services.nigo import validate_records
+
+
+@pytest.mark.query_budget(0)
+def test_large_entity_match_runs_in_process_pool(client):
+    records = [
+        {"record_id": f"R-{i}", "name": f"Client {i}", "email": f"c{i}@example.com"}
+        for i in range(4)
+    ]
+    records.append({**records[0], "record_id": "R-dup"})
+    with patch("backend.orchestrator.settings.EXEC_CPU_MIN_ITEMS", 1):
+        response = client.post("/entity/match", json={"records": records})
+    assert response.json()["data"]["duplicates"][0]["record_ids"] == ["R-0", "R-dup"]
+
+    pools = client.get("/health/pools").json()["data"]
+    assert pools["cpu"]["completed"] >= 1
+    assert pools["io"]["max_workers"] > 0
+
+
+def test_saturated_pool_rejects_work():
+    layer = ExecutionLayer(io_workers=1, cpu_workers=1, max_pending=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(layer.run_io(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated):
+            await layer.run_io(lambda: None)
+        release.set()
+        await blocked
+
+    asyncio.run(scenario())
+    stats = layer.snapshot()["io"]
+    assert (stats["completed"], stats["rejected"], stats["in_flight"]) == (1, 1, 0)
+    layer.shutdown()
+
+
+def test_batch_validation_runs_on_the_cpu_pool():
+    layer = ExecutionLayer(io_workers=1, cpu_workers=1)
+    records = [
+        {"doc_id": f"D-{i}", "doc_type": "GOVERNMENT_ID", "confidence": 0.9}
+        for i in range(5)
+    ]
+    with patch("backend.services.nigo.settings.NIGO_CHUNK_SIZE", 2), patch(
+        "backend.services.nigo.settings.NIGO_PARALLEL_MIN_BATCH", 1
+    ):
+        results = validate_records(records, execution=layer)
+    assert [r["document_id"] for r in results] == [f"D-{i}" for i in range(5)]
+    stats = layer.snapshot()["cpu"]
+    assert (stats["completed"], stats["in_flight"]) == (3, 0)
+    layer.shutdown()
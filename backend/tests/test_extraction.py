@@ -0,0 +1,54 @@
+from backend.services.extraction import (
+    ExtractionStats,
+    Manifest,
+    extract_text,
+    run_pipeline,
+)
+
+TRANSFER_FORM = """Doc Type: Transfer Form
+Account ID: ACCT-2007
+Delivering Plan Type: Traditional IRA
+Receiving Account Type: Roth IRA
+Estimated Assets USD: 205000
+"""
+
+
+def test_extract_transfer_form():
+    record = extract_text(TRANSFER_FORM, "DOC-3029")
+    assert record["doc_type"] == "Transfer_Form"
+    assert record["account_id"] == "ACCT-2007"
+    assert record["extracted_fields"] == {
+        "delivering_plan_type": "Traditional IRA",
+        "receiving_account_type": "Roth IRA",
+        "estimated_assets_usd": 205000,
+    }
+    assert record["confidence"] == 0.99
+    assert "Receiving Account Type: Roth IRA" in record["evidence_snippets"]
+
+
+def test_unreadable_fields_lower_confidence():
+    text = "Doc Type: Government ID\nName: [UNREADABLE]\nDOB: 1984-06-12\n"
+    record = extract_text(text)
+    assert record["doc_type"] == "Government_ID"
+    assert record["extracted_fields"]["name"] == "[UNREADABLE]"
+    assert record["confidence"] == 0.33
+
+
+def test_pipeline_skips_unchanged_files(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text(TRANSFER_FORM)
+    (docs / "b.txt").write_text("Doc Type: Advisory Agreement\nSignature: \n")
+    manifest_path = tmp_path / "manifest.json"
+
+    manifest = Manifest(manifest_path)
+    first = list(run_pipeline(docs, manifest, workers=1))
+    manifest.save()
+    assert sorted(r["doc_id"] for r in first) == ["a", "b"]
+
+    (docs / "b.txt").write_text("Doc Type: Advisory Agreement\nSignature: SIGNED\n")
+    stats = ExtractionStats()
+    second = list(run_pipeline(docs, Manifest(manifest_path), workers=1, stats=stats))
+    assert [r["doc_id"] for r in second] == ["b"]
+    assert second[0]["extracted_fields"]["signature_present"] is True
+    assert (stats.scanned, stats.unchanged, stats.extracted) == (2, 1, 1)
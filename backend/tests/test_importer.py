@@ -0,0 +1,194 @@
+import csv
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.importer import DatasetImporter
+from backend.importer.schema import parse_dt
+from backend.importer.stages import Stage, run_stages
+from backend.importer.writers import _copy_value
+from backend.migrations import migrate
+
+DEMO_DATA = Path(__file__).resolve().parents[2] / "demo_data" / "transition_os_demo_v1"
+
+
+def test_imports_demo_dataset_in_small_chunks(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/import.sqlite")
+    migrate(engine)
+
+    importer = DatasetImporter(engine, DEMO_DATA, chunk_size=7)
+    counts = importer.run()
+
+    assert counts == {
+        "advisors": 1,
+        "households": 12,
+        "accounts": 20,
+        "workflows": 12,
+        "tasks": 96,
+        "documents": 60,
+        "audit_events": 58,
+    }
+    with engine.connect() as conn:
+        # Dependencies resolved through the RETURNING id maps.
+        blocked = conn.execute(
+            text(
+                "SELECT t.id, b.id FROM tasks t JOIN tasks b "
+                "ON t.blocked_by_task_id = b.id"
+            )
+        ).all()
+        account_docs = conn.execute(
+            text("SELECT count(*) FROM documents WHERE account_id IS NOT NULL")
+        ).scalar()
+    assert blocked and all(task_id != blocker_id for task_id, blocker_id in blocked)
+    assert importer.task_ids["TASK-5002"] in {task_id for task_id, _ in blocked}
+    assert account_docs > 0
+
+
+def test_copy_values_distinguish_null_from_empty_text():
+    assert _copy_value(None) == ""
+    assert _copy_value("") == '""'
+    assert _copy_value('say "hi", ok') == '"say ""hi"", ok"'
+    assert _copy_value({"a": 1}) == '"{""a"": 1}"'
+    assert _copy_value(2.5) == "2.5"
+
+
+def _copy_dataset(target: Path) -> Path:
+    shutil.copytree(DEMO_DATA, target, ignore=shutil.ignore_patterns("docs"))
+    return target
+
+
+def _rewrite_csv(path: Path, change) -> None:
+    with path.open(newline="", encoding="ascii") as handle:
+        reader = csv.DictReader(handle)
+        fields, rows = reader.fieldnames, [r for r in map(change, reader) if r]
+    with path.open("w", newline="", encoding="ascii") as handle:
+        writer = csv.DictWriter(handle, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_incremental_reimport_writes_only_the_delta(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/import.sqlite")
+    migrate(engine)
+    data = _copy_dataset(tmp_path / "data")
+    DatasetImporter(engine, data).run()
+
+    rerun = DatasetImporter(engine, data, incremental=True, tombstone=True)
+    first_counts = rerun.run()
+    assert all(set(+stats) == {"unchanged"} for stats in rerun.stats.values())
+
+    def change_household(row):
+        return {**row, "status": "COMPLETE"} if row["household_id"] == "H-1001" else row
+
+    def drop_account(row):
+        return None if row["account_id"] == "ACCT-2002" else row
+
+    _rewrite_csv(data / "households.csv", change_household)
+    _rewrite_csv(data / "accounts.csv", drop_account)
+
+    delta = DatasetImporter(engine, data, incremental=True, tombstone=True)
+    assert delta.run() == first_counts
+    assert +delta.stats["households"] == {"updated": 1, "unchanged": 11}
+    assert +delta.stats["accounts"] == {"unchanged": 19, "tombstoned": 1}
+    assert +delta.stats["tasks"] == {"unchanged": 96}
+
+    with engine.connect() as conn:
+        status = conn.execute(
+            text("SELECT status FROM households WHERE source_id = 'H-1001'")
+        ).scalar()
+        deleted_at = conn.execute(
+            text("SELECT deleted_at FROM accounts WHERE source_id = 'ACCT-2002'")
+        ).scalar()
+    assert status == "COMPLETE"
+    assert deleted_at is not None
+
+    # The account coming back revives the same row.
+    shutil.copy(DEMO_DATA / "accounts.csv", data / "accounts.csv")
+    revived = DatasetImporter(engine, data, incremental=True, tombstone=True)
+    revived.run()
+    assert +revived.stats["accounts"] == {"updated": 1, "unchanged": 19}
+
+
+def test_parallel_import_matches_sequential(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/import.sqlite")
+    migrate(engine)
+
+    importer = DatasetImporter(engine, DEMO_DATA, chunk_size=7, parallel=True)
+    counts = importer.run()
+
+    assert counts["tasks"] == 96 and counts["audit_events"] == 58
+    assert importer.timings["documents"].rows == 60
+    assert set(importer.timings) == {stage.name for stage in importer.stages()}
+    # Maps are released once their dependents are done; tasks stay for lookups.
+    assert not importer.household_ids and not importer.account_ids
+    with engine.connect() as conn:
+        blocked = conn.execute(
+            text("SELECT count(*) FROM tasks WHERE blocked_by_task_id IS NOT NULL")
+        ).scalar()
+    assert blocked == 84
+
+
+def test_stages_run_after_their_dependencies():
+    ran = []
+
+    def stage(name, after=()):
+        return Stage(name, lambda: ran.append(name) or 1, after=after)
+
+    timings = run_stages(
+        [stage("c", ("a", "b")), stage("b", ("a",)), stage("a")], parallel=True
+    )
+    assert ran == ["a", "b", "c"] and timings["c"].rows == 1
+
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([stage("a", ("b",)), stage("b", ("a",))])
+
+
+def test_invalid_rows_are_rejected_with_reasons(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/import.sqlite")
+    migrate(engine)
+    data = _copy_dataset(tmp_path / "data")
+
+    def break_task(row):
+        return (
+            {**row, "due_at": "next tuesday"} if row["task_id"] == "TASK-5003" else row
+        )
+
+    def orphan_account(row):
+        return (
+            {**row, "household_id": "H-404"}
+            if row["account_id"] == "ACCT-2002"
+            else row
+        )
+
+    _rewrite_csv(data / "tasks.csv", break_task)
+    _rewrite_csv(data / "accounts.csv", orphan_account)
+    with (data / "audit_events.jsonl").open("a", encoding="ascii") as handle:
+        handle.write("{not json\n")
+
+    rejects = tmp_path / "rejects.jsonl"
+    importer = DatasetImporter(engine, data, chunk_size=7, reject_path=rejects)
+    counts = importer.run()
+
+    assert counts["tasks"] == 95 and counts["accounts"] == 19
+    assert counts["audit_events"] == 58
+    assert importer.stats["tasks"]["rejected"] == 1
+    records = {r["file"]: r for r in map(json.loads, rejects.read_text().splitlines())}
+    assert records.keys() == {"tasks.csv", "accounts.csv", "audit_events.jsonl"}
+    assert records["tasks.csv"]["line"] == 4
+    assert records["tasks.csv"]["reasons"] == [
+        "due_at: not an ISO 8601 timestamp: 'next tuesday'"
+    ]
+    assert records["accounts.csv"]["reasons"] == [
+        "household_id: unknown household 'H-404'"
+    ]
+    assert records["audit_events.jsonl"]["row"] == "{not json"
+
+
+def test_parse_dt_rejects_malformed_timestamps():
+    assert parse_dt("2026-01-12T09:00:00Z").tzinfo is not None
+    assert parse_dt("  ") is None
+    with pytest.raises(ValueError, match="ISO 8601"):
+        parse_dt("12/01/2026")
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import func, insert, select
+
+from backend.database import engine
+from backend.services.invalidation import InvalidationBus, table
+
+
+def test_invalidation_reaches_other_workers_only_once():
+    cleared = {"a": [], "b": []}
+    worker_a = InvalidationBus(engine)
+    worker_b = InvalidationBus(engine)
+    worker_a.subscribe("template", cleared["a"].append)
+    worker_b.subscribe("template", cleared["b"].append)
+    worker_a.poll_once()
+    worker_b.poll_once()
+
+    worker_a.publish("template", "welcome")
+    worker_a.publish("template")
+    # The publisher applies its own invalidations immediately ...
+    assert cleared["a"] == ["welcome", None]
+    assert cleared["b"] == []
+
+    # ... and the other worker picks them up on its next poll, in order.
+    assert worker_b.poll_once() == 2
+    assert cleared["b"] == ["welcome", None]
+    assert worker_a.poll_once() == 0
+    assert worker_b.poll_once() == 0
+    assert cleared["a"] == ["welcome", None]
+
+
+def test_invalidation_committed_out_of_id_order_is_applied():
+    cleared = []
+    worker = InvalidationBus(engine)
+    worker.subscribe("template", cleared.append)
+    worker.poll_once()
+    with engine.begin() as conn:
+        last = conn.execute(select(func.max(table.c.id))).scalar() or 0
+
+    # The row with the higher id commits first, as two concurrent
+    # publishers on Postgres can.
+    with engine.begin() as conn:
+        conn.execute(
+            insert(table).values(id=last + 2, cache="template", key="b", origin="x")
+        )
+    assert worker.poll_once() == 1
+    with engine.begin() as conn:
+        conn.execute(
+            insert(table).values(id=last + 1, cache="template", key="a", origin="x")
+        )
+    assert worker.poll_once() == 1
+    assert worker.poll_once() == 0
+    assert cleared == ["b", "a"]
+
+
+@pytest.mark.query_budget(4)
+def test_invalidate_endpoint(client):
+    response = client.post("/caches/communication_template/invalidate")
+    assert response.status_code == 200
+    assert response.json()["data"] == {"cache": "communication_template", "key": None}
+
+    response = client.post("/caches/nope/invalidate")
+    assert response.status_code == 404
+    assert "compliance_rules" in response.json()["detail"]
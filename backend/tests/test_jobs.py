@@ -0,0 +1,178 @@
+import queue
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.migrations import migrate
+from backend.models import Job
+from backend.services.jobs import JobManager, JobQueueFull
+
+
+@pytest.mark.query_budget(2)
+def test_async_entity_match_returns_job(client, wait_for_job):
+    records = [
+        {"record_id": "A", "name": "Riley Sample", "phone": "555-0103"},
+        {"record_id": "B", "name": "Riley  Sample", "phone": "555 0103"},
+    ]
+    response = client.post("/entity/match?async=true", json={"records": records})
+    assert response.status_code == 202
+    accepted = response.json()["data"]
+    assert accepted["status_url"] == f"/jobs/{accepted['job_id']}"
+
+    job = wait_for_job(accepted["job_id"])
+    assert job["status"] == "SUCCEEDED"
+    assert job["progress"] == 100.0
+    assert job["result"]["data"]["summary"]["duplicates_found"] == 1
+
+
+@pytest.mark.query_budget(2)
+def test_async_validate_batch(client, wait_for_job):
+    response = client.post(
+        "/documents/validate-batch?async=true",
+        json={"documents": [{"document_id": "DOC-1", "doc_type": "Government_ID"}]},
+    )
+    assert response.status_code == 202
+    job = wait_for_job(response.json()["data"]["job_id"])
+    assert job["result"]["data"]["summary"]["unknown"] == 1
+
+
+@pytest.mark.query_budget(2)
+def test_failed_job_reports_error(client, wait_for_job):
+    with patch(
+        "backend.orchestrator.orchestrator.get_eta_prediction",
+        side_effect=RuntimeError("model unavailable"),
+    ):
+        response = client.get("/predictions/eta/WF_1?async=true")
+        job = wait_for_job(response.json()["data"]["job_id"])
+    assert job["status"] == "FAILED"
+    assert job["error"] == "model unavailable"
+
+
+@pytest.mark.query_budget(2)
+def test_unknown_job(client):
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def _manager(tmp_path, max_queue, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path}/jobs.sqlite")
+    migrate(engine)
+    sessions = sessionmaker(bind=engine)
+    manager = JobManager(sessions, max_workers=1, max_queue=max_queue, **kwargs)
+    manager.register("noop", lambda payload, ctx: payload)
+    return manager, sessions
+
+
+def test_recovery_beyond_queue_capacity_drains_the_backlog(tmp_path):
+    manager, sessions = _manager(tmp_path, max_queue=2)
+    with sessions() as session:
+        session.add_all(Job(id=f"job-{i}", kind="noop") for i in range(7))
+        session.commit()
+
+    try:
+        assert manager.recover() == 7
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with sessions() as session:
+                done = session.query(Job).filter(Job.status == "SUCCEEDED").count()
+            if done == 7:
+                break
+            time.sleep(0.05)
+        assert done == 7
+    finally:
+        manager.shutdown()
+
+
+def test_submit_fails_the_row_when_the_queue_fills_meanwhile(tmp_path):
+    manager, sessions = _manager(tmp_path, max_queue=5)
+    try:
+        with patch.object(manager._queue, "put_nowait", side_effect=queue.Full):
+            with pytest.raises(JobQueueFull):
+                manager.submit("noop", {})
+        with sessions() as session:
+            assert [job.status for job in session.query(Job)] == ["FAILED"]
+    finally:
+        manager.shutdown()
+
+
+def test_jobs_with_expired_leases_are_requeued(tmp_path):
+    manager, sessions = _manager(tmp_path, max_queue=5, lease_seconds=60)
+    now = datetime.now(timezone.utc)
+    with sessions() as session:
+        # Left RUNNING by a worker that crashed, and one a live sibling runs.
+        session.add(
+            Job(
+                id="crashed",
+                kind="noop",
+                status="RUNNING",
+                heartbeat_at=now - timedelta(minutes=5),
+            )
+        )
+        session.add(Job(id="alive", kind="noop", status="RUNNING", heartbeat_at=now))
+        session.commit()
+
+    try:
+        assert manager.recover() == 1
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with sessions() as session:
+                statuses = dict(session.query(Job.id, Job.status))
+            if statuses["crashed"] == "SUCCEEDED":
+                break
+            time.sleep(0.05)
+        assert statuses == {"crashed": "SUCCEEDED", "alive": "RUNNING"}
+    finally:
+        manager.shutdown()
+
+
+def test_job_of_an_unknown_kind_fails(tmp_path):
+    manager, sessions = _manager(tmp_path, max_queue=5)
+    with sessions() as session:
+        # Queued by a process with a handler this one does not register.
+        session.add(Job(id="orphan", kind="retired_kind"))
+        session.commit()
+
+    try:
+        assert manager.recover() == 1
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            job = manager.get("orphan")
+            if job["status"] not in ("QUEUED", "RUNNING"):
+                break
+            time.sleep(0.05)
+        assert job["status"] == "FAILED"
+        assert "retired_kind" in job["error"]
+        assert job["attempts"] == 1
+    finally:
+        manager.shutdown()
+
+
+def test_job_whose_worker_keeps_dying_fails_after_max_attempts(tmp_path):
+    manager, sessions = _manager(
+        tmp_path, max_queue=5, lease_seconds=60, max_attempts=2
+    )
+    stale = datetime.now(timezone.utc) - timedelta(minutes=5)
+    with sessions() as session:
+        for job_id, attempts in (("retry", 1), ("poison", 2)):
+            session.add(
+                Job(
+                    id=job_id,
+                    kind="noop",
+                    status="RUNNING",
+                    heartbeat_at=stale,
+                    attempts=attempts,
+                )
+            )
+        session.commit()
+
+    try:
+        assert manager.requeue_expired() == 1
+        with sessions() as session:
+            statuses = dict(session.query(Job.id, Job.status))
+        assert statuses == {"retry": "QUEUED", "poison": "FAILED"}
+        assert "2 attempts" in manager.get("poison")["error"]
+    finally:
+        manager.shutdown()
@@ -0,0 +1,97 @@
+import io
+import json
+import logging
+import queue
+import threading
+import time
+
+from backend.config import settings
+from backend.logging_config import (
+    HotPathFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    redact,
+    setup_logging,
+)
+
+
+def test_redaction_reaches_nested_payloads():
+    payload = {
+        "advisor": {"name": "Ada", "SSN": "123-45-6789"},
+        "accounts": [{"accountNumber": "9876", "type": "IRA"}],
+        "api-token": "abc",
+    }
+    assert redact(payload) == {
+        "advisor": {"name": "Ada", "SSN": "[REDACTED]"},
+        "accounts": [{"accountNumber": "[REDACTED]", "type": "IRA"}],
+        "api-token": "[REDACTED]",
+    }
+
+
+def test_redaction_matches_sensitive_words_inside_keys():
+    payload = {
+        "access_token": "a",
+        "client_secret": "b",
+        "accountNumberLast4": "6789",
+        "APIToken": "c",
+        "tokenizer": "d",
+        "account_type": "IRA",
+    }
+    assert redact(payload) == {
+        "access_token": "[REDACTED]",
+        "client_secret": "[REDACTED]",
+        "accountNumberLast4": "[REDACTED]",
+        "APIToken": "[REDACTED]",
+        "tokenizer": "d",
+        "account_type": "IRA",
+    }
+
+
+def test_records_are_formatted_off_the_calling_thread():
+    written = []
+
+    class Stream(io.StringIO):
+        def write(self, text):
+            written.append((threading.current_thread().name, text))
+            return len(text)
+
+    setup_logging("INFO", stream=Stream())
+    try:
+        logging.getLogger("backend.test").info(
+            "hello %s", "world", extra={"payload": {"password": "x"}}
+        )
+        deadline = time.monotonic() + 2
+        while not written and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        setup_logging(settings.LOG_LEVEL)
+
+    thread, text = written[0]
+    assert thread != threading.current_thread().name
+    line = json.loads(text)
+    assert line["message"] == "hello world"
+    assert line["payload"] == {"password": "[REDACTED]"}
+
+
+def test_hot_path_filter_rate_limits_and_reports_drops():
+    limiter = HotPathFilter({"backend.access": 2}, {})
+
+    def record(name="backend.access.http", level=logging.INFO):
+        return logging.LogRecord(name, level, __file__, 1, "x", None, None)
+
+    kept = [limiter.filter(record()) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+    assert limiter.filter(record(level=logging.ERROR))
+    assert limiter.filter(record("backend.other"))
+
+    time.sleep(0.6)
+    passed = record()
+    assert limiter.filter(passed)
+    assert json.loads(JsonFormatter().format(passed))["suppressed"] == 3
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.emit(logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None))
+    assert handler.dropped == 2
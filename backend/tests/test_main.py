@@ -1,7 +1,12 @@
+import pytest
+
+
+@pytest.mark.query_budget(0)
 def test_health_routes(client):
     assert client.get("/health/live").status_code == 200
     assert client.get("/health/ready").status_code == 200
 
+@pytest.mark.query_budget(3)
 def test_onboard_advisor_flow(client):
     # Test the new root-level endpoint
     response = client.post("/workflows", json={
@@ -19,8 +24,9 @@ def test_onboard_advisor_flow(client):
     # Test getting dashboard for it
     dashboard_res = client.get(f"/workflows/{workflow_id}")
     assert dashboard_res.status_code == 200
-    assert dashboard_res.json()["workflow_id"] == workflow_id
+    assert dashboard_res.json()["workflow_id"] == str(workflow_id)
 
+@pytest.mark.query_budget(0)
 def test_validate_document(client):
     # Test the new root-level endpoint with dict payload
     response = client.post("/documents/validate", json={
@@ -31,3 +37,92 @@ def test_validate_document(client):
     data = response.json()
     assert data["status"] == "OK"
     assert data["data"]["document_id"] == "doc_123"
+
+@pytest.mark.query_budget(0)
+def test_validate_document_runs_nigo_rules(client):
+    response = client.post("/documents/validate", json={
+        "document_id": "DOC-3029",
+        "doc_type": "Transfer_Form",
+        "extracted_fields": {
+            "delivering_plan_type": "Traditional IRA",
+            "receiving_account_type": "Roth IRA",
+            "estimated_assets_usd": 205000,
+        },
+        "confidence": 0.93,
+    })
+    data = response.json()["data"]
+    assert data["validation_status"] == "DEFECTS_FOUND"
+    assert [d["rule"] for d in data["defects"]] == ["PLAN_TYPE_MISMATCH"]
+
+@pytest.mark.query_budget(0)
+def test_validate_document_with_non_numeric_confidence(client):
+    response = client.post("/documents/validate", json={
+        "document_id": "DOC-3030",
+        "doc_type": "Government_ID",
+        "extracted_fields": {"name": "Ada", "dob": "1980-01-01", "id_number": "X1"},
+        "confidence": "high",
+    })
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["validation_status"] == "DEFECTS_FOUND"
+    assert [d["rule"] for d in data["defects"]] == ["ILLEGIBLE"]
+
+@pytest.mark.query_budget(12)
+def test_validate_batch_writes_back_status(client, db):
+    from backend.models import Document, Household
+
+    household = Household(name="Batch Household")
+    db.add(household)
+    db.flush()
+    signed = Document(household_id=household.id, name="signed.txt", type="Advisory_Agreement")
+    unsigned = Document(household_id=household.id, name="unsigned.txt", type="Advisory_Agreement")
+    db.add_all([signed, unsigned])
+    db.commit()
+
+    fields = {"client_name": "Casey Faux", "agreement_date": "2026-01-10"}
+    response = client.post("/documents/validate-batch", json={"documents": [
+        {"document_id": signed.id, "doc_type": "Advisory_Agreement", "confidence": 0.96,
+         "extracted_fields": {**fields, "signature_present": True}},
+        {"document_id": unsigned.id, "doc_type": "Advisory_Agreement", "confidence": 0.96,
+         "extracted_fields": {**fields, "signature_present": False}},
+        {"document_id": "DOC-404", "doc_type": "Government_ID"},
+    ]})
+    assert response.status_code == 200
+    summary = response.json()["data"]["summary"]
+    assert summary == {"total": 3, "clean": 1, "defects_found": 1, "unknown": 1, "updated": 2}
+
+    db.expire_all()
+    assert db.get(Document, signed.id).nigo_status == "CLEAN"
+    assert db.get(Document, unsigned.id).defects_json[0]["rule"] == "MISSING_SIGNATURE"
+
+@pytest.mark.query_budget(12)
+def test_validate_batch_writes_back_by_source_id(client, db):
+    from backend.models import Document, Household
+
+    household = Household(name="Imported Household")
+    db.add(household)
+    db.flush()
+    imported = Document(household_id=household.id, name="id.pdf", type="Government_ID", source_id="DOC-3001")
+    db.add(imported)
+    db.commit()
+
+    response = client.post("/documents/validate-batch", json={"documents": [
+        {"doc_id": "DOC-3001", "doc_type": "Government_ID", "confidence": "high",
+         "extracted_fields": {"name": "Ada", "dob": "1980-01-01", "id_number": "X1"}},
+        {"doc_id": "DOC-9999", "doc_type": "Government_ID", "confidence": 0.95,
+         "extracted_fields": {"name": "Ada"}},
+    ]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"]["updated"] == 1
+    assert data["unmatched"] == ["DOC-9999"]
+
+    db.expire_all()
+    document = db.get(Document, imported.id)
+    assert document.nigo_status == "DEFECTS_FOUND"
+    assert [d["rule"] for d in document.defects_json] == ["ILLEGIBLE"]
+
+@pytest.mark.query_budget(0)
+def test_validate_batch_requires_list(client):
+    response = client.post("/documents/validate-batch", json={"documents": "nope"})
+    assert response.status_code == 422
@@ -0,0 +1,55 @@
+import re
+
+from backend.metrics import Counter, Histogram
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    rendered = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = "^" + re.escape(f"{name}{{{rendered}}}" if labels else name) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    assert match, f"{name} {labels} not in /metrics"
+    return float(match.group(1))
+
+
+def test_metrics_endpoint_exposes_routes_pool_and_jobs(client):
+    client.get("/health/live")
+    client.get("/workflows/does-not-exist")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    route = {"method": "GET", "route": "/workflows/{workflow_id}"}
+    assert _sample(text, "http_requests_total", **route, status="200") >= 1
+    assert _sample(text, "http_request_duration_seconds_count", **route) >= 1
+    assert _sample(
+        text, "http_request_duration_seconds_bucket", **route, le="+Inf"
+    ) == _sample(text, "http_request_duration_seconds_count", **route)
+    assert _sample(text, "db_pool_connections", state="checkedout") >= 0
+    assert _sample(text, "job_queue_depth") >= 0
+    assert "# TYPE cache_hit_ratio gauge" in text
+    assert "# TYPE webhooks_in_flight gauge" in text
+
+
+def test_sharded_metrics_sum_across_threads():
+    import threading
+
+    counter = Counter("c_total", "test", ("kind",))
+    histogram = Histogram("h_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value("a") == 4000
+    lines = "\n".join(histogram.collect())
+    assert _sample(lines, "h_seconds_bucket", le="0.1") == 0
+    assert _sample(lines, "h_seconds_bucket", le="1.0") == 4000
+    assert _sample(lines, "h_seconds_count") == 4000
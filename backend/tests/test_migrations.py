@@ -0,0 +1,69 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from backend.database import Base
+from backend.migrations import (
+    LATEST_VERSION,
+    SchemaOutOfDate,
+    check_schema,
+    migrate,
+    v0001_initial,
+)
+from backend.models import Job
+from backend.orchestrator import orchestrator
+
+
+def test_migrated_schema_matches_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.sqlite")
+    assert migrate(engine) == list(range(1, LATEST_VERSION + 1))
+    assert check_schema(engine) == LATEST_VERSION
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert columns == set(table.columns.keys()), table.name
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        assert {i.name for i in table.indexes} <= indexes, table.name
+
+
+def test_startup_check_rejects_unmigrated_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/empty.sqlite")
+    with pytest.raises(SchemaOutOfDate, match="python -m backend.migrations"):
+        check_schema(engine)
+
+
+def test_database_from_create_all_is_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.sqlite")
+    # What the import-time create_all produced before migrations existed.
+    v0001_initial.metadata.create_all(bind=engine)
+    assert migrate(engine)[0] == 1
+    assert migrate(engine) == []
+    assert check_schema(engine) == LATEST_VERSION
+
+
+def test_app_starts_and_stops_against_a_migrated_database(app, db, wait_for_job):
+    # Left QUEUED by a previous process; startup queues it again.
+    job_id = uuid.uuid4().hex
+    db.add(Job(id=job_id, kind="eta.predict", payload_json={"workflow_id": "WF-1"}))
+    db.commit()
+
+    with patch("backend.main.stop_logging") as stop_logging:
+        with TestClient(app) as client:
+            assert client.get("/health/ready").status_code == 200
+            assert orchestrator.invalidation._thread is not None
+            assert wait_for_job(job_id)["status"] == "SUCCEEDED"
+        assert orchestrator.invalidation._thread is None
+        stop_logging.assert_called_once()
+
+
+def test_app_refuses_to_start_against_an_outdated_schema(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/outdated.sqlite")
+    migrate(engine, target=LATEST_VERSION - 1)
+    with patch("backend.main.engine", engine):
+        with pytest.raises(SchemaOutOfDate, match=f"code expects {LATEST_VERSION}"):
+            with TestClient(app):
+                pass
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models import Account, AuditEvent, Household, Task
+
+
+def _household(db, name, **task_kwargs):
+    household = Household(name=name, eta_date=datetime.now() + timedelta(days=60))
+    db.add(household)
+    db.flush()
+    if task_kwargs:
+        db.add(
+            Task(household_id=household.id, name="Transfer submitted", **task_kwargs)
+        )
+    db.commit()
+    return household
+
+
+@pytest.mark.query_budget(16)
+def test_recompute_scores_operational_risk(client, db):
+    calm = _household(db, "Calm Household", status="COMPLETED")
+    troubled = _household(
+        db,
+        "Troubled Household",
+        status="PENDING",
+        sla_due_at=datetime.now() - timedelta(days=2),
+    )
+    db.add(
+        Account(
+            household_id=troubled.id,
+            account_number="RISK-ACC-1",
+            status="TRANSFER_REJECTED",
+            asset_value=2_500_000,
+        )
+    )
+    db.commit()
+
+    response = client.post("/households/risk/recompute", json={})
+    assert response.status_code == 200
+    summary = response.json()["data"]["summary"]
+    assert summary["mode"] == "FULL"
+    assert summary["households_scored"] >= 2
+
+    db.expire_all()
+    assert db.get(Household, calm.id).risk_score == 0.0
+    assert db.get(Household, troubled.id).risk_score > 50
+
+
+@pytest.mark.query_budget(24)
+def test_incremental_recompute_only_touches_audited_households(client, db):
+    household = _household(db, "Incremental Household", status="BREACHED")
+    client.post("/households/risk/recompute", json={})
+    db.expire_all()
+    before = db.get(Household, household.id).risk_score
+
+    db.add(
+        Task(
+            household_id=household.id, name="Resolve NIGO exceptions", status="BREACHED"
+        )
+    )
+    db.add(
+        AuditEvent(
+            event_type="TASK_COMPLETED",
+            entity_type="Household",
+            entity_id=str(household.id),
+        )
+    )
+    db.commit()
+
+    response = client.post("/households/risk/recompute", json={"incremental": True})
+    summary = response.json()["data"]["summary"]
+    assert summary["mode"] == "INCREMENTAL"
+    assert 1 <= summary["households_scored"] < db.query(Household).count()
+
+    db.expire_all()
+    assert db.get(Household, household.id).risk_score > before
+
+
+@pytest.mark.query_budget(0)
+def test_recompute_rejects_bad_since(client):
+    response = client.post("/households/risk/recompute", json={"since": "yesterday"})
+    assert response.status_code == 422
+
+
+def test_tombstoned_rows_do_not_count(client, db):
+    household = _household(
+        db,
+        "Tombstoned Task Household",
+        status="BREACHED",
+        deleted_at=datetime.now(),
+    )
+    task_id = db.query(Task.id).filter(Task.household_id == household.id).scalar()
+
+    client.post("/households/risk/recompute", json={})
+    db.expire_all()
+    assert db.get(Household, household.id).risk_score == 0.0
+
+    response = client.post(
+        f"/api/tasks/{task_id}/complete", json={"status": "COMPLETED"}
+    )
+    assert response.status_code == 404
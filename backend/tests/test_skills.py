@@ -1,3 +1,7 @@
+import pytest
+
+
+@pytest.mark.query_budget(0)
 def test_eta_prediction(client):
     # Test the root-level endpoint
     response = client.get("/predictions/eta/WF_TEST_123")
@@ -7,21 +11,112 @@ def test_eta_prediction(client):
     assert "days_remaining" in data
     assert data["days_remaining"] == 14
 
+@pytest.mark.query_budget(0)
 def test_entity_match(client):
     response = client.post("/entity/match", json={"source": "test"})
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "OK"
-    assert "summary" in data["data"]
+    assert data["data"]["summary"] == {
+        "total_records": 0,
+        "auto_matched": 0,
+        "review_queue": 0,
+        "no_match": 0,
+        "duplicates_found": 0,
+    }
 
+@pytest.mark.query_budget(0)
 def test_draft_communication(client):
     response = client.post("/communications/draft", json={"workflow_id": "WF_123"})
     assert response.status_code == 200
     data = response.json()
     assert "draft_id" in data["data"]
 
-def test_meeting_pack(client):
-    response = client.get("/households/1/meeting-pack")
+@pytest.mark.query_budget(24)
+def test_meeting_pack(client, db, wait_for_job):
+    from backend.models import Household, Task
+
+    household = Household(name="Pack Household")
+    db.add(household)
+    db.flush()
+    task = Task(household_id=household.id, name="Transfer submitted", status="PENDING")
+    db.add(task)
+    db.commit()
+
+    # First request renders on the job pool; repeats are served from the cache.
+    response = client.get(f"/households/{household.id}/meeting-pack")
+    assert response.status_code == 202
+    assert wait_for_job(response.json()["job_id"])["status"] == "SUCCEEDED"
+    response = client.get(f"/households/{household.id}/meeting-pack")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "READY"
+    assert data["cached"] is True
+    assert [f["name"] for f in data["files"]] == ["agenda.md", "report.md"]
+    agenda = client.get(data["files"][0]["url"])
+    assert "Transfer submitted" in agenda.text
+
+    # Changing anything the pack shows invalidates it.
+    task.status = "COMPLETED"
+    db.commit()
+    response = client.get(f"/households/{household.id}/meeting-pack")
+    assert response.status_code == 202
+    assert response.json()["pack_hash"] != data["pack_hash"]
+
+
+def test_failed_meeting_pack_job_is_forgotten(client, db, wait_for_job):
+    from unittest.mock import patch
+
+    from backend.models import Household
+    from backend.orchestrator import orchestrator
+
+    household = Household(name="Failing Pack Household")
+    db.add(household)
+    db.commit()
+
+    with patch("backend.services.meeting_packs.render_pack", side_effect=RuntimeError("disk full")):
+        response = client.get(f"/households/{household.id}/meeting-pack")
+        failed = response.json()
+        assert wait_for_job(failed["job_id"])["status"] == "FAILED"
+    assert failed["pack_hash"] not in orchestrator._pack_jobs
+
+    # The next request renders again rather than pointing at the failed job.
+    response = client.get(f"/households/{household.id}/meeting-pack")
+    assert response.status_code == 202
+    assert response.json()["job_id"] != failed["job_id"]
+    assert wait_for_job(response.json()["job_id"])["status"] == "SUCCEEDED"
+
+
+@pytest.mark.query_budget(2)
+def test_meeting_pack_unknown_household(client):
+    assert client.get("/households/999999/meeting-pack").status_code == 404
+
+@pytest.mark.query_budget(0)
+def test_entity_match_clusters_duplicates(client):
+    records = [
+        {"record_id": "S-1", "name": "Avery Orion", "address": "12 Main Street", "email": "avery.orion@example.com", "phone": "555-0101"},
+        {"record_id": "S-2", "name": "AVERY  ORION", "address": "12 Main St", "email": "Avery.Orion+ira@example.com", "phone": "(555) 0101"},
+        {"record_id": "S-3", "name": "Casey Northwind", "address": "9 Harbor Road", "email": "casey@example.com", "phone": "555-0102"},
+    ]
+    response = client.post("/entity/match", json={"records": records})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"]["total_records"] == 3
+    assert data["summary"]["duplicates_found"] == 1
+    assert data["duplicates"][0]["record_ids"] == ["S-1", "S-2"]
+    summary = data["summary"]
+    assert summary["auto_matched"] + summary["review_queue"] == 2
+    assert summary["no_match"] == 1
+    assert len(data["matches"]) + len(data["review_queue"]) == 1
+
+@pytest.mark.query_budget(0)
+def test_entity_match_rejects_invalid_knobs(client):
+    response = client.post("/entity/match", json={"records": [], "dedupe": {"num_perm": 100, "bands": 32}})
+    assert response.status_code == 422
+
+@pytest.mark.query_budget(0)
+@pytest.mark.parametrize("path", ["/entity/match", "/entity/match?async=true"])
+@pytest.mark.parametrize("dedupe", [{"num_perm": 100, "bands": 32}, {"bands": "x"}, {"threshold": None}, [1]])
+def test_entity_match_rejects_malformed_knobs(client, path, dedupe):
+    response = client.post(path, json={"records": [], "dedupe": dedupe})
+    assert response.status_code == 422
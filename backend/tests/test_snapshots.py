@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+
+from backend.migrations import LATEST_VERSION, current_version, migrate
+from backend.models import Advisor
+from backend.snapshots import (
+    SnapshotNotFound,
+    restore_snapshot,
+    save_snapshot,
+    snapshot_store,
+)
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'live.sqlite'}")
+    yield engine
+    engine.dispose()
+
+
+def test_restore_brings_back_the_saved_rows(sqlite_engine, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    migrate(sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Advisor).values(id=1, name="Saved"))
+    save_snapshot(sqlite_engine, "seeded", snapshots)
+
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Advisor).values(id=2, name="Later"))
+        conn.execute(text("DROP TABLE households"))
+
+    # A connection held open across the restore sees the restored data.
+    with sqlite_engine.connect() as held:
+        assert restore_snapshot(sqlite_engine, "seeded", snapshots) == []
+        assert held.execute(select(Advisor.name)).scalars().all() == ["Saved"]
+        held.execute(text("SELECT count(*) FROM households"))
+
+    assert snapshot_store(sqlite_engine, snapshots).names() == ["seeded"]
+
+
+def test_restore_migrates_an_older_snapshot(sqlite_engine, tmp_path):
+    migrate(sqlite_engine, target=1)
+    save_snapshot(sqlite_engine, "v1", tmp_path)
+    migrate(sqlite_engine)
+
+    applied = restore_snapshot(sqlite_engine, "v1", tmp_path)
+
+    assert applied == list(range(2, LATEST_VERSION + 1))
+    with sqlite_engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+
+
+def test_unknown_and_invalid_snapshot_names(sqlite_engine, tmp_path):
+    with pytest.raises(SnapshotNotFound):
+        restore_snapshot(sqlite_engine, "missing", tmp_path)
+    with pytest.raises(ValueError):
+        save_snapshot(sqlite_engine, "../escape", tmp_path)
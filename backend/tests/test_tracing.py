@@ -0,0 +1,81 @@
+import json
+import logging
+import re
+
+import pytest
+
+from backend.logging_config import JsonFormatter
+from backend.models import Household
+from backend.tracing import fingerprint
+
+
+def _tracing(app):
+    stack = app.middleware_stack
+    while type(stack).__name__ != "TracingMiddleware":
+        stack = stack.app
+    return stack
+
+
+def test_sampled_request_reports_sql_timing(client, app, caplog):
+    client.get("/health/live")  # build the middleware stack
+    tracing = _tracing(app)
+    tracing.sample_rate = 1.0
+    try:
+        with caplog.at_level(logging.INFO, logger="backend.access"):
+            response = client.post(
+                "/households/risk/recompute", headers={"X-Request-ID": "req-123"}
+            )
+    finally:
+        tracing.sample_rate = 0.0
+
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == "req-123"
+    timing = response.headers["server-timing"]
+    statements = int(re.search(r'desc="(\d+) statements"', timing).group(1))
+    assert statements > 0
+    for metric in ("total", "db", "serialize", "app"):
+        assert f"{metric};dur=" in timing
+
+    record = [r for r in caplog.records if r.name == "backend.access"][-1]
+    line = json.loads(JsonFormatter().format(record))
+    assert line["request_id"] == "req-123"
+    assert line["timing"]["statements"] == statements
+
+
+def test_unsampled_request_gets_id_only(client, app):
+    client.get("/health/live")
+    tracing = _tracing(app)
+    tracing.sample_rate, threshold = 0.0, tracing.repeat_threshold
+    tracing.repeat_threshold = None  # SQL debugging traces every request
+    try:
+        response = client.get("/health/live", headers={"X-Request-ID": "bad id!"})
+    finally:
+        tracing.repeat_threshold = threshold
+    assert "server-timing" not in response.headers
+    assert re.fullmatch(r"[0-9a-f]{32}", response.headers["x-request-id"])
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint(
+        "SELECT * FROM tasks WHERE id IN (?, ?, ?) AND name = 'x''y' LIMIT 10"
+    ) == fingerprint("SELECT *  FROM tasks\nWHERE id IN (?) AND name = 'z' LIMIT 5")
+
+
+@pytest.mark.query_budget(60)
+def test_repeated_statements_are_flagged(client, db, caplog, query_budget):
+    db.add_all(
+        Household(name=f"N+1 Household {i}", status="IN_PROGRESS") for i in range(6)
+    )
+    db.commit()
+
+    with caplog.at_level(logging.WARNING, logger="backend.sql"):
+        response = client.get("/api/transitions")
+    assert response.status_code == 200
+
+    warnings = [r.getMessage() for r in caplog.records if r.name == "backend.sql"]
+    assert any(
+        "Possible N+1 in GET /api/transitions" in message and "accounts" in message
+        for message in warnings
+    )
+    repeated = [n for _, n in query_budget.fingerprints.most_common(1)]
+    assert repeated[0] >= 6
@@ -0,0 +1,140 @@
+from pathlib import Path
+
+import pytest
+
+from backend.models import Account, AuditEvent, Document, Household, Job
+from backend.services.consistency import check_households, load_index_from_dataset
+
+DEMO_DATA = Path(__file__).resolve().parents[2] / "demo_data" / "transition_os_demo_v1"
+
+
+def test_consistency_over_demo_book():
+    index = load_index_from_dataset(DEMO_DATA)
+    results = check_households(index)
+    assert len(results) == 12
+    flagged = {
+        (f["household_id"], f["rule"])
+        for findings in results.values()
+        for f in findings
+    }
+    assert flagged == {
+        ("H-1003", "MISSING_BENEFICIARY_DESIGNATION"),
+        ("H-1006", "MISSING_BENEFICIARY_DESIGNATION"),
+    }
+
+
+def test_transfer_form_disagreeing_with_account():
+    index = load_index_from_dataset(DEMO_DATA)
+    household_id = index.add_document(
+        {"doc_id": "DOC-NEW", "account_id": "ACCT-2002", "doc_type": "Transfer Form"},
+        {"extracted_fields": {"delivering_plan_type": "Roth IRA"}},
+    )
+    assert household_id == "H-1001"
+    findings = check_households(index, [household_id])["H-1001"]
+    assert [f["rule"] for f in findings] == ["TRANSFER_FORM_ACCOUNT_MISMATCH"]
+
+
+def test_government_id_without_a_name():
+    index = load_index_from_dataset(DEMO_DATA)
+    index.add_document(
+        {
+            "doc_id": "DOC-NONAME",
+            "account_id": "ACCT-2002",
+            "doc_type": "Government_ID",
+        },
+        {"extracted_fields": {"name": None, "client_name": None}},
+    )
+    assert check_households(index, ["H-1001"])["H-1001"] == []
+
+
+def test_names_that_are_not_strings():
+    index = load_index_from_dataset(DEMO_DATA)
+    index.add_document(
+        {"doc_id": "DOC-NUMID", "account_id": "ACCT-2002", "doc_type": "Government_ID"},
+        {"extracted_fields": {"name": 123}},
+    )
+    index.add_document(
+        {
+            "doc_id": "DOC-NUMAA",
+            "account_id": "ACCT-2002",
+            "doc_type": "Advisory_Agreement",
+        },
+        {"extracted_fields": {"client_name": 456}},
+    )
+    findings = check_households(index, ["H-1001"])["H-1001"]
+    assert [f["evidence"] for f in findings if f["rule"] == "CLIENT_NAME_MISMATCH"] == [
+        "456"
+    ]
+
+
+@pytest.mark.parametrize("household_ids", [5, ["x"], [None]])
+def test_consistency_check_rejects_bad_household_ids(client, household_ids):
+    response = client.post(
+        "/documents/consistency-check", json={"household_ids": household_ids}
+    )
+    assert response.status_code == 422
+
+
+def test_transfer_form_mismatch_from_the_database(client, db):
+    household = Household(name="Plan Type Household")
+    db.add(household)
+    db.flush()
+    account = Account(
+        household_id=household.id,
+        account_number="PT-IRA-1",
+        type="IRA",
+        delivering_plan_type="Traditional IRA",
+        receiving_account_type="Traditional IRA",
+    )
+    db.add(account)
+    db.flush()
+    db.add(
+        Document(
+            household_id=household.id,
+            account_id=account.id,
+            name="transfer.txt",
+            type="Transfer_Form",
+            extracted_fields={"delivering_plan_type": "Roth IRA"},
+        )
+    )
+    db.commit()
+
+    response = client.post(
+        "/documents/consistency-check", json={"household_ids": [household.id]}
+    )
+    rules = [f["rule"] for f in response.json()["data"]["findings"]]
+    assert "TRANSFER_FORM_ACCOUNT_MISMATCH" in rules
+
+
+@pytest.mark.query_budget(12)
+def test_document_upload_rechecks_household(client, db, wait_for_job):
+    household = Household(name="Webhook Household")
+    db.add(household)
+    db.flush()
+    account = Account(household_id=household.id, account_number="WH-IRA-1", type="IRA")
+    db.add(account)
+    db.commit()
+
+    response = client.post(
+        "/api/webhooks/docusign",
+        json={
+            "event_type": "DOCUMENT_UPLOADED",
+            "household_id": household.id,
+            "account_id": account.id,
+            "doc_type": "Beneficiary_Designation",
+            "extracted_fields": {"beneficiaries": []},
+        },
+    )
+    assert response.status_code == 200
+
+    job_id = db.query(Job.id).filter(Job.kind == "consistency.household").scalar()
+    assert wait_for_job(job_id)["status"] == "SUCCEEDED"
+
+    audit = (
+        db.query(AuditEvent)
+        .filter(AuditEvent.event_type == "CONSISTENCY_CHECKED")
+        .filter(AuditEvent.entity_id == str(household.id))
+        .one()
+    )
+    rules = {f["rule"] for f in audit.payload_json["findings"]}
+    assert "MISSING_BENEFICIARY_DESIGNATION" in rules
@@ -0,0 +1,84 @@
+import pytest
+
+from backend.models import Task
+from backend.services.workflows import compile_template
+
+
+def test_templates_compile_to_levels():
+    template = compile_template("ACQUISITION_CONVERSION")
+    assert [template.steps[i].key for i in template.levels[0]] == ["intake"]
+    assert {template.steps[i].key for i in template.levels[1]} == {
+        "book_mapping",
+        "classify",
+    }
+    assert template.steps[-1].name == "Transition complete"
+    assert compile_template("ACQUISITION_CONVERSION") is template
+
+
+@pytest.mark.query_budget(35)
+def test_onboard_book_wires_task_chain(client, db):
+    response = client.post(
+        "/workflows",
+        json={
+            "workflow_type": "RECRUITED_ADVISOR",
+            "advisor_id": "ADV_BOOK_001",
+            "metadata": {
+                "name": "Book Advisor",
+                "households": [{"name": f"Book Household {i}"} for i in range(3)],
+            },
+        },
+    )
+    assert response.status_code == 201
+    data = response.json()["data"]
+    assert data["households"] == 3
+    assert data["tasks_created"] == 24
+
+    tasks = db.query(Task).filter(Task.workflow_id == data["workflow_id"]).all()
+    by_id = {task.id: task for task in tasks}
+    for household_id in {task.household_id for task in tasks}:
+        chain = [t for t in tasks if t.household_id == household_id]
+        heads = [t for t in chain if t.blocked_by_task_id is None]
+        assert [t.name for t in heads] == ["Intake package received"]
+        final = next(t for t in chain if t.name == "Transition complete")
+        depth = 0
+        while final.blocked_by_task_id:
+            final = by_id[final.blocked_by_task_id]
+            assert final.household_id == household_id
+            depth += 1
+        assert depth == 7
+
+
+@pytest.mark.query_budget(0)
+def test_unknown_workflow_type_rejected(client):
+    response = client.post(
+        "/workflows", json={"workflow_type": "NOT_A_TYPE", "advisor_id": "1"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("async_", [False, True])
+def test_bad_books_rejected(client, async_):
+    params = {"async": "true"} if async_ else {}
+    unnamed = client.post(
+        "/workflows",
+        params=params,
+        json={
+            "workflow_type": "RECRUITED_ADVISOR",
+            "advisor_id": "1",
+            "metadata": {"households": [{"name": "Named"}, {"status": "NEW"}]},
+        },
+    )
+    assert unnamed.status_code == 422
+    assert "households[1]" in unnamed.json()["detail"]
+
+    unknown = client.post(
+        "/workflows",
+        params=params,
+        json={
+            "workflow_type": "RECRUITED_ADVISOR",
+            "advisor_id": "1",
+            "metadata": {"household_ids": [999999]},
+        },
+    )
+    assert unknown.status_code == 422
+    assert "999999" in unknown.json()["detail"]
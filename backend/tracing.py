@@ -0,0 +1,283 @@
+"""
+Per-request tracing.
+
+`TracingMiddleware` gives every request an id (taken from `X-Request-ID`
+or generated), which the log filter stamps on every record emitted while
+the request is handled, including records from worker threads. A sampled
+fraction of requests is also timed: SQLAlchemy cursor events count the
+statements a request runs and the time spent in them, the JSON response
+class times serialization, and the remainder is the request's own work.
+The breakdown goes out in a `Server-Timing` header and one log line.
+
+With SQL debugging on (dev and test runs), every request is traced and
+its statements are fingerprinted, so a statement repeated once per row
+(an N+1) is logged with its count, and statements slower than a threshold
+are logged with their bound parameters redacted.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.logging_config import REDACTED, is_sensitive, request_id_var
+
+logger = logging.getLogger("backend.access")
+sql_logger = logging.getLogger("backend.sql")
+
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+@dataclass
+class RequestTrace:
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    # Statement fingerprint -> executions; only kept when SQL debugging is on.
+    fingerprints: Counter | None = None
+
+    def timings_ms(self, finished: float) -> dict:
+        total = (finished - self.started) * 1000
+        db = self.db_seconds * 1000
+        serialize = self.serialize_seconds * 1000
+        return {
+            "total_ms": round(total, 3),
+            "db_ms": round(db, 3),
+            "serialize_ms": round(serialize, 3),
+            "app_ms": round(max(total - db - serialize, 0.0), 3),
+            "statements": self.statements,
+        }
+
+
+# Set only for sampled requests; cursor hooks do nothing when it is unset.
+trace_var: ContextVar[RequestTrace | None] = ContextVar("trace", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+_BIND_SUFFIX = re.compile(r"_\d+$")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a statement so executions differing only in their values
+    (including the length of an IN list) compare equal.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _NAMED_PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def redacted_parameters(context, parameters) -> list | dict:
+    """
+    Bound values for logging, with sensitive binds masked. Binds are
+    matched by name, so positional parameters are shown only by type.
+    """
+    compiled = getattr(context, "compiled_parameters", None)
+    if compiled:
+        return [
+            {
+                name: REDACTED if is_sensitive(_BIND_SUFFIX.sub("", name)) else value
+                for name, value in params.items()
+            }
+            for params in compiled[:5]
+        ]
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters[:20]]
+    return {}
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float | None = None) -> None:
+    """
+    Attaches the statement counters to `engine`. Safe to call once per engine.
+    With `slow_query_ms`, statements slower than that are logged whether or
+    not a request is being traced.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if slow_query_ms is not None or trace_var.get() is not None:
+            conn.info.setdefault("trace_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("trace_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        trace = trace_var.get()
+        if trace is not None:
+            trace.db_seconds += elapsed
+            trace.statements += 1
+            if trace.fingerprints is not None:
+                trace.fingerprints[fingerprint(statement)] += 1
+        if slow_query_ms is not None and elapsed * 1000 >= slow_query_ms:
+            sql_logger.warning(
+                f"Slow query ({elapsed * 1000:.1f}ms): {_SPACE.sub(' ', statement)}",
+                extra={
+                    "payload": {"parameters": redacted_parameters(context, parameters)}
+                },
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # A failed statement never reaches after_cursor_execute.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("trace_started"):
+            conn.info["trace_started"].pop()
+
+
+class TracedJSONResponse(JSONResponse):
+    """
+    JSON response that charges its rendering time to the current trace.
+    """
+
+    def render(self, content) -> bytes:
+        trace = trace_var.get()
+        if trace is None:
+            return super().render(content)
+        started = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            trace.serialize_seconds += time.perf_counter() - started
+
+
+def server_timing(timings: dict) -> str:
+    return (
+        f"total;dur={timings['total_ms']}, "
+        f"db;dur={timings['db_ms']};desc=\"{timings['statements']} statements\", "
+        f"serialize;dur={timings['serialize_ms']}, "
+        f"app;dur={timings['app_ms']}"
+    )
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware (not BaseHTTPMiddleware) so streamed responses pass
+    through untouched and context variables reach the route.
+    """
+
+    def __init__(
+        self, app, sample_rate: float = 1.0, repeat_threshold: int | None = None
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        # When set, every request is traced and statements are fingerprinted.
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        trace = None
+        if self.repeat_threshold is not None:
+            trace = RequestTrace(request_id, fingerprints=Counter())
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trace = RequestTrace(request_id)
+        id_token = request_id_var.set(request_id)
+        trace_token = trace_var.set(trace)
+        status = 500
+        timings = None
+
+        async def send_with_headers(message):
+            nonlocal status, timings
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                if trace is not None:
+                    timings = trace.timings_ms(time.perf_counter())
+                    headers.append((b"server-timing", server_timing(timings).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            if trace is not None:
+                logger.info(
+                    f"{scope['method']} {scope['path']} {status}",
+                    extra={
+                        "request_id": request_id,
+                        "timing": timings or trace.timings_ms(time.perf_counter()),
+                    },
+                )
+                if trace.fingerprints is not None:
+                    self._report_repeats(scope, request_id, trace.fingerprints)
+            trace_var.reset(trace_token)
+            request_id_var.reset(id_token)
+
+    def _report_repeats(self, scope, request_id: str, fingerprints: Counter) -> None:
+        for statement, count in fingerprints.most_common():
+            if count <= self.repeat_threshold:
+                break
+            sql_logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"statement ran {count} times: {statement}",
+                extra={"request_id": request_id},
+            )
+
+
+class QueryCounter:
+    """
+    Counts statements run on `engine` while open, by fingerprint. Statements
+    from threads whose name starts with one of `ignore_threads` (background
+    workers whose timing varies run to run) are not counted.
+    """
+
+    def __init__(self, engine: Engine, ignore_threads: tuple[str, ...] = ()):
+        self.engine = engine
+        self.ignore_threads = ignore_threads
+        self.fingerprints: Counter = Counter()
+        self._paused = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "after_cursor_execute", self._count)
+
+    @property
+    def count(self) -> int:
+        return sum(self.fingerprints.values())
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if self._paused or threading.current_thread().name.startswith(
+            self.ignore_threads
+        ):
+            return
+        with self._lock:
+            self.fingerprints[fingerprint(statement)] += 1
+
+    @contextmanager
+    def paused(self):
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def close(self) -> None:
+        event.remove(self.engine, "after_cursor_execute", self._count)
+
+
+def _incoming_request_id(scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            value = value.decode("latin-1")
+            return value if _REQUEST_ID.fullmatch(value) else None
+    return None